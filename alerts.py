@@ -0,0 +1,174 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+import config  # Imports your config.py settings
+
+
+class Alert:
+    __slots__ = ('text', 'priority', 'key', 'created', 'captured', 'expires', 'seq', 'cancelled')
+
+    def __init__(self, text, priority, key, created, ttl, seq, captured=None):
+        self.text = text
+        self.priority = priority
+        self.key = key
+        self.created = created
+        self.captured = captured if captured is not None else created  # Grab time of the source frame
+        self.expires = created + ttl
+        self.seq = seq
+        self.cancelled = False
+
+    @property
+    def urgent(self):
+        return self.priority >= 4
+
+
+class AlertScheduler:
+    """
+    Priority scheduler between the detection loop and the speech worker.
+
+    - Highest priority first (FIFO within a level), via a heap.
+    - Per-object dedup: the same (class, direction) key is not repeated
+      within its priority's window unless its risk increased (escalation).
+    - A pending alert for a key is replaced by the newer one.
+    - Alerts expire; stale messages are dropped instead of spoken.
+    - Critical alerts preempt lower-priority speech through `on_preempt`.
+    - Enqueue -> playback-start latency is recorded per priority when the
+      speech worker reports the audio starting (started()).
+    """
+
+    def __init__(self, on_preempt=None, settings=None):
+        self.settings = settings or config.ALERTS
+        self.on_preempt = on_preempt
+        self._cond = threading.Condition()
+        self._heap = []
+        self._pending = {}                    # key -> queued Alert
+        self._last_spoken = {}                # key -> (priority, time)
+        self._seq = itertools.count()
+        self.current = None                   # Alert being played
+
+        self.latencies = defaultdict(lambda: deque(maxlen=self.settings['latency_window']))
+        self.counts = defaultdict(lambda: defaultdict(int))  # priority -> event -> n
+
+    def _level(self, table, priority):
+        return table.get(priority, table[min(table)])
+
+    def submit(self, text, priority, key=None, now=None, captured=None):
+        """Queues an alert (`captured`: frame grab time). Returns False if it was suppressed as a duplicate."""
+        now = time.time() if now is None else now
+        key = key if key is not None else text
+        with self._cond:
+            last = self._last_spoken.get(key)
+            if last is not None:
+                last_priority, last_time = last
+                window = self._level(self.settings['dedup_s'], priority)
+                if priority <= last_priority and now - last_time < window:
+                    self.counts[priority]['suppressed'] += 1
+                    return False
+
+            queued = self._pending.get(key)
+            if queued is not None:
+                if queued.priority > priority:
+                    self.counts[priority]['suppressed'] += 1
+                    return False
+                queued.cancelled = True  # Replaced by the newer reading
+
+            alert = Alert(text, priority, key, now, self._level(self.settings['ttl_s'], priority),
+                          next(self._seq), captured)
+            heapq.heappush(self._heap, (-priority, alert.seq, alert))
+            self._pending[key] = alert
+            self.counts[priority]['issued'] += 1
+
+            while len(self._pending) > self.settings['max_pending']:
+                self._drop_lowest()
+
+            preempt = self._should_preempt(alert)
+            if preempt:
+                self.counts[self.current.priority]['preempted'] += 1
+            self._cond.notify()
+
+        if preempt and self.on_preempt:
+            self.on_preempt()
+        return True
+
+    def _should_preempt(self, alert):
+        current = self.current
+        if current is None or alert.priority < self.settings['preempt_priority']:
+            return False
+        return alert.priority > current.priority
+
+    def _drop_lowest(self):
+        victim = max((a for a in self._pending.values()), key=lambda a: (-a.priority, a.seq))
+        victim.cancelled = True
+        del self._pending[victim.key]
+        self.counts[victim.priority]['dropped'] += 1
+
+    def next(self, timeout=None):
+        """Blocks for the next live alert and marks it as playing. None on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                while self._heap:
+                    _, _, alert = heapq.heappop(self._heap)
+                    if alert.cancelled:
+                        continue
+                    del self._pending[alert.key]
+                    now = time.time()
+                    if now > alert.expires:
+                        self.counts[alert.priority]['expired'] += 1
+                        continue
+                    self.current = alert
+                    self._last_spoken[alert.key] = (alert.priority, now)
+                    return alert
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def started(self, alert, now=None):
+        """Called by the speech worker when `alert`'s audio starts playing."""
+        now = time.time() if now is None else now
+        with self._cond:
+            self.latencies[alert.priority].append(now - alert.created)
+
+    def finished(self, alert):
+        with self._cond:
+            if self.current is alert:
+                self.current = None
+            self.counts[alert.priority]['spoken'] += 1
+
+    def clear(self):
+        with self._cond:
+            for alert in self._pending.values():
+                alert.cancelled = True
+            self._pending.clear()
+            self._heap.clear()
+
+    def snapshot_counts(self):
+        """Copy of `counts` as {priority: {event: n}}, safe to read from other threads."""
+        with self._cond:
+            return {priority: dict(events) for priority, events in self.counts.items()}
+
+    def depth(self):
+        with self._cond:
+            return len(self._pending)
+
+    def latency_summary(self):
+        """Per priority: p50/p95 enqueue->playback (ms) and share within the target."""
+        target = self.settings['latency_target_ms']
+        summary = {}
+        for priority, samples in sorted(self.latencies.items()):
+            if not samples:
+                continue
+            ms = np.asarray(samples) * 1000
+            summary[priority] = {
+                'n': len(ms),
+                'p50': round(float(np.percentile(ms, 50)), 1),
+                'p95': round(float(np.percentile(ms, 95)), 1),
+                'within_target': round(float((ms <= target.get(priority, np.inf)).mean()), 3)
+                if priority in target else None,
+            }
+        return summary
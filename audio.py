@@ -0,0 +1,352 @@
+import os
+import re
+import tempfile
+import time
+import wave
+from collections import OrderedDict
+
+import numpy as np
+import config  # Imports your config.py settings
+
+NUMBER = r'\d+(?:\.\d+)?'
+
+
+def quantize_distance(dist, step=0.5):
+    """Rounds a spoken distance to `step` meters (never down to 0 for a real reading)."""
+    if dist <= 0:
+        return 0.0
+    return max(step, round(dist / step) * step)
+
+
+def format_distance(dist):
+    return f"{dist:g}"
+
+
+def template_phrases(phrase_fn, directions, distances=(1.0, 5.0)):
+    """Sample phrases covering every template branch, critical groups first."""
+    order = {'G1': 0, 'G6': 1}
+    classes = sorted(config.CLASS_TO_GROUP.items(), key=lambda item: order.get(item[1], 2))
+    return [phrase_fn(class_name, dist, direction, group)
+            for class_name, group in classes
+            for dist in distances
+            for direction in directions]
+
+
+def speak_interruptible(engine, text, interrupt, on_start=None):
+    """
+    Live pyttsx3 speech driven from the calling thread (the speech worker),
+    stopped early - on the same thread - once `interrupt` is set.
+    `on_start` is called as the engine starts speaking.
+    """
+    if interrupt.is_set():
+        return
+    engine.startLoop(False)
+    try:
+        engine.say(text)
+        if on_start:
+            on_start()
+        while engine.isBusy():
+            if interrupt.is_set():
+                engine.stop()
+                break
+            engine.iterate()
+            time.sleep(0.01)
+    finally:
+        engine.endLoop()
+
+
+class PyttsxSynthesizer:
+    """Renders text to 16-bit PCM matching the pygame mixer format via pyttsx3.save_to_file."""
+
+    def __init__(self, engine, sample_rate, channels, silence_threshold=200):
+        self.engine = engine
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.silence_threshold = silence_threshold
+
+    def __call__(self, text):
+        fd, path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        try:
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+            with wave.open(path, 'rb') as w:
+                rate, width, channels = w.getframerate(), w.getsampwidth(), w.getnchannels()
+                raw = w.readframes(w.getnframes())
+        finally:
+            os.remove(path)
+
+        if width != 2:
+            raise ValueError(f"Unsupported TTS sample width: {width * 8} bit")
+        mono = np.frombuffer(raw, dtype=np.int16).reshape(-1, channels).mean(axis=1)
+        mono = self._trim(mono)
+        if rate != self.sample_rate and len(mono):
+            n = int(len(mono) * self.sample_rate / rate)
+            mono = np.interp(np.linspace(0, len(mono) - 1, n), np.arange(len(mono)), mono)
+        return to_mixer(mono.astype(np.int16), self.channels)
+
+    def _trim(self, mono):
+        """TTS engines pad with silence; strip it so fragments join tightly."""
+        loud = np.flatnonzero(np.abs(mono) > self.silence_threshold)
+        return mono[loud[0]:loud[-1] + 1] if len(loud) else mono[:0]
+
+
+def to_mixer(mono, channels):
+    """(n,) int16 -> (n, channels) C-contiguous int16 for pygame.mixer.Sound(buffer=...)."""
+    return np.ascontiguousarray(np.repeat(mono[:, None], channels, axis=1))
+
+
+class PhraseCache:
+    """
+    LRU cache of pre-synthesized phrase fragments.
+    A phrase is split into static template text and variable tokens (class
+    names, directions, distances rounded to `distance_step`), so a small set
+    of fragments covers every alert. Fragments not yet cached are synthesized
+    on first use; `warm_one()` fills the cache in idle time.
+    """
+
+    def __init__(self, synthesize, vocabulary, settings=None, sample_rate=22050, channels=1):
+        self.settings = settings or config.AUDIO
+        self.synthesize = synthesize
+        self.capacity = self.settings['cache_size']
+        self.step = self.settings['distance_step']
+        self.gap = np.zeros((int(sample_rate * self.settings['fragment_gap_ms'] / 1000), channels),
+                            dtype=np.int16)
+        self._cache = OrderedDict()
+        self.pending = []
+        self.hits = 0
+        self.misses = 0
+
+        words = sorted({w for w in vocabulary if w}, key=len, reverse=True)
+        alternatives = [re.escape(w) for w in words] + [NUMBER]
+        self._pattern = re.compile(r'(\b(?:' + '|'.join(alternatives) + r')\b)', re.IGNORECASE)
+
+    def fragments(self, text):
+        """Splits a phrase into cacheable fragments (numbers quantized)."""
+        parts = []
+        for piece in self._pattern.split(text):
+            piece = piece.strip(' .,;:')  # Pauses come from fragment_gap_ms
+            if not any(c.isalnum() for c in piece):
+                continue  # Whitespace / bare punctuation
+            if re.fullmatch(NUMBER, piece):
+                piece = format_distance(quantize_distance(float(piece), self.step))
+            parts.append(piece)
+        return parts
+
+    def get(self, fragment):
+        key = fragment.lower()
+        pcm = self._cache.get(key)
+        if pcm is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return pcm
+        self.misses += 1
+        pcm = self.synthesize(fragment)
+        self._cache[key] = pcm
+        if len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+        return pcm
+
+    def render(self, text):
+        """Concatenated PCM for `text`."""
+        pcm = []
+        for fragment in self.fragments(text):
+            if pcm:
+                pcm.append(self.gap)
+            pcm.append(self.get(fragment))
+        return np.concatenate(pcm) if pcm else None
+
+    def prewarm(self, texts, max_distance=None):
+        """Queues the fragments of sample phrases plus every quantized distance."""
+        max_distance = self.settings['max_prewarm_distance'] if max_distance is None else max_distance
+        wanted = [f for text in texts for f in self.fragments(text)]
+        wanted += [format_distance(d) for d in np.arange(self.step, max_distance + self.step / 2, self.step)]
+        seen = set(self._cache) | {p.lower() for p in self.pending}
+        for fragment in wanted:
+            if fragment.lower() not in seen:
+                seen.add(fragment.lower())
+                self.pending.append(fragment)
+
+    def warm_one(self):
+        """Synthesizes one pending fragment. Returns False when nothing is left."""
+        while self.pending:
+            fragment = self.pending.pop(0)
+            if fragment.lower() not in self._cache:
+                self.get(fragment)
+                return True
+        return False
+
+
+class PhrasePlayer:
+    """
+    Speaks phrases from the fragment cache through the already-initialized
+    pygame.mixer instead of blocking on pyttsx3 synthesis per alert.
+    Use from the speech worker thread only; `stop()` is safe from any thread.
+    """
+
+    def __init__(self, engine, vocabulary, settings=None):
+        self.settings = settings or config.AUDIO
+        self.channel = None
+        self.cache = None
+
+        if not self.settings.get('phrase_cache'):
+            return
+        import pygame  # Deferred until the mixer is actually used
+        mixer = pygame.mixer.get_init()
+        if not mixer:
+            return
+        frequency, size, channels = mixer
+        if size != -16:
+            print(f"⚠ Phrase cache disabled: mixer format {size} is not 16-bit signed")
+            return
+        synthesize = PyttsxSynthesizer(engine, frequency, channels)
+        self.cache = PhraseCache(synthesize, vocabulary, self.settings, frequency, channels)
+
+    @property
+    def enabled(self):
+        return self.cache is not None
+
+    @property
+    def pending(self):
+        """True while fragments are still waiting to be pre-synthesized."""
+        return bool(self.cache and self.cache.pending)
+
+    def prewarm(self, texts):
+        if self.cache:
+            self.cache.prewarm(texts)
+
+    def warm_one(self):
+        if not self.cache:
+            return False
+        try:
+            return self.cache.warm_one()
+        except Exception as e:
+            print(f"⚠ Phrase cache disabled: {e}")
+            self.cache = None
+            return False
+
+    def speak(self, text, interrupt=None, on_start=None):
+        """
+        Plays `text` and waits for it to finish (or for `interrupt` to be set),
+        calling `on_start` once the channel is playing.
+        Returns False if the caller should fall back to TTS.
+        """
+        if not self.cache:
+            return False
+        try:
+            pcm = self.cache.render(text)
+        except Exception as e:
+            print(f"⚠ Phrase cache disabled: {e}")
+            self.cache = None
+            return False
+        if pcm is None:
+            return True
+
+        import pygame
+        self.channel = pygame.mixer.Sound(buffer=pcm.tobytes()).play()
+        if on_start and self.channel is not None:
+            on_start()
+        while self.channel is not None and self.channel.get_busy():
+            if interrupt is not None and interrupt.is_set():
+                self.stop()
+                break
+            time.sleep(0.01)
+        return True
+
+    def stop(self):
+        channel = self.channel
+        if channel is not None:
+            channel.stop()
+
+
+# --- Earcons ---
+def earcon_pcm(frequency, pulses, pan, sample_rate, channels, settings):
+    """
+    `pulses` short sine beeps at `frequency`, panned (-1 left ... 1 right)
+    with constant power. Returns (n, channels) int16.
+    """
+    pulse = np.arange(int(sample_rate * settings['pulse_ms'] / 1000)) / sample_rate
+    ramp = min(len(pulse) // 2, int(sample_rate * 0.005))  # 5 ms fade in / out, no clicks
+    envelope = np.ones(len(pulse))
+    if ramp:
+        envelope[:ramp] = envelope[-ramp:][::-1] = np.linspace(0, 1, ramp)
+    beep = np.sin(2 * np.pi * frequency * pulse) * envelope * settings['volume'] * 32767
+    gap = np.zeros(int(sample_rate * settings['gap_ms'] / 1000))
+    mono = np.concatenate([beep] + [np.concatenate([gap, beep]) for _ in range(pulses - 1)])
+
+    if channels == 1:
+        return mono.astype(np.int16)[:, None]
+    angle = (pan + 1) * np.pi / 4
+    gains = [np.cos(angle), np.sin(angle)] + [np.sqrt(0.5)] * (channels - 2)
+    return np.ascontiguousarray(np.stack([mono * g for g in gains], axis=1).astype(np.int16))
+
+
+class EarconBank:
+    """
+    Pre-rendered directional tones that reach the user within a frame of
+    the detection, before (or instead of) the spoken phrase.
+    Pitch encodes the risk level, the number of pulses the distance band
+    and the stereo pan the horizontal box position. Every variant is
+    rendered to a pygame Sound at startup and played on a reserved mixer
+    channel, so firing one is a dict lookup. A lower-risk tone never cuts
+    off a higher-risk one; the same object repeats after `repeat_s`.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or config.EARCONS
+        self.enabled = False
+        self.sounds = {}
+        self.channel = None
+        self.playing = 0  # Risk level of the tone on the channel
+        self._last = {}
+        self.limits = np.asarray(self.settings['band_limits_m'], dtype=np.float64)
+        self.pans = np.linspace(-1, 1, self.settings['pan_steps'])
+        self.speak_min_risk = self.settings.get('speak_min_risk', 1)
+
+        if not self.settings.get('enabled'):
+            return
+        import pygame  # Deferred until the mixer is actually used
+        mixer = pygame.mixer.get_init()
+        if not mixer:
+            return
+        frequency, size, channels = mixer
+        if size != -16:
+            print(f"⚠ Earcons disabled: mixer format {size} is not 16-bit signed")
+            return
+        pygame.mixer.set_reserved(1)  # Speech never lands on the earcon channel
+        self.channel = pygame.mixer.Channel(0)
+        for risk, tone in self.settings['tones_hz'].items():
+            for band, pulses in enumerate(self.settings['pulses']):
+                for index, pan in enumerate(self.pans):
+                    pcm = earcon_pcm(tone, pulses, pan, frequency, channels, self.settings)
+                    self.sounds[risk, band, index] = pygame.mixer.Sound(buffer=pcm.tobytes())
+        self.enabled = True
+        print(f"✓ {len(self.sounds)} earcons rendered")
+
+    def speaks(self, risk):
+        """Whether an alert at `risk` should still be spoken (lower levels get only the earcon)."""
+        return not self.enabled or risk >= self.speak_min_risk
+
+    def play(self, risk, dist, position, key=None, now=None):
+        """
+        position: horizontal box center as a fraction of the frame width (0 = left).
+        Returns True if a tone started.
+        """
+        if not self.enabled or risk not in self.settings['tones_hz']:
+            return False
+        now = time.monotonic() if now is None else now
+        if key is not None and now - self._last.get(key, -np.inf) < self.settings['repeat_s']:
+            return False
+        if self.channel.get_busy() and risk < self.playing:
+            return False
+        band = int(np.searchsorted(self.limits, dist, side='right'))
+        pan = int(round(min(max(position, 0.0), 1.0) * (len(self.pans) - 1)))
+        self.channel.play(self.sounds[risk, band, pan])
+        self.playing = risk
+        if key is not None:
+            self._last[key] = now
+        return True
+
+    def play_detection(self, det, width, key=None):
+        """Plays the earcon for one DETECTION_DTYPE row."""
+        return self.play(int(det['risk']), float(det['dist']), (int(det['x1']) + int(det['x2'])) / 2 / width, key)
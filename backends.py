@@ -0,0 +1,217 @@
+"""
+Inference backends: PyTorch, ONNX Runtime and OpenVINO (CPU).
+
+The first run of an optimized backend exports `best.pt` once and caches the
+result next to it (best.onnx, best_openvino_model/, ...). Later starts load
+the cached file unless the .pt weights are newer.
+
+    python backends.py --backend onnx           # one-time export
+    python backends.py --backend openvino --int8 --calibration calibration/
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import config  # Imports your config.py settings
+from detection import ClassFilter, model_conf
+
+BACKENDS = ('pytorch', 'onnx', 'openvino')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def _is_fresh(path, weights):
+    return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(weights)
+
+
+def _calibration_images(folder, limit=300):
+    if not folder or not os.path.isdir(folder):
+        raise FileNotFoundError(f"INT8 calibration folder not found: {folder}")
+    files = sorted(f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTENSIONS))
+    if not files:
+        raise FileNotFoundError(f"No calibration images in {folder}")
+    return [os.path.join(folder, f) for f in files[:limit]]
+
+
+class InferenceBackend:
+    """Loads a YOLO-compatible model (callable, with `.names`) for one runtime."""
+
+    name = None
+
+    def __init__(self, weights, settings):
+        self.weights = weights
+        self.settings = settings
+        self.imgsz = settings.get('imgsz', 640)
+        self.int8 = settings.get('int8', False)
+        # Variable input sizes / batch sizes: adaptive resolution and multi-camera batches
+        self.dynamic = config.RESOLUTION.get('enabled', False) or len(config.CAMERAS) > 1
+
+    def cached_path(self):
+        return self.weights
+
+    def export(self):
+        """Converts the .pt weights; returns the path of the exported model."""
+        return self.weights
+
+    def load(self):
+        from ultralytics import YOLO
+        path = self.cached_path()
+        if path != self.weights and not _is_fresh(path, self.weights):
+            print(f"Exporting {self.weights} for {self.name}{' (INT8)' if self.int8 else ''}...",
+                  file=sys.stderr)
+            path = self.export()
+        return YOLO(path, task='detect')
+
+
+class PyTorchBackend(InferenceBackend):
+    name = 'pytorch'
+
+
+class OnnxBackend(InferenceBackend):
+    """ONNX Runtime on CPU. INT8 uses onnxruntime's static quantization."""
+
+    name = 'onnx'
+
+    def cached_path(self):
+        stem = os.path.splitext(self.weights)[0]
+        return f"{stem}_int8.onnx" if self.int8 else f"{stem}.onnx"
+
+    def export(self):
+        from ultralytics import YOLO
+        fp32 = YOLO(self.weights).export(format='onnx', imgsz=self.imgsz,
+                                         dynamic=self.dynamic, simplify=True)
+        if not self.int8:
+            return fp32
+
+        from onnxruntime.quantization import CalibrationDataReader, QuantType, quantize_static
+        images = _calibration_images(self.settings.get('calibration_dir'))
+        imgsz = self.imgsz
+
+        class _Reader(CalibrationDataReader):
+            def __init__(self, model_path):
+                import onnxruntime as ort
+                self.input_name = ort.InferenceSession(
+                    model_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+                self.files = iter(images)
+
+            def get_next(self):
+                path = next(self.files, None)
+                if path is None:
+                    return None
+                return {self.input_name: _preprocess(path, imgsz)}
+
+        out = self.cached_path()
+        quantize_static(fp32, out, _Reader(fp32), weight_type=QuantType.QInt8,
+                        activation_type=QuantType.QUInt8)
+        return out
+
+
+class OpenVINOBackend(InferenceBackend):
+    """OpenVINO on CPU. INT8 uses ultralytics' NNCF post-training quantization."""
+
+    name = 'openvino'
+
+    def cached_path(self):
+        stem = os.path.splitext(self.weights)[0]
+        return f"{stem}_int8_openvino_model" if self.int8 else f"{stem}_openvino_model"
+
+    def export(self):
+        from ultralytics import YOLO
+        model = YOLO(self.weights)
+        kwargs = {}
+        if self.int8:
+            kwargs = {'int8': True, 'data': _calibration_yaml(self.settings.get('calibration_dir'),
+                                                              model.names)}
+        return model.export(format='openvino', imgsz=self.imgsz, dynamic=self.dynamic, **kwargs)
+
+
+def _preprocess(path, imgsz):
+    """Letterboxed, normalized NCHW float32 tensor, as the exported graph expects."""
+    import cv2
+    image = cv2.imread(path)
+    h, w = image.shape[:2]
+    scale = imgsz / max(h, w)
+    resized = cv2.resize(image, (int(round(w * scale)), int(round(h * scale))))
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    canvas[:resized.shape[0], :resized.shape[1]] = resized
+    tensor = cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB).transpose(2, 0, 1)[None]
+    return np.ascontiguousarray(tensor, dtype=np.float32) / 255.0
+
+
+def _calibration_yaml(folder, names):
+    """Ultralytics INT8 export expects a dataset yaml; point it at the folder."""
+    _calibration_images(folder)  # Fail early with a clear message
+    folder = os.path.abspath(folder)
+    path = os.path.join(folder, 'calibration.yaml')
+    with open(path, 'w') as f:
+        f.write(f"path: {folder}\ntrain: .\nval: .\nnames:\n")
+        for cls_id, name in names.items():
+            f.write(f"  {cls_id}: '{name}'\n")
+    return path
+
+
+def get_backend(name=None, weights=None, settings=None):
+    settings = dict(settings or config.MODEL)
+    name = name or settings.get('backend', 'pytorch')
+    weights = weights or settings['weights']
+    backends = {b.name: b for b in (PyTorchBackend, OnnxBackend, OpenVINOBackend)}
+    if name not in backends:
+        raise ValueError(f"Unknown backend '{name}', expected one of {BACKENDS}")
+    return backends[name](weights, settings)
+
+
+def apply_class_filter(model, settings=None):
+    """Makes MODEL['classes'] / ['max_det'] the model's predict defaults, so inactive classes never reach NMS."""
+    class_filter = ClassFilter(model.names, settings)
+    model.overrides.update(class_filter.kwargs())
+    active = int(class_filter.active.sum())
+    print(f"Model classes: {active} of {len(class_filter.active)} active, conf {model_conf(settings)}, "
+          f"max_det {class_filter.max_det or 'default'}", file=sys.stderr)
+    return model
+
+
+def load_model(name=None, weights=None, settings=None):
+    """Loads the configured backend (exporting once if needed)."""
+    stub = (settings or config.MODEL).get('stub')
+    if stub:  # Synthetic boxes, no weights (soak tests)
+        from stub_detector import StubDetector
+        return apply_class_filter(StubDetector(**stub), settings)
+    backend = get_backend(name, weights, settings)
+    print(f"Loading AI Model ({backend.name})...", file=sys.stderr)
+    return apply_class_filter(backend.load(), settings)
+
+
+def warmup(model, runs=None, sizes=None, frame_shape=(720, 1280, 3), batch=None):
+    """Runs throwaway inferences so the first real frame isn't slow. Returns seconds spent."""
+    runs = config.MODEL.get('warmup_runs', 2) if runs is None else runs
+    if sizes is None:
+        sizes = config.RESOLUTION['sizes'] if config.RESOLUTION.get('enabled') else [None]
+    batch = len(config.CAMERAS) if batch is None else batch  # One frame per camera per tick
+    frame = np.zeros(frame_shape, dtype=np.uint8)
+    frames = frame if batch <= 1 else [frame] * batch
+    t0 = time.perf_counter()
+    for imgsz in sizes:
+        kwargs = {'imgsz': imgsz} if imgsz else {}
+        for _ in range(runs):
+            model(frames, conf=model_conf(), verbose=False, **kwargs)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export NavAssist weights for an inference backend")
+    parser.add_argument('--backend', choices=BACKENDS, default=config.MODEL.get('backend', 'pytorch'))
+    parser.add_argument('--weights', default=config.MODEL['weights'])
+    parser.add_argument('--int8', action='store_true', default=config.MODEL.get('int8', False))
+    parser.add_argument('--calibration', default=config.MODEL.get('calibration_dir'))
+    args = parser.parse_args()
+
+    settings = dict(config.MODEL, int8=args.int8, calibration_dir=args.calibration)
+    backend = get_backend(args.backend, args.weights, settings)
+    model = backend.load()
+    print(f"✓ {backend.name} model ready: {backend.cached_path()}")
+    print(f"✓ Warmup: {warmup(model):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
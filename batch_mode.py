@@ -0,0 +1,184 @@
+"""
+Offline batch mode: re-run recorded walks through the risk logic.
+
+    python batch_mode.py walk.mp4 --batch-size 16 --output walk.jsonl
+    python batch_mode.py frames_dir/ --output frames.jsonl
+
+Writes one JSON line per frame (detections, distances, groups, risk levels
+and the phrase the live system would speak) and prints a throughput summary.
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import cv2
+from detection import DetectionProcessor, model_conf
+from main import NavAssistCore
+from backends import BACKENDS, load_model
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class FrameReader(threading.Thread):
+    """
+    Decodes a video file or image folder on a background thread.
+    Frames are (index, source_name, timestamp_s, image); None marks the end.
+    Unlike the live pipeline nothing is dropped - the queue applies backpressure.
+    An exception ends the stream and is kept in `error` for the consumer.
+    """
+
+    def __init__(self, source, maxsize=64):
+        super().__init__(name='frame-reader', daemon=True)
+        self.source = source
+        self.frames = queue.Queue(maxsize=maxsize)
+        self.error = None
+
+    def run(self):
+        try:
+            if os.path.isdir(self.source):
+                self._read_images()
+            else:
+                self._read_video()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.frames.put(None)
+
+    def _read_images(self):
+        files = sorted(f for f in os.listdir(self.source) if f.lower().endswith(IMAGE_EXTENSIONS))
+        for index, name in enumerate(files):
+            image = cv2.imread(os.path.join(self.source, name))
+            if image is None:
+                print(f"⚠ Skipping unreadable image: {name}", file=sys.stderr)
+                continue
+            self.frames.put((index, name, None, image))
+
+    def _read_video(self):
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            raise IOError(f"Cannot open video: {self.source}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0
+        name = os.path.basename(self.source)
+        index = 0
+        while True:
+            ret, image = cap.read()
+            if not ret:
+                break
+            timestamp = round(index / fps, 3) if fps > 0 else None
+            self.frames.put((index, name, timestamp, image))
+            index += 1
+        cap.release()
+
+
+class BatchRunner:
+    def __init__(self, weights=None, batch_size=8, conf=None, backend=None):
+        self.model = load_model(backend, weights)
+        self.batch_size = max(1, batch_size)
+        self.conf = conf if conf is not None else model_conf()
+        self.focal_length = 600
+        self.processor = DetectionProcessor(self.model.names, self.focal_length)
+
+    def frame_record(self, index, name, timestamp, dets, width):
+        """One JSONL record, including the phrase the live loop would pick."""
+        alert = None
+        top = self.processor.top(dets)
+        if top is not None:
+            class_name, dist, direction, group = self.processor.describe(dets[top])
+            priority = int(dets[top]['risk'])
+            alert = {
+                'priority': priority,
+                'urgent': priority >= 4,
+                'phrase': NavAssistCore.get_audio_phrase(
+                    class_name, dist, NavAssistCore.DIRECTIONS[direction], group),
+            }
+        return {
+            'frame': index,
+            'source': name,
+            't': timestamp,
+            'width': width,
+            'detections': self.processor.to_dicts(dets),
+            'alert': alert,
+        }
+
+    def run(self, source, out):
+        reader = FrameReader(source, maxsize=self.batch_size * 4)
+        reader.start()
+
+        frames = 0
+        infer_time = 0.0
+        start = time.perf_counter()
+        done = False
+
+        while not done:
+            # --- Collect one batch ---
+            batch = []
+            while len(batch) < self.batch_size:
+                item = reader.frames.get()
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+            if not batch:
+                break
+
+            # --- Batched inference ---
+            t0 = time.perf_counter()
+            results = self.model([item[3] for item in batch], conf=self.conf, verbose=False)
+            infer_time += time.perf_counter() - t0
+
+            # --- Score + stream out ---
+            for (index, name, timestamp, image), result in zip(batch, results):
+                width = image.shape[1]
+                dets = self.processor.from_result(result, width)
+                record = self.frame_record(index, name, timestamp, dets, width)
+                out.write(json.dumps(record) + "\n")
+            out.flush()
+            frames += len(batch)
+
+        reader.join()
+        if reader.error is not None:
+            raise reader.error
+        elapsed = time.perf_counter() - start
+        return {
+            'frames': frames,
+            'batch_size': self.batch_size,
+            'elapsed_s': round(elapsed, 3),
+            'fps': round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+            'inference_fps': round(frames / infer_time, 2) if infer_time > 0 else 0.0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NavAssist offline batch scoring")
+    parser.add_argument('source', help="Video file or folder of images")
+    parser.add_argument('--output', '-o', default='-', help="JSONL output path ('-' for stdout)")
+    parser.add_argument('--batch-size', '-b', type=int, default=8)
+    parser.add_argument('--weights', default=None, help="Model weights (default: config.MODEL)")
+    parser.add_argument('--conf', type=float, default=None)
+    parser.add_argument('--backend', choices=BACKENDS, default=None, help="Default: config.MODEL['backend']")
+    args = parser.parse_args()
+    if not os.path.exists(args.source):
+        parser.error(f"source not found: {args.source}")
+
+    runner = BatchRunner(args.weights, args.batch_size, args.conf, args.backend)
+    try:
+        if args.output == '-':
+            summary = runner.run(args.source, sys.stdout)
+        else:
+            with open(args.output, 'w') as out:
+                summary = runner.run(args.source, out)
+    except IOError as e:
+        print(f"⚠ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"✓ {summary['frames']} frames in {summary['elapsed_s']}s - "
+          f"{summary['fps']} FPS end-to-end, {summary['inference_fps']} FPS inference "
+          f"(batch size {summary['batch_size']})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
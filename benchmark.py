@@ -0,0 +1,349 @@
+"""
+Per-stage latency benchmark for the shared detection / risk / draw path.
+
+    python benchmark.py --stub --density 50             # no weights needed
+    python benchmark.py --weights best.pt --frames walk.mp4
+    python benchmark.py --weights best.pt --backend openvino
+    python benchmark.py --stub --output bench_v1.2.json
+    python benchmark.py --weights best.pt --workers 4   # + process-pool scaling 1..4
+    python benchmark.py --stub --compare-modes 20       # main.py windowed vs --headless
+    python benchmark.py --stub --density 300 --unmapped 56 --nms-iou 0.7 --compare-filter
+
+Reports p50/p95/p99 per stage and writes the results as JSON so releases
+can be compared without a camera attached.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+from PIL import Image
+import config  # Imports your config.py settings
+from detection import DetectionProcessor, draw_detections, model_conf
+from backends import apply_class_filter
+from stub_detector import StubDetector
+
+STAGES = ('decode', 'inference', 'postprocess', 'draw', 'display', 'speech_enqueue')
+
+
+class StageTimer:
+    """Collects wall-clock samples (seconds) per named stage"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    @contextmanager
+    def __call__(self, stage):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[stage].append(time.perf_counter() - t0)
+
+    def summary(self):
+        return {stage: summarize(self.samples[stage]) for stage in self.samples}
+
+
+def summarize(samples):
+    """p50/p95/p99/mean/max in milliseconds for a list of second samples."""
+    if not samples:
+        return {'n': 0}
+    ms = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        'n': len(ms),
+        'p50': round(float(p50), 3),
+        'p95': round(float(p95), 3),
+        'p99': round(float(p99), 3),
+        'mean': round(float(ms.mean()), 3),
+        'max': round(float(ms.max()), 3),
+    }
+
+
+# --- Frame Sets ---
+def synthetic_frames(count=30, width=1280, height=720, seed=0):
+    """Deterministic street-like frames: gradient background + random blocks."""
+    rng = np.random.default_rng(seed)
+    base = np.linspace(40, 200, height, dtype=np.uint8)[:, None, None]
+    frames = []
+    for _ in range(count):
+        frame = np.repeat(np.repeat(base, width, axis=1), 3, axis=2).copy()
+        for _ in range(12):
+            x, y = int(rng.integers(0, width - 100)), int(rng.integers(0, height - 100))
+            color = tuple(int(c) for c in rng.integers(0, 255, 3))
+            cv2.rectangle(frame, (x, y), (x + int(rng.integers(20, 300)), y + int(rng.integers(20, 300))), color, -1)
+        frames.append(frame)
+    return frames
+
+
+def recorded_frames(path, max_frames=100):
+    """Loads frames from a video file or image folder."""
+    frames = []
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            image = cv2.imread(os.path.join(path, name))
+            if image is not None:
+                frames.append(image)
+            if len(frames) >= max_frames:
+                break
+    else:
+        cap = cv2.VideoCapture(path)
+        while len(frames) < max_frames:
+            ret, image = cap.read()
+            if not ret:
+                break
+            frames.append(image)
+        cap.release()
+    if not frames:
+        raise IOError(f"No frames could be read from {path}")
+    return frames
+
+
+def encode_frames(frames):
+    """Frames are held JPEG-encoded so the decode stage is measured like a camera's MJPEG."""
+    return [cv2.imencode('.jpg', f, [cv2.IMWRITE_JPEG_QUALITY, 90])[1] for f in frames]
+
+
+# --- Stage Sinks ---
+def speech_sink():
+    """NavAssistCore with only its alert scheduling state (no TTS engine, mixer or model)."""
+    from alerts import AlertScheduler
+    from audio import PhrasePlayer
+    from main import NavAssistCore
+    core = NavAssistCore.__new__(NavAssistCore)
+    core.speech_interrupt = threading.Event()
+    core.phrases = PhrasePlayer(None, [], dict(config.AUDIO, phrase_cache=False))
+    core.alerts = AlertScheduler(core.interrupt_speech)
+    return core
+
+
+def photo_image_factory():
+    """Returns ImageTk.PhotoImage if a Tk display is available, else None."""
+    try:
+        import tkinter as tk
+        from PIL import ImageTk
+        root = tk.Tk()
+        root.withdraw()
+        return lambda img: ImageTk.PhotoImage(image=img, master=root)
+    except Exception as e:
+        print(f"⚠ No Tk display ({e}); 'display' stage excludes PhotoImage creation")
+        return None
+
+
+def run_benchmark(model, frames, iterations, make_photo=None, conf=0.4, focal_length=600):
+    timer = StageTimer()
+    processor = DetectionProcessor(model.names, focal_length)
+    encoded = encode_frames(frames)
+    sink = speech_sink()
+    detections = []
+
+    for i in range(iterations):
+        buf = encoded[i % len(encoded)]
+
+        with timer('decode'):
+            frame = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+        width = frame.shape[1]
+
+        with timer('inference'):
+            result = model(frame, conf=conf, verbose=False)[0]
+
+        with timer('postprocess'):
+            dets = processor.from_result(result, width)
+            top = processor.top(dets)
+            message, priority = "", 0
+            if top is not None:
+                class_name, dist, direction, group = processor.describe(dets[top])
+                priority = int(dets[top]['risk'])
+                message = sink.get_audio_phrase(class_name, dist, sink.DIRECTIONS[direction], group)
+        detections.append(len(dets))
+
+        with timer('draw'):
+            draw_detections(frame, dets, processor)
+
+        with timer('display'):
+            img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if make_photo:
+                make_photo(img)
+
+        with timer('speech_enqueue'):
+            if message:
+                sink.speak_warning(message, priority)
+        sink.alerts.clear()
+
+    return timer, detections
+
+
+def compare_filter(model, frames, iterations, make_photo, filtered):
+    """
+    Reruns the benchmark with the MODEL class subset, per-group thresholds and
+    max_det switched off (all classes at MODEL['conf']) and reports what the
+    filter saves in inference (incl. NMS) and post-processing.
+    """
+    saved_model, saved_overrides = dict(config.MODEL), dict(model.overrides)
+    config.MODEL.update(classes=None, group_conf={}, max_det=None)
+    for key in ('classes', 'max_det'):
+        model.overrides.pop(key, None)
+    try:
+        timer, detections = run_benchmark(model, frames, iterations, make_photo, conf=model_conf())
+    finally:
+        config.MODEL.clear()
+        config.MODEL.update(saved_model)
+        model.overrides.clear()
+        model.overrides.update(saved_overrides)
+
+    stages = timer.summary()
+    unfiltered = {stage: stages[stage] for stage in ('inference', 'postprocess')}
+    unfiltered['mean_detections'] = round(float(np.mean(detections)), 2)
+    return {
+        'filtered': filtered,
+        'unfiltered': unfiltered,
+        'saved_ms': {stage: round(unfiltered[stage]['p50'] - filtered[stage]['p50'], 3)
+                     for stage in ('inference', 'postprocess')},
+    }
+
+
+def compare_modes(video, seconds, stub_ms=None):
+    """
+    Frames/s of main.py windowed vs --headless on the same looping video,
+    each in its own process (the model is config.MODEL's unless stub_ms is given).
+    """
+    results = {}
+    for mode in ('windowed', 'headless'):
+        report = os.path.join(tempfile.gettempdir(), f'navassist_{mode}.json')
+        cmd = [sys.executable, 'main.py', '--source', video, '--unpaced', '--loop',
+               '--duration', str(seconds), '--report', report]
+        if mode == 'headless':
+            cmd.append('--headless')
+        if stub_ms is not None:
+            cmd += ['--stub', '--stub-ms', str(stub_ms)]
+        proc = subprocess.run(cmd, cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+        if proc.returncode or not os.path.exists(report):
+            results[mode] = {'error': (proc.stderr.strip().splitlines() or [f"exit code {proc.returncode}"])[-1]}
+            continue
+        with open(report) as f:
+            results[mode] = json.load(f)
+        os.remove(report)
+    if 'fps' in results['windowed'] and 'fps' in results['headless'] and results['windowed']['fps']:
+        results['gain'] = round(results['headless']['fps'] / results['windowed']['fps'], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NavAssist per-stage benchmark")
+    src = parser.add_mutually_exclusive_group()
+    src.add_argument('--stub', action='store_true', help="Use the deterministic stub detector (default)")
+    src.add_argument('--weights', help="Benchmark a real YOLO model, e.g. best.pt")
+    parser.add_argument('--backend', choices=('pytorch', 'onnx', 'openvino'), default=None,
+                        help="Runtime for --weights (default: config.MODEL['backend'])")
+    parser.add_argument('--density', type=int, default=30, help="Stub boxes per frame")
+    parser.add_argument('--stub-ms', type=float, default=0, help="CPU time the stub burns per frame")
+    parser.add_argument('--unmapped', type=int, default=0,
+                        help="Extra stub classes outside CLASS_TO_GROUP (e.g. 56 for an 80-class COCO model)")
+    parser.add_argument('--nms-iou', type=float, default=None, help="Run class-aware NMS in the stub, like YOLO")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--frames', help="Video file or image folder (default: synthetic frames)")
+    parser.add_argument('--max-frames', type=int, default=100)
+    parser.add_argument('--iterations', '-n', type=int, default=300)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Also measure process-pool throughput for 1..N workers")
+    parser.add_argument('--compare-modes', type=float, default=0, metavar='SECONDS',
+                        help="Also run main.py windowed and --headless for SECONDS each on the same input")
+    parser.add_argument('--compare-filter', action='store_true',
+                        help="Also measure without the MODEL class subset / per-group conf / max_det")
+    parser.add_argument('--output', '-o', default='bench_results.json')
+    args = parser.parse_args()
+
+    if args.weights:
+        from backends import load_model
+        model = load_model(args.backend, args.weights)
+        model_desc = f"{args.weights} ({args.backend or config.MODEL.get('backend', 'pytorch')})"
+        model_settings = dict(config.MODEL, backend=args.backend, weights=args.weights)
+    else:
+        stub = {'density': args.density, 'seed': args.seed, 'busy_ms': args.stub_ms, 'nms_iou': args.nms_iou}
+        if args.unmapped:
+            stub['names'] = dict(enumerate(list(config.CLASS_TO_GROUP) +
+                                           [f'unmapped_{i}' for i in range(args.unmapped)]))
+        model = apply_class_filter(StubDetector(**stub))
+        model_desc = f"stub(density={args.density}, seed={args.seed}, busy_ms={args.stub_ms})"
+        model_settings = dict(config.MODEL, stub=stub)
+
+    frames = recorded_frames(args.frames, args.max_frames) if args.frames else synthetic_frames(seed=args.seed)
+
+    make_photo = photo_image_factory()
+    run_benchmark(model, frames, args.warmup, make_photo, conf=model_conf())
+    timer, detections = run_benchmark(model, frames, args.iterations, make_photo, conf=model_conf())
+
+    stages = timer.summary()
+    report = {
+        'meta': {
+            'model': model_desc,
+            'frames': args.frames or 'synthetic',
+            'frame_shape': list(frames[0].shape),
+            'iterations': args.iterations,
+            'mean_detections': round(float(np.mean(detections)), 2),
+            'photoimage': make_photo is not None,
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'stages': {stage: stages.get(stage, {'n': 0}) for stage in STAGES},
+    }
+    if args.workers:
+        from workers import measure_scaling
+        report['workers'] = measure_scaling(frames, args.workers, model_settings, args.iterations)
+    if args.compare_filter:
+        filtered = {stage: report['stages'][stage] for stage in ('inference', 'postprocess')}
+        filtered['mean_detections'] = report['meta']['mean_detections']
+        report['class_filter'] = compare_filter(model, frames, args.iterations, make_photo, filtered)
+    if args.compare_modes:
+        video = args.frames
+        if not video or os.path.isdir(video):
+            video = os.path.join(tempfile.gettempdir(), 'navassist_bench.avi')
+            h, w = frames[0].shape[:2]
+            writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*'MJPG'), 30, (w, h))
+            for frame in frames:
+                writer.write(frame)
+            writer.release()
+        report['modes'] = compare_modes(os.path.abspath(video), args.compare_modes,
+                                        None if args.weights else args.stub_ms)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'stage':<16}{'p50':>10}{'p95':>10}{'p99':>10}   (ms)")
+    for stage, s in report['stages'].items():
+        if s['n']:
+            print(f"{stage:<16}{s['p50']:>10.3f}{s['p95']:>10.3f}{s['p99']:>10.3f}")
+    for n, s in report.get('workers', {}).items():
+        print(f"{n} worker(s): {s['fps']:.1f} FPS inference ({s['speedup']:.2f}x)")
+    if 'class_filter' in report:
+        c = report['class_filter']
+        for stage, saved in c['saved_ms'].items():
+            print(f"Class filter {stage}: p50 {c['unfiltered'][stage]['p50']:.3f} -> "
+                  f"{c['filtered'][stage]['p50']:.3f} ms ({saved:+.3f} ms saved)")
+        print(f"Class filter detections per frame: {c['unfiltered']['mean_detections']} -> "
+              f"{c['filtered']['mean_detections']}")
+    for mode, s in report.get('modes', {}).items():
+        if mode == 'gain':
+            print(f"Headless throughput gain: {s:.2f}x")
+        elif 'fps' in s:
+            print(f"main.py {mode}: {s['fps']:.1f} FPS ({s['frames']} frames in {s['elapsed_s']}s)")
+        else:
+            print(f"⚠ main.py {mode} failed: {s['error']}")
+    print(f"✓ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
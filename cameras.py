@@ -0,0 +1,347 @@
+"""
+Camera capture: one thread per configured source.
+
+Each camera negotiates its pixel format / size / FPS explicitly, grabs
+into a preallocated ring of reusable buffers (no per-frame allocation),
+timestamps frames at grab time and drains frames that queued up in the
+driver while the thread was stalled, so consumers always get the
+freshest frame. A video file can stand in for a camera: it is played at
+its native frame rate and drops frames like a live device.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import config  # Imports your config.py settings
+from detection import DetectionProcessor
+from pipeline import FramePacket
+
+
+class FrameRing:
+    """
+    Preallocated frame buffers behind a newest-frame handoff (LatestSlot
+    semantics). A frame handed out by get() is reference counted: its
+    buffer is only reused after every holder called release(image) (extra
+    holders call retain(image) first). While all buffers are held, frames
+    are grabbed into fresh allocations (counted as starved) instead.
+    """
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = max(size, 3)  # One being written, one waiting, one held
+        self.buffers = [None] * self.size
+        self.dropped = 0      # Frames replaced before the consumer took them
+        self.starved = 0      # Grabs with no free buffer (fell back to allocating)
+        self._free = deque(range(self.size))
+        self._refs = {}       # id(buffer) -> [slot, holders] of frames handed out
+        self._packet = None
+        self._slot = None
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Capture side: (slot, buffer) to decode into; buffer is None before the first frame."""
+        with self._cond:
+            if not self._free:
+                self.starved += 1
+                return None, None
+            slot = self._free.popleft()
+        return slot, self.buffers[slot]
+
+    def discard(self, slot):
+        """Returns an acquired buffer that was not published (failed grab)."""
+        if slot is not None:
+            with self._cond:
+                self._free.append(slot)
+
+    def put(self, slot, packet):
+        with self._cond:
+            if slot is not None:
+                self.buffers[slot] = packet.image  # Adopts first / resized allocations
+            if self._packet is not None:
+                self.dropped += 1
+                if self._slot is not None:
+                    self._free.append(self._slot)
+            self._packet, self._slot = packet, slot
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Waits for a fresh frame. Returns None on timeout or when closed."""
+        with self._cond:
+            if self._packet is None and not self._closed:
+                self._cond.wait_for(lambda: self._packet is not None or self._closed, timeout)
+            packet, slot = self._packet, self._slot
+            if packet is None:
+                return None
+            self._packet = self._slot = None
+            if slot is not None:
+                self._refs[id(packet.image)] = [slot, 1]
+            return packet
+
+    def get_nowait(self):
+        return self.get(timeout=0)
+
+    def retain(self, image):
+        """Adds a holder to a frame handed out by get() (no-op for other arrays)."""
+        with self._cond:
+            ref = self._refs.get(id(image))
+            if ref is not None:
+                ref[1] += 1
+
+    def release(self, image):
+        """Drops one holder; the last one returns the buffer to the ring."""
+        with self._cond:
+            ref = self._refs.get(id(image))
+            if ref is None:
+                return
+            ref[1] -= 1
+            if ref[1] <= 0:
+                del self._refs[id(image)]
+                self._free.append(ref[0])
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def _fourcc_name(code):
+    code = int(code)
+    return ''.join(chr((code >> 8 * i) & 0xFF) for i in range(4)).strip('\0') or '?'
+
+
+class Camera:
+    """
+    One video source (device index, stream URL or file) read on its own
+    thread. Only the newest frame is kept, so a slow consumer never sees
+    a stale backlog. The camera closes (read() on the rig returns False)
+    when the source cannot be opened, a file ends, or a device fails
+    `max_failed_grabs` grabs in a row.
+    """
+
+    def __init__(self, settings, index=0):
+        self.settings = settings
+        self.index = index
+        self.name = settings.get('name', f"camera{index}")
+        self.source = settings.get('source', 0)
+        self.is_file = isinstance(self.source, str) and os.path.isfile(self.source)
+
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.is_file:
+            self.negotiate()
+        self.fps = self.settings.get('fps') or self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        # Files stand in for a live camera: played at their own rate, not as fast as they decode
+        self.realtime = self.is_file and settings.get('realtime', True)
+
+        self.frames = FrameRing(self.name, settings.get('buffers', 4))
+        self.grabbed = 0
+        self.drained = 0      # Stale frames discarded from the driver queue
+        self.closed = False
+        self.pacer = None     # Callable -> minimum seconds between grabs (duty cycling), 0 = device rate
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name=f"capture-{self.name}", daemon=True)
+
+    def negotiate(self):
+        """Requests format, size, FPS and driver queue depth, then reports what the device accepted."""
+        s = self.settings
+        requested = {}
+        # FOURCC first: V4L2 picks the available sizes / rates per format
+        if s.get('fourcc'):
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*s['fourcc']))
+            requested['fourcc'] = s['fourcc']
+        for key, prop in (('width', cv2.CAP_PROP_FRAME_WIDTH), ('height', cv2.CAP_PROP_FRAME_HEIGHT),
+                          ('fps', cv2.CAP_PROP_FPS)):
+            if s.get(key):
+                self.cap.set(prop, s[key])
+                requested[key] = s[key]
+        if s.get('driver_buffers'):
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, s['driver_buffers'])
+        if not self.cap.isOpened():
+            return
+
+        actual = {
+            'fourcc': _fourcc_name(self.cap.get(cv2.CAP_PROP_FOURCC)),
+            'width': int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': round(self.cap.get(cv2.CAP_PROP_FPS), 1),
+        }
+        mismatched = [k for k, v in requested.items() if k in actual and actual[k] != v]
+        mark = "⚠" if mismatched else "✓"
+        print(f"{mark} Camera '{self.name}': {actual['width']}x{actual['height']} {actual['fourcc']} "
+              f"@ {actual['fps']} fps" + (f" (requested {requested})" if mismatched else ""))
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def drain(self):
+        """
+        Discards frames the driver queued while this thread was busy: queued
+        frames return from grab() at once, a live one takes about a frame
+        interval. Returns the grab time of the last grab (None on failure).
+        """
+        fast = 0.25 / self.fps
+        limit = self.settings.get('driver_buffers') or 4
+        for _ in range(limit + 1):
+            t0 = time.perf_counter()
+            if not self.cap.grab():
+                return None
+            if time.perf_counter() - t0 >= fast:
+                return time.time()
+            self.drained += 1
+        return time.time()
+
+    def throttle(self, last_grab):
+        """Waits while the pacer asks for fewer grabs; re-checked often so a wake-up resumes quickly."""
+        while self.pacer is not None and last_grab is not None and not self._stopped.is_set():
+            remaining = last_grab + self.pacer() - time.monotonic()
+            if remaining <= 0:
+                return
+            self._stopped.wait(min(remaining, 0.05))
+
+    def _loop(self):
+        frame_id = 0
+        interval = 1.0 / self.fps
+        next_grab = time.monotonic()
+        last_grab = None
+        failures = 0
+        max_failures = self.settings.get('max_failed_grabs', 100)
+        if not self.cap.isOpened():
+            self._stopped.set()  # Nothing to grab from
+        while not self._stopped.is_set():
+            if not self.is_file:
+                self.throttle(last_grab)  # Stale frames queued meanwhile are drained below
+            if self.realtime:
+                delay = next_grab - time.monotonic()
+                if delay > 0:
+                    self._stopped.wait(delay)
+                next_grab = max(next_grab + interval, time.monotonic() - interval)
+
+            stalled = not self.is_file and last_grab is not None and time.monotonic() - last_grab > 2 * interval
+            if stalled:
+                timestamp = self.drain()
+                ok = timestamp is not None
+            else:
+                ok = self.cap.grab()
+                timestamp = time.time()  # Grab time, before decoding
+            last_grab = time.monotonic()
+            if not ok:
+                if self.is_file and self.settings.get('loop') and self.grabbed:
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Loop the recording
+                    continue
+                if self.is_file:
+                    break  # End of the recording
+                failures += 1
+                if failures >= max_failures:
+                    print(f"⚠ Camera '{self.name}' lost after {failures} failed grabs")
+                    break
+                time.sleep(0.01)
+                continue
+            failures = 0
+
+            slot, buffer = self.frames.acquire()
+            ok, image = self.cap.retrieve(buffer) if buffer is not None else self.cap.retrieve()
+            if not ok:
+                self.frames.discard(slot)
+                continue
+            frame_id += 1
+            self.grabbed += 1
+            self.frames.put(slot, FramePacket(frame_id, timestamp, image))
+        self.closed = True
+        self.frames.close()
+
+    def stats(self):
+        return {'grabbed': self.grabbed, 'dropped': self.frames.dropped,
+                'drained': self.drained, 'starved': self.frames.starved}
+
+    def release(self):
+        self._stopped.set()
+        self.frames.close()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        self.cap.release()
+
+
+class CameraRig:
+    """
+    All configured cameras behind a VideoCapture-like `read()`.
+    Reads are paced by the primary (first) camera; other cameras contribute
+    their newest frame, or None when nothing new arrived since the last tick.
+    `timestamp` is the primary frame's grab time. Images returned by read()
+    belong to the camera rings: pass them to release_frames() when done
+    (and to retain_frames() once per extra holder).
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or config.CAMERAS
+        self.cameras = [Camera(s, i) for i, s in enumerate(self.settings)]
+        self.timestamp = None
+        for camera in self.cameras:
+            if not camera.isOpened():
+                print(f"⚠ Camera '{camera.name}' ({camera.source}) could not be opened")
+            camera.start()
+
+    @property
+    def primary(self):
+        return self.cameras[0]
+
+    def isOpened(self):
+        return self.primary.isOpened()
+
+    def read(self):
+        """Returns (ok, images) with one image (or None) per camera."""
+        while True:
+            packet = self.primary.frames.get(timeout=0.5)
+            if packet is not None:
+                break
+            if self.primary.closed:
+                return False, None
+        self.timestamp = packet.timestamp
+        images = [packet.image]
+        for camera in self.cameras[1:]:
+            other = camera.frames.get_nowait()
+            images.append(other.image if other is not None else None)
+        return True, images
+
+    def set_pacer(self, pacer):
+        """`pacer()` -> minimum seconds between grabs on the live cameras (e.g. DutyCycler.capture_interval)."""
+        for camera in self.cameras:
+            camera.pacer = pacer
+
+    def retain_frames(self, images):
+        for camera, image in zip(self.cameras, images):
+            if image is not None:
+                camera.frames.retain(image)
+
+    def release_frames(self, images):
+        """Hands one tick's images (as returned by read()) back to the camera rings."""
+        for camera, image in zip(self.cameras, images):
+            if image is not None:
+                camera.frames.release(image)
+
+    def stats(self):
+        return {camera.name: camera.stats() for camera in self.cameras}
+
+    def release(self):
+        for camera in self.cameras:
+            camera.release()
+
+
+# --- Per-camera settings (usable before the devices are opened) ---
+def camera_processors(names, settings=None):
+    """One DetectionProcessor per camera, each with its own focal length."""
+    return [DetectionProcessor(names, s.get('focal_length', 600)) for s in (settings or config.CAMERAS)]
+
+
+def camera_groups(settings=None):
+    return [s.get('groups') for s in (settings or config.CAMERAS)]
+
+
+def camera_directions(default, settings=None):
+    """Spoken (left, ahead, right) labels per camera; `default` when not overridden."""
+    return [tuple(s.get('directions') or default) for s in (settings or config.CAMERAS)]
@@ -5,18 +5,64 @@ MODEL = {
     'name': 'YOLOv8n',
     'weights': 'best.pt',
     'conf': 0.4,  # Increased confidence to reduce false alarms
+    'classes': 'mapped',         # Classes the model reports: 'mapped' = CLASS_TO_GROUP keys, None = all, or a list of names
+    'group_conf': {'G1': 0.25, 'G8': 0.55},  # Per-group confidence thresholds ('conf' for the others)
+    'max_det': 50,               # Detections kept per frame (highest confidence first)
+    'backend': 'pytorch',        # 'pytorch' | 'onnx' | 'openvino' (exported once, cached next to weights)
+    'imgsz': 640,                # Export input size
+    'int8': False,               # Post-training INT8 quantization (onnx / openvino)
+    'calibration_dir': 'calibration',  # Images used for INT8 calibration
+    'warmup_runs': 2,            # Warmup inferences per input size before the camera starts
 }
 
 # ============ RISK GROUPS (Source: 33-34) ============
-# Defines how the system reacts to each group
+# Defines how the system reacts to each group. Compiled into a lookup table
+# by risk.py and reloaded live when this file is saved (see HOT_RELOAD).
+#   'risk':        base risk level (4 = critical ... 1 = info)
+#   'near':        [(distance_m, risk)] - closer than distance_m -> risk (nearest band wins)
+#   'phrase':      spoken template; {class_name}, {distance}, {direction}
+#   'near_phrase': [(distance_m, template)] - used closer than distance_m
 RISK_CONFIG = {
-    'G1': {'severity': 'VERY_HIGH', 'action': 'STOP'},    # Critical (Fire, Weapons)
-    'G2': {'severity': 'LOW',       'action': 'INFO'},    # Navigation (Path, Stairs)
-    'G3': {'severity': 'HIGH',      'action': 'REROUTE'}, # Construction (Holes, Cones)
-    'G4': {'severity': 'MEDIUM',    'action': 'WARN'},    # Indoor (Chairs, Tables)
-    'G6': {'severity': 'VERY_HIGH', 'action': 'STOP'},    # Traffic (Cars, Buses)
-    'G7': {'severity': 'MED_HIGH',  'action': 'TRACK'},   # Living (People, Dogs)
-    'G8': {'severity': 'LOW',       'action': 'INFO'}     # Static (Trees, Walls)
+    'G1': {'severity': 'VERY_HIGH', 'action': 'STOP',     # Critical (Fire, Weapons)
+           'risk': 4},
+    'G2': {'severity': 'LOW',       'action': 'INFO',     # Navigation (Path, Stairs)
+           'risk': 1, 'near': [(1.0, 3)]},
+    'G3': {'severity': 'HIGH',      'action': 'REROUTE',  # Construction (Holes, Cones)
+           'risk': 1, 'near': [(2.0, 3)],
+           'phrase': "Caution. Construction hazard {distance} meters {direction}."},
+    'G4': {'severity': 'MEDIUM',    'action': 'WARN',     # Indoor (Chairs, Tables)
+           'risk': 2, 'near': [(1.0, 3)]},
+    'G6': {'severity': 'VERY_HIGH', 'action': 'STOP',     # Traffic (Cars, Buses)
+           'risk': 1, 'near': [(4.0, 4)],
+           'near_phrase': [(3.0, "Stop! {class_name} approaching {direction}, {distance} meters.")]},
+    'G7': {'severity': 'MED_HIGH',  'action': 'TRACK',    # Living (People, Dogs)
+           'risk': 2, 'near': [(1.0, 3)]},
+    'G8': {'severity': 'LOW',       'action': 'INFO',     # Static (Trees, Walls)
+           'risk': 1, 'near': [(1.0, 3)]},
+}
+
+# Phrase used when neither the class nor the group defines one
+DEFAULT_PHRASE = "{class_name} {distance} meters {direction}."
+
+# Per-class phrase overrides
+CLASS_PHRASES = {
+    'fire': "Warning! Fire detected {distance} meters {direction}. Stop immediately.",
+    'gun': "Danger! Weapon detected {distance} meters {direction}. Move away.",
+    'knife': "Danger! Weapon detected {distance} meters {direction}. Move away.",
+}
+
+# The phrases above are gui_app.py's wording; front ends listed here keep their own.
+#   'groups':  per group, 'phrase' / 'near_phrase' replacing RISK_CONFIG's
+#   'classes': replaces CLASS_PHRASES
+FRONTEND_PHRASES = {
+    'main': {
+        'groups': {
+            'G1': {'phrase': "Warning! {class_name} detected {distance} meters {direction}. Stop."},
+            'G3': {'phrase': "Caution, construction hazard {distance} meters {direction}."},
+            'G6': {'near_phrase': [(3.0, "Stop! {class_name} approaching {direction}.")]},
+        },
+        'classes': {},
+    },
 }
 
 # ============ CLASS TO GROUP MAPPING (Source: 41-56) ============
@@ -52,4 +98,212 @@ OBJECT_HEIGHTS = {
     'chair': 0.9, 'table': 0.75, 'bottle': 0.25,
     'fire': 0.5, 'cone': 0.7, 'pole': 3.0, 'tree': 5.0,
     'default': 1.0
-}
\ No newline at end of file
+}
+# ============ CAMERAS ============
+# First entry is the primary camera (paces the loop, shown in the GUI).
+# All cameras share one batched model call per tick.
+CAMERAS = [
+    {
+        'name': 'forward',
+        'source': 0,              # Device index, stream URL or video file
+        'width': 1280,
+        'height': 720,
+        'fourcc': 'MJPG',         # Pixel format to negotiate ('MJPG', 'YUYV'); None = driver default
+        'fps': 30,                # Requested device rate (files: playback rate, None = file's own)
+        'driver_buffers': 1,      # Driver-side queue depth (older frames are drained)
+        'buffers': 4,             # Reusable frame buffers in the capture ring (allocates while all are held)
+        'realtime': True,         # Video files play at their frame rate like a live camera
+        'loop': False,            # Restart video files at the end (soak tests)
+        'max_failed_grabs': 100,  # Consecutive failed grabs (~10 ms apart) before a device counts as lost
+        'focal_length': 600,      # Pixels, used for the distance estimate
+        'directions': None,       # Spoken (left, center, right) labels; None = front end default
+        'groups': None,           # Only report these risk groups; None = all
+    },
+    # Downward-facing camera for curbs, stairs and manholes:
+    # {
+    #     'name': 'down', 'source': 1, 'width': 640, 'height': 480, 'focal_length': 500,
+    #     'directions': ['below left', 'below', 'below right'], 'groups': ['G2', 'G3'],
+    # },
+]
+
+# ============ TRACKING ============
+# Stable object IDs, smoothed distance and time-to-collision between detector runs
+TRACKING = {
+    'enabled': True,
+    'detect_every': 2,           # Run YOLO every N frames, propagate tracks in between
+    'iou_threshold': 0.3,        # Minimum IoU to match a detection to a track
+    'max_missed': 3,             # Detector runs a track may go unmatched before it is dropped
+    'process_noise': 1.0,        # Kalman acceleration noise (m/s^2)
+    'measurement_noise': 0.25,   # Distance measurement variance (m^2)
+    'min_approach_speed': 0.2,   # m/s - slower objects get no time-to-collision
+    'ttc_alert_s': 3.0,          # Time-to-collision that escalates risk
+    'ttc_risk': {'G6': 4, 'G7': 3},  # Risk level used when an approaching object is under ttc_alert_s
+}
+
+# ============ ADAPTIVE RESOLUTION ============
+# Steps the model input size to hold a per-frame inference budget
+RESOLUTION = {
+    'enabled': True,
+    'sizes': [320, 416, 512, 640],   # Allowed imgsz values (multiples of 32)
+    'initial': 640,
+    'budget_ms': 120,                # Target inference latency per frame
+    'window': 8,                     # Latency samples averaged before deciding
+    'cooldown_frames': 15,           # Minimum frames between size changes
+    'step_down_ratio': 1.1,          # Step down when avg > budget * ratio
+    'step_up_ratio': 0.85,           # Step up when predicted cost < budget * ratio
+    'hazard_groups': ['G1', 'G6'],   # Hold a high resolution while these are in view
+    'hazard_size': 640,
+    'hazard_hold_s': 2.0,
+}
+
+# ============ CORRIDOR TILING ============
+# Small distant hazards vanish when the whole frame is shrunk to imgsz. The
+# walking corridor (the 'ahead' third) is split into overlapping tiles that
+# are added, round-robin, to model runs at full tile resolution.
+TILING = {
+    'enabled': False,
+    'rows': 3,                   # Corridor tiles, top to bottom
+    'overlap': 0.2,              # Share of a tile's height overlapping its neighbour
+    'vertical': (0.1, 1.0),      # Corridor's vertical extent (fraction of frame height)
+    'tiles_per_run': 1,          # Budget: tiles added to each model call
+    'every_runs': 1,             # Add tiles to every Nth model run only
+    'iou': 0.5,                  # NMS IoU threshold when merging tile and full-frame boxes
+    'edge_px': 2,                # Tile boxes this close to an inner cut are dropped (partial objects)
+}
+
+# ============ MOTION GATING ============
+# Skips inference on static scenes and reuses the previous detections
+MOTION = {
+    'enabled': True,
+    'thumb_size': (64, 36),        # Downsampled grayscale frame used for differencing (w, h)
+    'block': 4,                    # Block size (thumbnail pixels) of the change map
+    'pixel_threshold': 12,         # Gray-level change that marks a pixel as moved
+    'changed_blocks': 0.02,        # Run the model when this share of blocks changed
+    'max_staleness_s': 1.0,        # Always re-run the model after this long
+    'critical_staleness_s': 0.3,   # ...or this long while critical groups are in view
+    'critical_groups': ['G1', 'G6'],
+}
+
+# ============ AUDIO ============
+AUDIO = {
+    'rate': 150,                   # pyttsx3 words per minute
+    'phrase_cache': True,          # Play alerts from pre-synthesized fragments via pygame.mixer
+    'cache_size': 256,             # Fragments kept in memory (LRU)
+    'distance_step': 0.5,          # Spoken distances are rounded to this step (m)
+    'max_prewarm_distance': 10.0,  # Distances pre-synthesized at startup
+    'fragment_gap_ms': 40,         # Silence between joined fragments
+}
+
+# ============ EARCONS ============
+# Short stereo tones fired from the detection loop, ahead of the spoken phrase:
+# pitch = risk level, pulses = distance band, pan = horizontal position
+EARCONS = {
+    'enabled': True,
+    'tones_hz': {4: 1320, 3: 880, 2: 587},  # Risk levels that get an earcon, and their pitch
+    'band_limits_m': [1.5, 4.0],   # Distance bands: < 1.5 m, < 4 m, farther...
+    'pulses': [3, 2, 1],           # ...and the pulses played for each
+    'pulse_ms': 60,
+    'gap_ms': 40,
+    'pan_steps': 5,                # Stereo positions across the frame width
+    'volume': 0.5,
+    'repeat_s': 1.0,               # Minimum gap between earcons for the same object
+    'speak_min_risk': 1,           # Alerts below this level get only the earcon (no speech)
+}
+
+# ============ ALERT SCHEDULING ============
+# Keyed by risk level (4 = critical ... 1 = info)
+ALERTS = {
+    'preempt_priority': 4,                        # Interrupts lower-priority speech
+    'dedup_s': {4: 2.0, 3: 4.0, 2: 6.0, 1: 8.0},  # Same class+direction is not repeated within this window
+    'ttl_s': {4: 1.5, 3: 2.5, 2: 3.0, 1: 3.0},    # Alerts older than this are dropped, not spoken
+    'max_pending': 8,                             # Lowest-priority pending alerts are dropped beyond this
+    'latency_target_ms': {4: 100, 3: 250},        # Enqueue -> playback target per level
+    'latency_window': 500,                        # Latency samples kept per level
+}
+
+# ============ DISPLAY ============
+DISPLAY = {
+    'max_fps': 15,   # GUI render/refresh cap, independent of the inference rate
+}
+
+# ============ METRICS ============
+# Prometheus text at http://127.0.0.1:<http_port>/metrics and/or a rolling CSV
+METRICS = {
+    'enabled': True,                  # Stage histograms and counters (cheap; exporters below are opt-in)
+    'http_host': '127.0.0.1',         # Endpoint only listens locally
+    'http_port': None,                # e.g. 9108 to serve /metrics
+    'csv_path': None,                 # e.g. 'metrics.csv' for a rolling log
+    'csv_interval_s': 10,             # One snapshot per interval (percentiles cover the interval)
+    'csv_max_bytes': 5_000_000,       # Rotate past this size...
+    'csv_backups': 3,                 # ...keeping this many old files
+    'latency_buckets_ms': [1, 2, 5, 10, 20, 35, 50, 75, 100, 150, 250, 500, 1000, 2500],
+    'detection_buckets': [0, 1, 2, 3, 5, 8, 12, 20, 50],
+}
+
+# ============ DETECTION LOG ============
+# Fixed-width binary log of every detection; replay with detection_log.py
+DETECTION_LOG = {
+    'enabled': False,
+    'path': 'logs/session_%Y%m%d_%H%M%S.navlog',  # strftime pattern, one file per session
+    'preallocate_records': 500_000,              # File grows in chunks of this many records (35 bytes each)
+    'flush_every': 30,                           # Header counts refreshed every N frames
+}
+
+# ============ INFERENCE WORKERS ============
+# main.py only: frames are shared with worker processes through shared memory
+WORKERS = {
+    'processes': 0,                     # 0 = in-process inference; N = N worker processes, one model each
+    'jobs_per_worker': 2,               # Frames queued ahead per worker (ring = processes x this x cameras)
+    'max_frame_shape': (720, 1280, 3),  # Size of one shared-memory slot
+    'job_timeout_s': 10.0,              # Worker holding a job longer than this is killed + respawned, its jobs fail
+    'max_restarts': 3,                  # Workers respawned after dying; then the pool raises
+}
+
+# ============ POWER (duty cycling for main.py) ============
+# Lowers the detection rate while nothing hazardous has been seen recently
+POWER = {
+    'enabled': False,
+    'max_fps': None,               # ACTIVE rate (None = as fast as possible)
+    'idle_fps': 4,                 # After idle_after_s without a wake-up detection (drawing suspended)
+    'min_fps': 1,                  # After sleep_after_s
+    'idle_after_s': 10.0,
+    'sleep_after_s': 60.0,
+    'wake_groups': ['G1', 'G3', 'G6'],  # Any of these returns to ACTIVE immediately...
+    'near_m': 1.5,                 # ...as does any object closer than this...
+    'wake_risk': 3,                # ...or any detection at this risk level or above
+    'suspend_drawing': True,       # Skip boxes / imshow outside ACTIVE
+    'throttle_capture': True,      # Live cameras also grab / decode at the IDLE / SLEEP rate
+}
+
+# ============ STREAMING SERVER ============
+# `python main.py --serve`: annotated MJPEG video and SSE detection events
+STREAM = {
+    'enabled': False,               # Same as --serve
+    'host': '127.0.0.1',            # '0.0.0.0' to allow other machines on the local network
+    'port': 8090,
+    'max_fps': 15,                  # Frames offered to viewers per second (each encoded once)
+    'jpeg_quality': 75,
+    'max_client_buffer': 1_000_000, # Bytes unsent to a viewer before it skips frames
+    'event_queue': 64,              # Events buffered per subscriber before the oldest are dropped
+}
+
+# ============ SOAK TEST (soak.py) ============
+SOAK = {
+    'duration_s': 8 * 3600,        # Default run length (--duration overrides)
+    'interval_s': 60,              # Seconds between memory / latency samples
+    'warmup_s': 300,               # Growth is measured from the first sample after this
+    'traceback_frames': 5,         # tracemalloc stack depth per allocation site
+    'top_sites': 25,               # Allocation growth sites in the report
+    'max_rss_growth_mb': 100,      # Fail if RSS grows more than this after warmup
+    'max_p95_growth': 1.5,         # Fail if a stage's p95 ends this many times higher than it started
+    'stages': ['capture', 'detect', 'inference', 'render', 'speech', 'frame_age'],
+    'reservoir': 2048,             # Raw timings kept per stage and interval for p50 / p95
+}
+
+# ============ HOT RELOAD ============
+# RISK_CONFIG, phrases, CLASS_TO_GROUP and OBJECT_HEIGHTS are re-read when this
+# file is saved (no restart). Other sections still need a restart.
+HOT_RELOAD = {
+    'enabled': True,
+    'interval_s': 1.0,   # How often the file's modification time is checked
+}
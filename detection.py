@@ -0,0 +1,208 @@
+import cv2
+import numpy as np
+import config  # Imports your config.py settings
+import risk
+
+# Group ids used in the lookup arrays (index into this tuple)
+GROUPS = tuple(config.RISK_CONFIG.keys())
+GROUP_INDEX = {g: i for i, g in enumerate(GROUPS)}
+
+# Direction codes: 0 = left third, 1 = center third, 2 = right third
+LEFT, AHEAD, RIGHT = 0, 1, 2
+DIRECTION_NAMES = ('left', 'ahead', 'right')
+
+# One row per detected box
+DETECTION_DTYPE = np.dtype([
+    ('cls', np.int32),
+    ('conf', np.float32),
+    ('x1', np.int32), ('y1', np.int32), ('x2', np.int32), ('y2', np.int32),
+    ('dist', np.float64),
+    ('direction', np.int8),
+    ('group', np.int8),
+    ('risk', np.int8),
+])
+
+# Visualization colors (BGR) per risk level
+RISK_COLORS = {4: (0, 0, 255), 3: (0, 165, 255)}
+DEFAULT_COLOR = (0, 255, 0)
+
+
+def class_names(names):
+    """model.names is {id: name}; a plain list is accepted as well."""
+    if isinstance(names, dict):
+        return [names.get(i, str(i)) for i in range(max(names) + 1)] if names else []
+    return list(names)
+
+
+def model_conf(settings=None):
+    """Confidence the model runs at: the lowest of MODEL['conf'] and the per-group thresholds."""
+    settings = settings or config.MODEL
+    return min([settings['conf'], *settings.get('group_conf', {}).values()])
+
+
+class ClassFilter:
+    """
+    Active class subset, per-group confidence thresholds and per-frame
+    detection cap from config.MODEL. `classes` / `max_det` are handed to
+    the model when it is loaded, so inactive classes are dropped before
+    NMS; the model runs at model_conf() and keep() applies each group's
+    own threshold (MODEL['conf'] for groups without one).
+    """
+
+    def __init__(self, names, settings=None, class_to_group=None):
+        settings = settings or config.MODEL
+        class_to_group = config.CLASS_TO_GROUP if class_to_group is None else class_to_group
+        names = class_names(names)
+        group_conf = settings.get('group_conf', {})
+        self.thresholds = np.array([group_conf.get(class_to_group.get(n, 'G8'), settings['conf'])
+                                    for n in names], dtype=np.float32)
+
+        subset = settings.get('classes')  # None = all, 'mapped' = CLASS_TO_GROUP, or a list of names
+        self.active = np.ones(len(names), dtype=bool)
+        if subset is not None:
+            wanted = set(class_to_group) if subset == 'mapped' else set(subset)
+            active = np.array([n in wanted for n in names], dtype=bool)
+            if active.any():
+                self.active = active
+            else:
+                print("⚠ MODEL['classes'] matches none of the model's classes; keeping all")
+        self.thresholds[~self.active] = np.inf
+        self.classes = None if self.active.all() else np.flatnonzero(self.active).tolist()
+        self.max_det = settings.get('max_det')
+
+    def kwargs(self):
+        """Predict arguments for the model (ultralytics `classes` / `max_det`)."""
+        kwargs = {}
+        if self.classes is not None:
+            kwargs['classes'] = self.classes
+        if self.max_det:
+            kwargs['max_det'] = int(self.max_det)
+        return kwargs
+
+    def keep(self, cls, conf):
+        """Indices of the boxes passing their group's threshold, at most `max_det`, in input order."""
+        keep = np.flatnonzero(conf >= self.thresholds[cls])
+        if self.max_det and len(keep) > self.max_det:
+            keep = np.sort(keep[np.argsort(-conf[keep], kind='stable')[:self.max_det]])
+        return keep
+
+
+class DetectionProcessor:
+    """
+    Batched post-processing shared by the GUI and headless front ends.
+    Class-id indexed lookup tables are built from config.py so every
+    frame is scored with a handful of array operations instead of a
+    per-box Python loop. They are rebuilt when risk.py reloads config.py.
+    """
+
+    def __init__(self, names, focal_length=600):
+        self.names = class_names(names)
+        self.focal_length = focal_length
+        self._build()
+
+    def _build(self):
+        """(Re)builds the lookup tables from the live risk table's config snapshot."""
+        table = risk.table()
+        heights = table.object_heights
+        default_h = heights.get('default', 1.0)
+        self.heights = np.array([heights.get(n, default_h) for n in self.names], dtype=np.float64)
+        self.groups = np.array([GROUP_INDEX[table.class_to_group.get(n, 'G8')] for n in self.names],
+                               dtype=np.int8)
+        self.class_filter = ClassFilter(self.names, table.model, table.class_to_group)
+        self.table = table
+
+    def process(self, xyxy, cls, conf, frame_width, filter=True):
+        """
+        xyxy: (N, 4) boxes, cls: (N,) class ids, conf: (N,) scores.
+        Returns a DETECTION_DTYPE structured array of the boxes passing
+        their group's confidence threshold (at most MODEL['max_det']), or
+        of all N boxes in input order with filter=False.
+        """
+        if self.table is not risk.table():
+            self._build()
+        xyxy = np.asarray(xyxy).reshape(-1, 4).astype(np.int32)
+        cls = np.asarray(cls).astype(np.int32)
+        conf = np.asarray(conf, dtype=np.float32)
+        if filter:
+            keep = self.class_filter.keep(cls, conf)
+            if len(keep) < len(cls):
+                xyxy, cls, conf = xyxy[keep], cls[keep], conf[keep]
+        dets = np.empty(len(cls), dtype=DETECTION_DTYPE)
+        if len(dets) == 0:
+            return dets
+
+        dets['cls'] = cls
+        dets['conf'] = conf
+        dets['x1'], dets['y1'], dets['x2'], dets['y2'] = xyxy.T
+
+        # --- Distance: (Real_Height * Focal_Length) / Image_Height ---
+        bbox_h = (xyxy[:, 3] - xyxy[:, 1]).astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dist = np.round(self.heights[cls] * self.focal_length / bbox_h, 1)
+        dets['dist'] = np.where(bbox_h > 0, dist, 0.0)
+
+        # --- Direction: which third of the frame holds the box center ---
+        dets['direction'] = self.directions(xyxy[:, 0], xyxy[:, 2], frame_width)
+
+        # --- Risk ---
+        dets['group'] = self.groups[cls]
+        dets['risk'] = self.score(dets['group'], dets['dist'])
+        return dets
+
+    def directions(self, x1, x2, frame_width):
+        """Direction code per box from the horizontal center."""
+        center = (np.asarray(x1) + np.asarray(x2)) / 2
+        third = frame_width / 3
+        return np.where(center < third, LEFT, np.where(center > third * 2, RIGHT, AHEAD))
+
+    def score(self, group, dist):
+        """Vectorized risk level from the compiled RISK_CONFIG table."""
+        return self.table.risk(group, dist)
+
+    def from_result(self, result, frame_width):
+        """Pulls boxes out of one ultralytics Result in a single transfer."""
+        boxes = result.boxes
+        return self.process(boxes.xyxy.cpu().numpy(), boxes.cls.cpu().numpy(),
+                            boxes.conf.cpu().numpy(), frame_width)
+
+    def top(self, dets):
+        """Index of the highest-risk detection (first on ties), or None."""
+        if len(dets) == 0:
+            return None
+        return int(np.argmax(dets['risk']))
+
+    def describe(self, det):
+        """Returns (class_name, dist, direction_code, group) for one detection row."""
+        return (self.class_name(int(det['cls'])), float(det['dist']),
+                int(det['direction']), self.group_name(int(det['group'])))
+
+    def to_dicts(self, dets):
+        """JSON-friendly list of detections (for logs and event streams)."""
+        return [{
+            'class': self.class_name(int(d['cls'])),
+            'conf': round(float(d['conf']), 3),
+            'box': [int(d['x1']), int(d['y1']), int(d['x2']), int(d['y2'])],
+            'distance': float(d['dist']),
+            'direction': DIRECTION_NAMES[d['direction']],
+            'group': self.group_name(int(d['group'])),
+            'risk': int(d['risk']),
+        } for d in dets]
+
+    def class_name(self, cls_id):
+        return self.names[cls_id] if 0 <= cls_id < len(self.names) else str(cls_id)
+
+    def group_name(self, group_id):
+        return GROUPS[group_id]
+
+
+def draw_detections(frame, dets, processor, scale=1.0):
+    """
+    Draws boxes and distance labels for a structured detection array.
+    `scale` maps detection coordinates onto a resized display frame.
+    """
+    for d in dets:
+        color = RISK_COLORS.get(int(d['risk']), DEFAULT_COLOR)
+        x1, y1, x2, y2 = (int(d[k] * scale) for k in ('x1', 'y1', 'x2', 'y2'))
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        cv2.putText(frame, f"{processor.class_name(int(d['cls']))} {float(d['dist'])}m", (x1, y1-10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
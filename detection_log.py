@@ -0,0 +1,265 @@
+"""
+Compact binary detection log and replay.
+
+Every model detection is appended as one fixed-width record to a
+preallocated, memory-mapped file. Records are the scored model output
+before tracking: frames served from propagated tracks add none, and the
+tracker's smoothed distances / TTC escalation are not logged, so replaying
+an unchanged config reproduces the logged risks. Replay memory-maps the log
+as a NumPy structured array and re-scores it with the current config.py
+(heights, groups, risk rules) and phrase templates - no camera or model
+needed.
+
+    python detection_log.py logs/session_20260101_120000.navlog
+    python detection_log.py logs/session.navlog --output replay.jsonl
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+import config  # Imports your config.py settings
+from cameras import camera_directions
+from detection import DETECTION_DTYPE, DetectionProcessor
+
+MAGIC = b'NAVDET1\0'
+VERSION = 2  # 1 logged the tracker's output
+HEADER_SIZE = 4096
+# magic, version, metadata length, records written, frames logged
+HEADER = struct.Struct('<8sIIQQ')
+
+# One record per model detection, before tracking (35 bytes)
+LOG_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('frame', '<u4'),
+    ('cls', '<i2'),
+    ('width', '<u2'),        # Frame width, needed to recompute the direction
+    ('camera', 'u1'),        # Index into config.CAMERAS
+    ('conf', '<f4'),
+    ('x1', '<i2'), ('y1', '<i2'), ('x2', '<i2'), ('y2', '<i2'),
+    ('dist', '<f4'),
+    ('group', 'i1'),
+    ('risk', 'i1'),
+])
+
+
+class DetectionLog:
+    """
+    Append-only writer. Records go straight into a memory map of the
+    preallocated file (no per-frame syscalls); the file grows by
+    `preallocate_records` when full and the header counts are refreshed
+    every `flush_every` frames, so a crash loses at most that many frames.
+    `tracked` records whether live alerts went through the tracker.
+    Use from one thread.
+    """
+
+    def __init__(self, path, names, focal_lengths, settings=None, tracked=False):
+        self.settings = settings or config.DETECTION_LOG
+        self.path = path
+        self.chunk = int(self.settings['preallocate_records'])
+        self.flush_every = int(self.settings['flush_every'])
+        self.records = 0
+        self.frames = 0
+
+        meta = json.dumps({'names': list(names), 'focal_lengths': list(focal_lengths), 'tracked': bool(tracked),
+                           'created': time.time(), 'dtype': LOG_DTYPE.descr}).encode()
+        if HEADER.size + len(meta) > HEADER_SIZE:
+            raise ValueError("Detection log metadata does not fit in the header")
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'w+b')
+        self._file.write(HEADER.pack(MAGIC, VERSION, len(meta), 0, 0) + meta)
+        self._map = None
+        self._resize(self.chunk)
+
+    def _resize(self, capacity):
+        if self._map is not None:
+            self._map.flush()
+            del self._map
+        self._file.truncate(HEADER_SIZE + capacity * LOG_DTYPE.itemsize)
+        self.capacity = capacity
+        self._map = np.memmap(self._file, dtype=LOG_DTYPE, mode='r+', offset=HEADER_SIZE, shape=(capacity,))
+
+    def append(self, frame_id, timestamp, dets, width, camera=0):
+        """Logs one frame's DETECTION_DTYPE array (None = model skipped the frame)."""
+        self.frames += 1
+        n = 0 if dets is None else len(dets)
+        if n:
+            if self.records + n > self.capacity:
+                self._resize(self.capacity + max(self.chunk, n))
+            rows = self._map[self.records:self.records + n]
+            rows['timestamp'] = timestamp
+            rows['frame'] = frame_id
+            rows['width'] = width
+            rows['camera'] = camera
+            for field in ('cls', 'conf', 'x1', 'y1', 'x2', 'y2', 'dist', 'group', 'risk'):
+                rows[field] = dets[field]
+            self.records += n
+        if self.frames % self.flush_every == 0:
+            self._write_counts()
+
+    def _write_counts(self):
+        self._file.seek(struct.calcsize('<8sII'))
+        self._file.write(struct.pack('<QQ', self.records, self.frames))
+        self._file.flush()
+
+    def close(self):
+        """Writes the final counts and trims the unused preallocated tail."""
+        if self._file.closed:
+            return
+        self._map.flush()
+        del self._map
+        self._map = None
+        self._write_counts()
+        self._file.truncate(HEADER_SIZE + self.records * LOG_DTYPE.itemsize)
+        self._file.close()
+
+
+def open_session_log(names, focal_lengths, settings=None, tracked=False):
+    """DetectionLog for a new session if enabled in config, else None."""
+    settings = settings or config.DETECTION_LOG
+    if not settings.get('enabled'):
+        return None
+    path = time.strftime(settings['path'])
+    try:
+        log = DetectionLog(path, names, focal_lengths, settings, tracked)
+    except OSError as e:
+        print(f"⚠ Detection log disabled: {e}")
+        return None
+    print(f"✓ Logging detections to {path}")
+    return log
+
+
+def read_log(path):
+    """Returns (metadata, records) with records memory-mapped read-only."""
+    with open(path, 'rb') as f:
+        magic, version, meta_len, records, frames = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a NavAssist detection log")
+        if version != VERSION:
+            raise ValueError(f"Unsupported detection log version {version}")
+        meta = json.loads(f.read(meta_len))
+    meta.update(records=records, frames=frames)
+    if records == 0:
+        return meta, np.zeros(0, dtype=LOG_DTYPE)
+    return meta, np.memmap(path, dtype=LOG_DTYPE, mode='r', offset=HEADER_SIZE, shape=(records,))
+
+
+def rescore(records, processors):
+    """
+    Recomputes distance / direction / group / risk for every logged box (one
+    processor per camera). Logged boxes already passed the class filter, so
+    it is not applied again: the result keeps one row per record.
+    """
+    dets = np.empty(len(records), dtype=DETECTION_DTYPE)
+    camera, width = np.asarray(records['camera']), np.asarray(records['width'])
+    for cam, w in np.unique(np.stack([camera, width]), axis=1).T:
+        sel = (camera == cam) & (width == w)
+        xyxy = np.stack([records[k][sel] for k in ('x1', 'y1', 'x2', 'y2')], axis=1)
+        dets[sel] = processors[int(cam)].process(xyxy, records['cls'][sel], records['conf'][sel], int(w),
+                                                   filter=False)
+    return dets
+
+
+def frame_keys(records):
+    """One key per (frame, camera): records of a camera's frame are contiguous."""
+    return np.asarray(records['frame'], dtype=np.int64) * 256 + np.asarray(records['camera'])
+
+
+def frame_tops(keys, risk):
+    """Per-frame index of the highest-risk record (first on ties, like DetectionProcessor.top)."""
+    if len(risk) == 0:
+        return np.zeros(0, dtype=np.intp)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    best = np.maximum.reduceat(risk, starts)
+    frame_of = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(risk)]))
+    candidates = np.where(risk == best[frame_of], np.arange(len(risk)), len(risk))
+    return np.minimum.reduceat(candidates, starts)
+
+
+def replay(path, out=None, focal_length=None):
+    """
+    Re-scores a log with the current config and compares each frame's top
+    alert with the logged one (both before tracking). Optionally writes one
+    JSONL line per frame with detections. Returns a summary dict.
+    """
+    from main import NavAssistCore
+
+    start = time.perf_counter()
+    meta, records = read_log(path)
+    processors = [DetectionProcessor(meta['names'], focal_length or f) for f in meta['focal_lengths']]
+    processor = processors[0]  # Names / groups are shared by all cameras
+    dets = rescore(records, processors)
+
+    keys = frame_keys(records)
+    frame_ids = np.asarray(records['frame'])
+    tops = frame_tops(keys, dets['risk'])
+    logged_tops = frame_tops(keys, np.asarray(records['risk']))
+    new_risk = dets['risk'][tops]
+    old_risk = np.asarray(records['risk'])[logged_tops]
+
+    # Phrases are memoized: the same (class, distance, direction, group) repeats a lot
+    phrases = {}
+
+    labels = camera_directions(NavAssistCore.DIRECTIONS)
+
+    def phrase(i):
+        class_name, dist, direction, group = processor.describe(dets[i])
+        camera = int(records['camera'][i])
+        key = (class_name, dist, direction, group, camera)
+        if key not in phrases:
+            spoken = labels[camera] if camera < len(labels) else NavAssistCore.DIRECTIONS
+            phrases[key] = NavAssistCore.get_audio_phrase(class_name, dist, spoken[direction], group)
+        return phrases[key]
+
+    if out is not None:
+        bounds = np.r_[np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]), len(keys)]
+        for k, i in enumerate(tops):
+            rows = slice(bounds[k], bounds[k + 1])
+            out.write(json.dumps({
+                'frame': int(frame_ids[i]),
+                'camera': int(records['camera'][i]),
+                't': float(records['timestamp'][i]),
+                'detections': processor.to_dicts(dets[rows]),
+                'alert': {'priority': int(new_risk[k]), 'logged_priority': int(old_risk[k]),
+                          'phrase': phrase(i)},
+            }) + "\n")
+
+    alert_classes = Counter(processor.class_name(int(c)) for c in dets['cls'][tops[new_risk >= 3]])
+    return {
+        'frames': meta['frames'],
+        'tracked': meta['tracked'],  # Live alerts were tracker-smoothed; not replayed
+        'frames_with_detections': len(tops),
+        'detections': len(records),
+        'top_risk': {int(r): int(n) for r, n in zip(*np.unique(new_risk, return_counts=True))},
+        'logged_top_risk': {int(r): int(n) for r, n in zip(*np.unique(old_risk, return_counts=True))},
+        'changed_frames': int((new_risk != old_risk).sum()),
+        'escalated_frames': int((new_risk > old_risk).sum()),
+        'warning_classes': dict(alert_classes.most_common()),
+        'elapsed_s': round(time.perf_counter() - start, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a NavAssist detection log through the current risk logic")
+    parser.add_argument('log', help="Path to a .navlog file")
+    parser.add_argument('--output', '-o', default=None, help="Per-frame JSONL output ('-' for stdout)")
+    parser.add_argument('--focal-length', type=float, default=None, help="Default: values recorded in the log")
+    args = parser.parse_args()
+
+    if args.output == '-':
+        summary = replay(args.log, sys.stdout, args.focal_length)
+    elif args.output:
+        with open(args.output, 'w') as out:
+            summary = replay(args.log, out, args.focal_length)
+    else:
+        summary = replay(args.log, None, args.focal_length)
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
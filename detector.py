@@ -0,0 +1,239 @@
+import time
+
+import numpy as np
+import config  # Imports your config.py settings
+import risk
+from detection import DETECTION_DTYPE, GROUP_INDEX, model_conf
+from motion import MotionGate
+from tiles import CorridorTiler, result_boxes
+from resolution import ResolutionController
+from tracker import Tracker
+
+
+class FrameDetector:
+    """
+    Per-frame detection entry point shared by the front ends:
+    model call -> batched risk scoring -> tracking.
+    With tracking enabled the model only runs every `detect_every` frames;
+    frames in between are served from the propagated tracks. The motion gate
+    additionally skips scheduled runs while the scene is static, and the
+    corridor tiler adds high-resolution tiles of the walking path to runs.
+    """
+
+    def __init__(self, model, processor, conf=None, tracking=None, resolution=None, motion=None, tiling=None):
+        self.model = model
+        self.processor = processor
+        self.conf = conf  # None = MODEL thresholds, followed across config reloads
+
+        tracking = tracking if tracking is not None else config.TRACKING
+        self.tracker = Tracker(processor, tracking) if tracking.get('enabled') else None
+        self.detect_every = max(1, int(tracking.get('detect_every', 1))) if self.tracker else 1
+
+        resolution = resolution if resolution is not None else config.RESOLUTION
+        self.resolution = ResolutionController(resolution) if resolution.get('enabled') else None
+
+        motion = motion if motion is not None else config.MOTION
+        self.motion = MotionGate(motion) if motion.get('enabled') else None
+
+        tiling = tiling if tiling is not None else config.TILING
+        self.tiler = CorridorTiler(tiling) if tiling.get('enabled') else None
+
+        self.frame_index = 0
+        self.ran_model = False  # Whether the last detect() call ran YOLO
+        self.last_latency = 0.0
+        self.last_dets = np.zeros(0, dtype=DETECTION_DTYPE)
+        self.raw_dets = None    # Last model run's detections before tracking (None = frame reused)
+
+    @property
+    def imgsz(self):
+        """Current model input size (None = model default)."""
+        return self.resolution.imgsz if self.resolution else None
+
+    @property
+    def run_conf(self):
+        """Confidence the model runs at (re-read from the live risk table's MODEL)."""
+        return self.conf if self.conf is not None else model_conf(risk.table().model)
+
+    def infer(self, frame):
+        """Single model call; returns the ultralytics Result for `frame`."""
+        kwargs = {'imgsz': self.imgsz} if self.resolution else {}
+        t0 = time.perf_counter()
+        result = self.model(frame, conf=self.run_conf, verbose=False, **kwargs)[0]
+        self.last_latency = time.perf_counter() - t0
+        return result
+
+    def should_infer(self, frame, timestamp):
+        """Advances the skip schedule; True if the model must run on `frame`."""
+        self.ran_model = self.tracker is None or self.frame_index % self.detect_every == 0
+        self.frame_index += 1
+        if self.ran_model and self.motion:
+            self.ran_model = self.motion.should_infer(frame, timestamp, self.last_dets)
+        return self.ran_model
+
+    def reuse(self, timestamp, width):
+        """Previous detections for a skipped frame (propagated when tracking)."""
+        self.raw_dets = None
+        if self.tracker is not None:
+            self.last_dets = self.tracker.predict(timestamp, width)
+        return self.last_dets
+
+    def update(self, result, width, timestamp):
+        """Scores and tracks one model Result."""
+        return self.update_dets(self.processor.from_result(result, width), width, timestamp)
+
+    def update_tiled(self, results, tiles, frame_shape, timestamp):
+        """Merges the full-frame Result with its tile Results, then scores and tracks."""
+        tiled = [(result_boxes(r), rect) for r, (_, rect) in zip(results[1:], tiles)]
+        boxes = self.tiler.merge(result_boxes(results[0]), tiled, frame_shape)
+        width = frame_shape[1]
+        return self.update_dets(self.processor.process(*boxes, width), width, timestamp)
+
+    def update_dets(self, dets, width, timestamp):
+        self.raw_dets = dets
+        if self.resolution:
+            self.resolution.record(self.last_latency, dets, timestamp)
+        if self.tracker is not None:
+            dets = self.tracker.update(dets, timestamp, width)
+        self.last_dets = dets
+        return dets
+
+    def detect(self, frame, timestamp=None):
+        """Returns the structured detection array for `frame`."""
+        timestamp = time.time() if timestamp is None else timestamp
+        width = frame.shape[1]
+        if not self.should_infer(frame, timestamp):
+            return self.reuse(timestamp, width)
+        tiles = self.tiler.schedule(frame) if self.tiler else []
+        if not tiles:
+            return self.update(self.infer(frame), width, timestamp)
+        kwargs = {'imgsz': self.imgsz} if self.resolution else {}
+        t0 = time.perf_counter()
+        results = self.model([frame] + [crop for crop, _ in tiles], conf=self.run_conf, verbose=False, **kwargs)
+        self.last_latency = time.perf_counter() - t0
+        return self.update_tiled(results, tiles, frame.shape, timestamp)
+
+
+class BatchDetector:
+    """
+    Multi-camera front: one FrameDetector per stream keeps its own scoring
+    (focal length), tracking, motion and resolution state, but all streams
+    that need the model on a tick share a single batched model call.
+    `groups` optionally limits a stream to some risk groups (e.g. G2/G3 for
+    a downward-facing camera). Corridor tiles ride along in the same call.
+    """
+
+    def __init__(self, model, processors, conf=None, groups=None):
+        self.model = model
+        self.conf = conf
+        self.detectors = [FrameDetector(model, p, conf) for p in processors]
+        groups = groups or [None] * len(processors)
+        self.groups = [None if g is None else np.array([GROUP_INDEX[name] for name in g]) for g in groups]
+        self.ran_model = False
+        self.last_latency = 0.0
+
+    @property
+    def primary(self):
+        return self.detectors[0]
+
+    # Status of the primary stream, as shown in the GUI sidebar
+    @property
+    def resolution(self):
+        return self.primary.resolution
+
+    @property
+    def motion(self):
+        return self.primary.motion
+
+    @property
+    def run_conf(self):
+        return self.primary.run_conf
+
+    @property
+    def imgsz(self):
+        sizes = [d.imgsz for d in self.detectors if d.imgsz]
+        return max(sizes) if sizes else None
+
+    def detect(self, frames, timestamp=None):
+        """
+        frames: one image (or None = no new frame) per stream.
+        Returns one structured detection array per stream.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        out = [d.last_dets for d in self.detectors]
+        for detector in self.detectors:
+            detector.raw_dets = None
+        run = []
+        for i, (detector, frame) in enumerate(zip(self.detectors, frames)):
+            if frame is None:
+                continue
+            if detector.should_infer(frame, timestamp):
+                run.append(i)
+            else:
+                out[i] = detector.reuse(timestamp, frame.shape[1])
+
+        self.ran_model = bool(run)
+        if run:
+            # Streams share one input size; the largest keeps hazard-locked streams sharp
+            imgsz = max((self.detectors[i].imgsz or 0) for i in run) or None
+            kwargs = {'imgsz': imgsz} if imgsz else {}
+            images, tiles = [], {}
+            for i in run:
+                tiler = self.detectors[i].tiler
+                tiles[i] = tiler.schedule(frames[i]) if tiler else []
+                images += [frames[i]] + [crop for crop, _ in tiles[i]]
+            t0 = time.perf_counter()
+            results = self.model(images, conf=self.run_conf, verbose=False, **kwargs)
+            self.last_latency = time.perf_counter() - t0
+            start = 0
+            for i in run:
+                detector = self.detectors[i]
+                detector.last_latency = self.last_latency
+                count = 1 + len(tiles[i])
+                if tiles[i]:
+                    out[i] = detector.update_tiled(results[start:start + count], tiles[i], frames[i].shape, timestamp)
+                else:
+                    out[i] = detector.update(results[start], frames[i].shape[1], timestamp)
+                start += count
+
+        return self._filter(out)
+
+    def schedule(self, frames, timestamp):
+        """
+        Skip / motion-gate decision for frames sent to process-pool workers:
+        returns `frames` with None for the streams the model should skip.
+        """
+        return [frame if frame is not None and detector.should_infer(frame, timestamp) else None
+                for detector, frame in zip(self.detectors, frames)]
+
+    def update_boxes(self, boxes, frames, timestamp, latency):
+        """
+        Scores and tracks boxes computed elsewhere (process-pool workers):
+        boxes[i] = (xyxy, cls, conf) or None per stream, in frame order.
+        Streams with a frame but no boxes (skipped by schedule() or a failed
+        job) are served from the propagated tracks. Corridor tiling does not
+        apply to these frames.
+        """
+        self.ran_model = any(b is not None for b in boxes)
+        self.last_latency = latency
+        out = [d.last_dets for d in self.detectors]
+        for i, (detector, frame, b) in enumerate(zip(self.detectors, frames, boxes)):
+            detector.raw_dets = None
+            if frame is None:
+                continue
+            width = frame.shape[1]
+            if b is None:
+                out[i] = detector.reuse(timestamp, width)
+                continue
+            detector.last_latency = latency
+            out[i] = detector.update_dets(detector.processor.process(*b, width), width, timestamp)
+        return self._filter(out)
+
+    def raw_detections(self):
+        """Last tick's detections per stream before tracking (None where the model did not run)."""
+        return self._filter([d.raw_dets for d in self.detectors])
+
+    def _filter(self, out):
+        for i, allowed in enumerate(self.groups):
+            if allowed is not None and out[i] is not None and len(out[i]):
+                out[i] = out[i][np.isin(out[i]['group'], allowed)]
+        return out
@@ -1,15 +1,23 @@
 import tkinter as tk
 from tkinter import ttk
 import cv2
+import numpy as np
 from PIL import Image, ImageTk
 import threading
-import pyttsx3
 import time
-from ultralytics import YOLO
 import config  # Importing your config.py
-import queue
-import pygame
 import os
+from pipeline import Pipeline
+from detection import draw_detections
+from detector import BatchDetector
+from cameras import CameraRig, camera_directions, camera_groups, camera_processors
+from backends import load_model, warmup
+from audio import EarconBank, PhrasePlayer, speak_interruptible, template_phrases
+from alerts import AlertScheduler
+from startup import StartupLoader
+from metrics import Metrics
+from detection_log import open_session_log
+import risk
 
 class NavAssistApp:
     # Color Scheme - Black & White / High Contrast
@@ -23,6 +31,9 @@ class NavAssistApp:
         'text_white': '#ffffff',   # White
         'text_gray': '#cccccc'     # Light gray
     }
+
+    # Spoken direction per detection direction code (left / center / right third)
+    DIRECTIONS = ("on your left", "ahead", "on your right")
     
     def __init__(self, window, window_title):
         self.window = window
@@ -40,41 +51,42 @@ class NavAssistApp:
         self.is_running = False
         self.is_speaking = False
         self.audio_enabled = True
-        self.last_speech_time = 0
-        self.speech_cooldown = 3.0  # Seconds between warnings
         self.fps = 0
         self.frame_count = 0
         self.fps_time = time.time()
         
-        # --- AI & Camera Setup ---
-        print("Loading Custom Model...")
-        # Ensure best.pt is in the same directory or provide full path
-        self.model = YOLO(r'best.pt')
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        self.focal_length = 600
-        
-        # --- Audio Setup ---
-        self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', 150)
-        
-        # --- Alert Sound Setup ---
-        pygame.mixer.init()
-        self.sound_file = "beep-beep-6151.mp3"
+        # --- Components (filled in by the background startup steps) ---
+        self.model = None
+        self.processor = None
+        self.detector = None
+        self.cap = None
+        self.engine = None
         self.alert_sound = None
-        
-        if os.path.exists(self.sound_file):
-            try:
-                self.alert_sound = pygame.mixer.Sound(self.sound_file)
-                print(f"✓ Alert sound loaded")
-            except Exception as e:
-                print(f"⚠ Audio error: {e}")
-        
-        self.speech_queue = queue.Queue()
-        threading.Thread(target=self.speech_worker, daemon=True).start()
-        
-        # --- GUI Layout ---
+        self.sound_file = "beep-beep-6151.mp3"
+        self.phrases = None
+        self.pipeline = None
+        self.detection_log = None
+        self.first_alert_logged = False
+
+        # --- Alert Scheduler (priority, dedup, expiry, preemption) ---
+        self.speech_interrupt = threading.Event()  # Set on preemption, acted on by the speech worker
+        self.alerts = AlertScheduler(on_preempt=self.interrupt_speech)
+
+        # --- Runtime Metrics (optional /metrics endpoint and CSV log) ---
+        self.metrics = Metrics()
+        self.metrics.watch_alerts(self.alerts)
+
+        # --- Risk Rules (reloaded from config.py while running) ---
+        self.config_watcher = risk.ConfigWatcher()
+
+        # --- Display State ---
+        self.display_size = (1280, 720)  # Updated from the video widget's <Configure>
+        self.display_interval_ms = int(1000 / config.DISPLAY['max_fps'])
+        self.photo = None
+        self._render_size = None
+        self._insets = {}  # Camera index -> last annotated thumbnail of a secondary camera
+        
+        # --- GUI Layout (built first so the window shows up immediately) ---
         # 1. Top Header
         self.create_header()
         
@@ -84,8 +96,98 @@ class NavAssistApp:
         # 3. Bottom Status Bar
         self.create_status_bar()
         
+        self.btn_start.config(text="LOADING", state="disabled", bg="#cccccc")
+        self.status_label.config(text="Loading model, camera and audio...", fg=self.COLORS['text_gray'])
+
+        # --- Parallel Background Initialization ---
+        self.startup = StartupLoader({
+            'model': self.init_model,
+            'camera': self.init_camera,
+            'tts': self.init_tts,
+            'mixer': self.init_mixer,
+        })
+        self.startup.start()
+        
         self.window.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.window.after(100, self.check_startup)
         self.update_video()
+
+    # --- Startup Steps (background threads, no Tk calls) ---
+    def init_model(self):
+        # Ensure best.pt is in the same directory or provide full path (config.MODEL)
+        model = load_model()
+        # One processor per camera (focal length); all cameras share one batched model call
+        self.processors = camera_processors(model.names)
+        self.processor = self.processors[0]
+        self.directions = camera_directions(self.DIRECTIONS)
+        self.detector = BatchDetector(model, self.processors, groups=camera_groups())
+        self.startup.record('warmup', warmup(model))
+        self.model = model
+
+    def init_camera(self):
+        # config.CAMERAS, each read on its own thread; a frame can be held by the
+        # capture slot, inference, the result slot and render at once
+        self.cap = CameraRig()
+
+    def init_tts(self):
+        import pyttsx3  # Deferred: driver discovery is slow
+        engine = pyttsx3.init()
+        engine.setProperty('rate', config.AUDIO['rate'])
+        self.engine = engine
+
+    def init_mixer(self):
+        import pygame  # Deferred: only the mixer is used
+        pygame.mixer.init()
+        if os.path.exists(self.sound_file):
+            try:
+                self.alert_sound = pygame.mixer.Sound(self.sound_file)
+                print(f"✓ Alert sound loaded")
+            except Exception as e:
+                print(f"⚠ Audio error: {e}")
+
+    def check_startup(self):
+        """Tk loop: report loading progress until every startup step has finished."""
+        if not self.startup.done:
+            ready = [name for name in self.startup.steps if name not in self.startup.pending()]
+            done = f" ({', '.join(ready)} ready)" if ready else ""
+            self.status_label.config(text=f"Loading {', '.join(self.startup.pending())}...{done}")
+            self.window.after(100, self.check_startup)
+            return
+        self.finish_startup()
+
+    def finish_startup(self):
+        """Tk thread: wires the loaded components together and enables START."""
+        print(self.startup.report())
+        if self.model is None or self.cap is None:
+            failed = ', '.join(self.startup.errors) or 'model'
+            self.btn_start.config(text="ERROR")
+            self.status_label.config(text=f"Startup failed ({failed}) - see console", fg=self.COLORS['text_white'])
+            return
+
+        # --- Pre-rendered Phrase Fragments (played through pygame.mixer) ---
+        if self.engine is not None:
+            labels = list(dict.fromkeys(d for camera in self.directions for d in camera))
+            self.phrases = PhrasePlayer(self.engine, self.processor.names + labels)
+            self.phrases.prewarm(template_phrases(self.get_audio_phrase, labels))
+            threading.Thread(target=self.speech_worker, daemon=True).start()
+
+        # --- Directional Earcons (risk / distance / position tones, rendered once) ---
+        self.earcons = EarconBank()
+
+        # --- Binary Detection Log (optional, for incident review / replay) ---
+        self.detection_log = open_session_log(self.processor.names, [p.focal_length for p in self.processors],
+                                              tracked=config.TRACKING.get('enabled', False))
+
+        # --- Capture / Inference / Render Pipeline ---
+        self.pipeline = Pipeline(self.cap, self.process_frame, self.render_frame,
+                                 render_fps=config.DISPLAY['max_fps'], metrics=self.metrics)
+        self.pipeline.start()
+        self.metrics.watch_pipeline(self.pipeline)
+        self.metrics.watch_cameras(self.cap)
+        self.metrics.start()
+
+        self.btn_start.config(text="START", state="normal", bg=self.COLORS['text_white'])
+        self.status_label.config(text="System Ready - Click START to begin", fg=self.COLORS['text_white'])
     
     def create_header(self):
         """Create professional header"""
@@ -130,6 +232,7 @@ class NavAssistApp:
         # Video Display
         self.video_frame = tk.Label(main_frame, bg=self.COLORS['bg_light'], relief="sunken", bd=2)
         self.video_frame.pack(side="left", fill="both", expand=True)
+        self.video_frame.bind("<Configure>", self.on_video_resize)
         
         # Right Sidebar
         sidebar = tk.Frame(main_frame, bg=self.COLORS['bg_light'], width=250)
@@ -149,11 +252,29 @@ class NavAssistApp:
         self.fps_label = tk.Label(sidebar, text="FPS: 0", font=("Segoe UI", 10),
                                  bg=self.COLORS['bg_light'], fg=self.COLORS['text_white'])
         self.fps_label.pack(pady=5, padx=10, anchor="w")
+
+        # Inference Resolution / Latency
+        self.res_label = tk.Label(sidebar, text="Res: - | Infer: - ms", font=("Segoe UI", 10),
+                                 bg=self.COLORS['bg_light'], fg=self.COLORS['text_white'])
+        self.res_label.pack(pady=5, padx=10, anchor="w")
+
+        self.motion_label = tk.Label(sidebar, text="Motion Skip: 0%", font=("Segoe UI", 10),
+                                    bg=self.COLORS['bg_light'], fg=self.COLORS['text_white'])
+        self.motion_label.pack(pady=5, padx=10, anchor="w")
         
         # Objects Detected
         self.obj_label = tk.Label(sidebar, text="Objects: 0", font=("Segoe UI", 10),
                                  bg=self.COLORS['bg_light'], fg=self.COLORS['text_white'])
         self.obj_label.pack(pady=5, padx=10, anchor="w")
+
+        # Pipeline Health
+        self.drop_label = tk.Label(sidebar, text="Dropped: 0", font=("Segoe UI", 10),
+                                  bg=self.COLORS['bg_light'], fg=self.COLORS['text_white'])
+        self.drop_label.pack(pady=5, padx=10, anchor="w")
+
+        self.latency_label = tk.Label(sidebar, text="Alert Latency: -", font=("Segoe UI", 10),
+                                     bg=self.COLORS['bg_light'], fg=self.COLORS['text_white'])
+        self.latency_label.pack(pady=5, padx=10, anchor="w")
         
         # Separator line
         sep2 = tk.Frame(sidebar, bg=self.COLORS['text_white'], height=1)
@@ -201,50 +322,16 @@ class NavAssistApp:
                                     fg=self.COLORS['text_white'])
         self.status_label.pack(side="left", padx=15, pady=10)
 
-    def get_direction(self, x1, x2, frame_width):
-        """
-        Determines if object is Left, Center, or Right.
-        """
-        center_x = (x1 + x2) / 2
-        third = frame_width / 3
-        
-        if center_x < third:
-            return "on your left"
-        elif center_x > (third * 2):
-            return "on your right"
-        else:
-            return "ahead"
-
     def get_audio_phrase(self, class_name, distance, direction, group):
         """
-        Generates specific phrases based on the document tables.
+        Generates specific phrases based on the document tables
+        (templates live in config.py: RISK_CONFIG / CLASS_PHRASES).
         """
-        # G1: Critical Hazards (Loud & Urgent)
-        if group == 'G1':
-            if class_name == 'fire':
-                return f"Warning! Fire detected {distance} meters {direction}. Stop immediately."
-            if class_name in ['gun', 'knife']:
-                return f"Danger! Weapon detected {distance} meters {direction}. Move away."
-
-        # G6: Traffic (Distance sensitive)
-        elif group == 'G6':
-            if distance < 3.0:
-                return f"Stop! {class_name} approaching {direction}, {distance} meters."
-            return f"{class_name} {distance} meters {direction}."
-
-        # G3: Construction
-        elif group == 'G3':
-            return f"Caution. Construction hazard {distance} meters {direction}."
-
-        # G2 & G4: Navigation / Indoor
-        elif group in ['G2', 'G4']:
-            return f"{class_name} {distance} meters {direction}."
-
-        # Default fallback
-        return f"{class_name} {distance} meters {direction}."
+        return risk.table().phrase(class_name, distance, direction, group)
     
     def start_system(self):
         self.is_running = True
+        self.pipeline.resume()
         self.btn_start.config(state="disabled", bg="#cccccc")
         self.btn_stop.config(state="normal")
         self.status_label.config(text="System Active - Scanning for Hazards...", fg=self.COLORS['text_white'])
@@ -253,6 +340,7 @@ class NavAssistApp:
 
     def stop_system(self):
         self.is_running = False
+        self.pipeline.pause()
         self.btn_start.config(state="normal", bg=self.COLORS['text_white'])
         self.btn_stop.config(state="disabled", bg="#cccccc")
         self.status_label.config(text="System Paused", fg=self.COLORS['text_gray'])
@@ -273,66 +361,67 @@ class NavAssistApp:
         If normal -> Just speaks.
         """
         while True:
-            # Wait for the next message
-            item = self.speech_queue.get()
-            
-            if item is None: 
-                break
-            
-            # Unpack the data: (The text to say, Is it urgent?)
-            text, is_urgent = item
-            
+            # Wait for the next alert (filling the phrase cache while idle)
+            self.speech_interrupt.clear()  # Preemptions only apply to the alert taken next
+            alert = self.alerts.next(timeout=0.05 if self.phrases.pending else 1)
+            if alert is None:
+                self.phrases.warm_one()
+                continue
+
+            if not self.first_alert_logged:
+                self.first_alert_logged = True
+                print(f"✓ Time to first alert: {self.startup.since_start():.2f}s")
+
+            self.metrics.observe('alert_wait', time.time() - alert.created)
+            t0 = time.perf_counter()
             try:
                 # 1. PLAY BEEP (Only if urgent)
-                if is_urgent and self.alert_sound:
+                if alert.urgent and self.alert_sound and not self.earcons.enabled:
                     self.alert_sound.play()
-                    time.sleep(0.5) # Wait 0.5s so the beep finishes before voice starts
+                    self.speech_interrupt.wait(0.5) # Wait 0.5s so the beep finishes before voice starts
                 
-                # 2. SPEAK TEXT
-                self.engine.say(text)
-                self.engine.runAndWait()
+                # 2. SPEAK TEXT (cached fragments, falling back to live TTS)
+                started = lambda: self.alert_started(alert)
+                if not self.phrases.speak(alert.text, self.speech_interrupt, started):
+                    speak_interruptible(self.engine, alert.text, self.speech_interrupt, started)
                 
             except RuntimeError:
                 pass # Ignore errors if engine is busy
             except Exception as e:
+                self.metrics.inc('speech_errors_total')
                 print(f"Audio Error: {e}")
             
-            self.speech_queue.task_done()
+            self.metrics.observe('speech', time.perf_counter() - t0)
+            self.alerts.finished(alert)
 
-    def speak_warning(self, text, priority_level):
+    def interrupt_speech(self):
         """
-        Sends message to the worker. 
-        Priority 4 (Fire/Knife) = URGENT (Beep + Speak Immediately).
+        Called by the scheduler (on the inference thread) when a critical alert
+        preempts current speech; the speech worker stops the audio on its own thread.
         """
-        current_time = time.time()
-        
-        # Level 4 is Critical (Defined in your config/logic)
-        is_urgent = (priority_level >= 4)
-        
-        if self.audio_enabled:
-            # --- CASE 1: CRITICAL HAZARD (FIRE/KNIFE) ---
-            if is_urgent:
-                try:
-                    self.engine.stop() # Stop current sentence
-                    with self.speech_queue.mutex:
-                        self.speech_queue.queue.clear() # Delete less important messages
-                except:
-                    pass
-                
-                # Send (Text, True) -> True tells worker to BEEP
-                self.speech_queue.put((text, True)) 
-                self.last_speech_time = current_time
+        self.speech_interrupt.set()
+
+    def alert_started(self, alert):
+        """Speech worker: `alert` became audible - records enqueue- and capture-to-playback latency."""
+        now = time.time()
+        self.alerts.started(alert, now)
+        self.pipeline.stats.record_alert_latency(now - alert.captured)
 
-            # --- CASE 2: NORMAL OBJECT (CHAIR/TABLE) ---
-            # Only speak if cooldown has passed
-            elif current_time - self.last_speech_time > self.speech_cooldown:
-                # Send (Text, False) -> False means NO beep
-                self.speech_queue.put((text, False))
-                self.last_speech_time = current_time
+    def speak_warning(self, text, priority_level, key=None, captured=None):
+        """
+        Sends message to the alert scheduler.
+        Priority 4 (Fire/Knife) = URGENT (Beep + preempts lower-priority speech).
+        `key` identifies the object (class, direction) for repeat suppression;
+        `captured` is the frame's grab time for the capture-to-alert latency.
+        Returns True if the message was queued.
+        """
+        if not self.audio_enabled:
+            return False
+        return self.alerts.submit(text, priority_level, key, captured=captured)
 
     def get_risk_action(self, group, distance):
         # Using logic from your config file structure
-        severity = config.RISK_LEVELS.get(group, "LOW")
+        severity = risk.table().severity(group)
         
         if distance < 1.0 and severity in ["VERY_HIGH", "HIGH"]:
             return "STOP", (0, 0, 255) # Red
@@ -340,103 +429,184 @@ class NavAssistApp:
             return "WARN", (0, 165, 255) # Orange
         return "INFO", (0, 255, 0) # Green
 
+    def process_frame(self, packet):
+        """
+        Inference stage (worker thread): detect, score risk and trigger audio.
+        Must not touch Tk widgets - results are handed to the render stage.
+        """
+        frames = packet.image  # One image (or None) per configured camera
+        self.config_watcher.check()
+
+        # 1. Detect Objects (one batched call for all cameras, or propagate tracks) + distance / direction / risk
+        self.metrics.observe('frame_age', time.time() - packet.timestamp)
+        t0 = time.perf_counter()
+        detections = self.detector.detect(frames, packet.timestamp)
+        self.metrics.observe_frame(self.detector, sum(map(len, detections)), time.perf_counter() - t0)
+        raw = self.detector.raw_detections()
+
+        # --- AUDIO DECISION (each camera's top object goes to the one alert scheduler) ---
+        highest_priority = 0
+        audio_message = ""
+        for camera, (frame, dets) in enumerate(zip(frames, detections)):
+            if frame is None:
+                continue
+            if self.detection_log:
+                self.detection_log.append(packet.frame_id, packet.timestamp, raw[camera], frame.shape[1], camera)
+            top = self.processors[camera].top(dets)
+            if top is None:
+                continue
+            class_name, dist, direction, group = self.processors[camera].describe(dets[top])
+            priority = int(dets[top]['risk'])
+            message = self.get_audio_phrase(class_name, dist, self.directions[camera][direction], group)
+            alert_key = (camera, class_name, direction)
+
+            # 2. Trigger Audio: the earcon fires now, speech goes through the scheduler
+            if priority > 0 and message:
+                if self.audio_enabled and self.earcons.play_detection(dets[top], frame.shape[1], alert_key):
+                    self.metrics.inc('earcons_total', risk=priority)
+                if self.earcons.speaks(priority):
+                    with self.metrics.time('speech_enqueue'):
+                        self.speak_warning(message, priority, alert_key, packet.timestamp)
+                if priority > highest_priority:
+                    highest_priority, audio_message = priority, message
+
+        return {
+            'frame': frames[0],
+            'detections': detections[0],
+            'insets': [(camera, frames[camera], detections[camera]) for camera in range(1, len(frames))
+                       if frames[camera] is not None],
+            'objects': sum(map(len, detections)),
+            'priority': highest_priority,
+            'message': audio_message,
+            'imgsz': self.detector.imgsz,
+            'infer_ms': self.detector.last_latency * 1000,
+        }
+
+    def on_video_resize(self, event):
+        """Tracks the video widget size so frames are scaled before conversion."""
+        border = 2 * (int(self.video_frame.cget('bd')) + int(self.video_frame.cget('highlightthickness')))
+        self.display_size = (max(1, event.width - border), max(1, event.height - border))
+
+    def render_frame(self, result):
+        """
+        Render stage (worker thread): scale to the widget, annotate, convert.
+        Drawing and color conversion run on the downscaled frame into reused
+        buffers; only the PhotoImage paste happens on the Tk thread.
+        """
+        frame = result['frame']
+        h, w = frame.shape[:2]
+        max_w, max_h = self.display_size
+        scale = min(1.0, max_w / w, max_h / h)
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+
+        # Reusable buffers per display size (RGB ring: Tk may still be pasting the previous one)
+        if self._render_size != size:
+            self._render_size = size
+            self._scaled = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            self._rgb_ring = [np.empty_like(self._scaled) for _ in range(3)]
+            self._rgb_index = 0
+
+        if scale < 1.0:
+            cv2.resize(frame, size, dst=self._scaled, interpolation=cv2.INTER_AREA)
+        else:
+            np.copyto(self._scaled, frame)
+
+        # --- VISUALIZATION ---
+        draw_detections(self._scaled, result['detections'], self.processor, scale)
+        self.draw_insets(result['insets'])
+
+        rgb = self._rgb_ring[self._rgb_index]
+        self._rgb_index = (self._rgb_index + 1) % len(self._rgb_ring)
+        cv2.cvtColor(self._scaled, cv2.COLOR_BGR2RGB, dst=rgb)
+        result['image'] = Image.fromarray(rgb)
+        result['frame'] = None  # Full-size frames are no longer needed
+        result['insets'] = None
+        return result
+
+    def draw_insets(self, insets):
+        """Secondary cameras as annotated thumbnails along the bottom-right edge."""
+        h, w = self._scaled.shape[:2]
+        for camera, frame, dets in insets:
+            scale = (w // 4) / frame.shape[1]
+            size = (max(1, int(frame.shape[1] * scale)), max(1, int(frame.shape[0] * scale)))
+            thumb = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            draw_detections(thumb, dets, self.processors[camera], scale)
+            self._insets[camera] = thumb
+
+        x = w
+        for camera, thumb in sorted(self._insets.items()):
+            th, tw = thumb.shape[:2]
+            if tw > x or th > h:
+                break
+            x -= tw
+            self._scaled[h - th:h, x:x + tw] = thumb
+
     def update_video(self):
-        if self.is_running:
-            ret, frame = self.cap.read()
-            if ret:
-                frame_height, frame_width, _ = frame.shape
-                
-                # FPS Calculation
-                self.frame_count += 1
-                if time.time() - self.fps_time > 1:
-                    self.fps = self.frame_count
-                    self.frame_count = 0
-                    self.fps_time = time.time()
-                
-                # 1. Detect Objects
-                results = self.model(frame, stream=True, conf=0.4, verbose=False)
-                
-                highest_priority = 0 
-                audio_message = ""
-                detections_count = 0
-
-                for r in results:
-                    for box in r.boxes:
-                        detections_count += 1
-                        # --- EXTRACT DATA ---
-                        x1, y1, x2, y2 = map(int, box.xyxy[0])
-                        cls_id = int(box.cls[0])
-                        class_name = self.model.names[cls_id]
-                        
-                        # --- DISTANCE CALCULATION ---
-                        real_h = config.OBJECT_HEIGHTS.get(class_name, 1.0)
-                        bbox_h = y2 - y1
-                        dist = round((real_h * self.focal_length) / bbox_h, 1) if bbox_h > 0 else 0
-
-                        # --- CONTEXT ---
-                        group = config.CLASS_TO_GROUP.get(class_name, 'G8')
-                        direction = self.get_direction(x1, x2, frame_width)
-
-                        # --- RISK CALCULATION ---
-                        risk_level = 1 
-                        
-                        if group in ['G1']: risk_level = 4
-                        elif group in ['G6'] and dist < 4.0: risk_level = 4
-                        elif group in ['G3'] and dist < 2.0: risk_level = 3
-                        elif dist < 1.0: risk_level = 3
-                        elif group in ['G4', 'G7']: risk_level = 2
-
-                        # --- VISUALIZATION ---
-                        if risk_level == 4: color = (0, 0, 255)
-                        elif risk_level == 3: color = (0, 165, 255)
-                        else: color = (0, 255, 0)
-                        
-                        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                        cv2.putText(frame, f"{class_name} {dist}m", (x1, y1-10), 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-
-                        # --- AUDIO DECISION ---
-                        if risk_level > highest_priority:
-                            highest_priority = risk_level
-                            audio_message = self.get_audio_phrase(class_name, dist, direction, group)
-
-                # 2. Trigger Audio
-                if highest_priority > 0 and audio_message:
-                    self.speak_warning(audio_message, highest_priority)
-
-                # Update sidebar
-                self.fps_label.config(text=f"FPS: {self.fps}")
-                self.obj_label.config(text=f"Objects: {detections_count}")
-                
-                # Update hazard level indicator
-                if highest_priority == 4:
-                    self.hazard_indicator.config(fg="#ffffff")
-                    self.hazard_text.config(text="CRITICAL", fg="#ffffff")
-                    self.alert_label.config(text=audio_message, fg="#ffffff")
-                elif highest_priority == 3:
-                    self.hazard_indicator.config(fg="#dddddd")
-                    self.hazard_text.config(text="WARNING", fg="#dddddd")
-                    self.alert_label.config(text=audio_message, fg="#dddddd")
-                elif highest_priority == 2:
-                    self.hazard_indicator.config(fg="#cccccc")
-                    self.hazard_text.config(text="INFO", fg="#cccccc")
-                    self.alert_label.config(text=audio_message, fg="#cccccc")
-                else:
-                    self.hazard_indicator.config(fg="#aaaaaa")
-                    self.hazard_text.config(text="SAFE", fg="#aaaaaa")
-                    self.alert_label.config(text="No hazards detected", fg=self.COLORS['text_gray'])
-
-                # 4. Display on GUI
-                img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(img)
-                imgtk = ImageTk.PhotoImage(image=img)
-                self.video_frame.imgtk = imgtk
-                self.video_frame.configure(image=imgtk)
-
-        self.window.after(30, self.update_video)
+        """Tk loop: show the newest rendered frame and sidebar state."""
+        result = self.pipeline.latest() if self.pipeline else None
+        if self.is_running and result is not None:
+            highest_priority = result['priority']
+            audio_message = result['message']
+
+            # FPS Calculation
+            self.frame_count += 1
+            if time.time() - self.fps_time > 1:
+                self.fps = self.frame_count
+                self.frame_count = 0
+                self.fps_time = time.time()
+
+            # Update sidebar
+            self.fps_label.config(text=f"FPS: {self.fps}")
+            imgsz = result['imgsz'] or "default"
+            lock = " (locked)" if self.detector.resolution and self.detector.resolution.locked else ""
+            self.res_label.config(text=f"Res: {imgsz}{lock} | Infer: {result['infer_ms']:.0f} ms")
+            if self.detector.motion:
+                self.motion_label.config(text=f"Motion Skip: {self.detector.motion.skip_rate:.0%}")
+            self.obj_label.config(text=f"Objects: {result['objects']}")
+            dropped = sum(self.pipeline.dropped_frames().values())
+            self.drop_label.config(text=f"Dropped: {dropped}")
+            last_ms, avg_ms = self.pipeline.stats.alert_latency_ms()
+            self.latency_label.config(text=f"Alert Latency: {last_ms:.0f} ms (avg {avg_ms:.0f})")
+
+            # Update hazard level indicator
+            if highest_priority == 4:
+                self.hazard_indicator.config(fg="#ffffff")
+                self.hazard_text.config(text="CRITICAL", fg="#ffffff")
+                self.alert_label.config(text=audio_message, fg="#ffffff")
+            elif highest_priority == 3:
+                self.hazard_indicator.config(fg="#dddddd")
+                self.hazard_text.config(text="WARNING", fg="#dddddd")
+                self.alert_label.config(text=audio_message, fg="#dddddd")
+            elif highest_priority == 2:
+                self.hazard_indicator.config(fg="#cccccc")
+                self.hazard_text.config(text="INFO", fg="#cccccc")
+                self.alert_label.config(text=audio_message, fg="#cccccc")
+            else:
+                self.hazard_indicator.config(fg="#aaaaaa")
+                self.hazard_text.config(text="SAFE", fg="#aaaaaa")
+                self.alert_label.config(text="No hazards detected", fg=self.COLORS['text_gray'])
+
+            # Display on GUI - paste into the existing PhotoImage when the size is unchanged
+            image = result['image']
+            if self.photo is None or (self.photo.width(), self.photo.height()) != image.size:
+                self.photo = ImageTk.PhotoImage(image=image)
+                self.video_frame.configure(image=self.photo)
+            else:
+                self.photo.paste(image)
+
+        self.window.after(self.display_interval_ms, self.update_video)
 
     def on_close(self):
-        self.cap.release()
+        if self.pipeline:
+            self.pipeline.stop()
+        self.metrics.stop()
+        if self.detection_log:
+            self.detection_log.close()
+        for priority, stats in self.alerts.latency_summary().items():
+            print(f"Alert latency (risk {priority}): p50 {stats['p50']} ms, p95 {stats['p95']} ms, "
+                  f"within target: {stats['within_target']}")
+        if self.cap:
+            self.cap.release()
         self.window.destroy()
 
 if __name__ == "__main__":
@@ -1,29 +1,122 @@
+import argparse
+import asyncio
 import cv2
-import pyttsx3
+import json
 import time
 import threading
-import queue
-import pygame
 import os
-from ultralytics import YOLO
+import signal
+from concurrent.futures import ThreadPoolExecutor
 import config  # Imports your config.py settings
+from detection import draw_detections
+from detector import BatchDetector
+from cameras import CameraRig, camera_directions, camera_groups, camera_processors
+from backends import load_model, warmup
+from audio import EarconBank, PhrasePlayer, speak_interruptible, template_phrases
+from alerts import AlertScheduler
+from startup import StartupLoader
+from metrics import Metrics
+from detection_log import open_session_log
+from workers import InferencePool
+from stream_server import StreamServer
+from power import DutyCycler
+import risk
 
 class NavAssistCore:
-    def __init__(self):
-        # --- AI Configuration ---
-        print("Loading AI Model...")
-        self.model = YOLO('best.pt')  # Uses your trained model
-        self.focal_length = 600
+    # Spoken direction per detection direction code (left / ahead / right)
+    DIRECTIONS = ("left", "ahead", "right")
+
+    def __init__(self, serve=None, headless=False):
+        # --- Parallel Startup (model, camera, TTS and mixer load concurrently) ---
+        self.sound_file = "beep-beep-6151.mp3"
+        self.alert_sound = None
+        self.pool = None
+        self.headless = headless  # run_headless(): no drawing / windows, asyncio loop
+        steps = {
+            'model': self.init_model,
+            'camera': self.init_camera,
+            'tts': self.init_tts,
+            'mixer': self.init_mixer,
+        }
+        if config.WORKERS['processes']:
+            steps['workers'] = self.init_workers
+        self.startup = StartupLoader(steps)
+        self.startup.start().wait()
+        print(self.startup.report())
+        if self.startup.errors:
+            raise RuntimeError(f"Startup failed: {', '.join(self.startup.errors)}")
+        self.first_alert_logged = False
+
+        # --- Pre-rendered Phrase Fragments (played through pygame.mixer) ---
+        labels = list(dict.fromkeys(d for camera in self.directions for d in camera))
+        self.phrases = PhrasePlayer(self.engine, self.processor.names + labels)
+        self.phrases.prewarm(template_phrases(self.get_audio_phrase, labels))
+
+        # --- Directional Earcons (risk / distance / position tones, rendered once) ---
+        self.earcons = EarconBank()
+
+        # --- Alert Scheduler (priority, dedup, expiry, preemption) ---
+        self.speech_interrupt = threading.Event()  # Set on preemption, acted on by the speech worker
+        self.alerts = AlertScheduler(on_preempt=self.interrupt_speech)
+        self.is_running = True
+
+        # --- Runtime Metrics (optional /metrics endpoint and CSV log) ---
+        self.metrics = Metrics()
+        self.metrics.watch_alerts(self.alerts)
+        self.metrics.watch_cameras(self.cap)
+
+        # --- Duty Cycling (lower detection rate while no hazards are around) ---
+        self.power = DutyCycler()
+        if self.power.enabled:
+            self.metrics.watch_power(self.power)
+            self.cap.set_pacer(lambda: self.power.capture_interval)
+        self.metrics.start()
+
+        # --- Risk Rules (reloaded from config.py while running) ---
+        self.config_watcher = risk.ConfigWatcher()
+
+        # --- Streaming Server (optional MJPEG video + SSE events on localhost) ---
+        serve = config.STREAM['enabled'] if serve is None else serve
+        self.stream = StreamServer().start() if serve else None
+
+        # --- Binary Detection Log (optional, for incident review / replay) ---
+        self.detection_log = open_session_log(self.processor.names, [p.focal_length for p in self.processors],
+                                              tracked=config.TRACKING.get('enabled', False))
         
+        # Start the background audio worker
+        threading.Thread(target=self.speech_worker, daemon=True).start()
+
+    def init_model(self):
+        # --- AI Configuration ---
+        self.model = load_model()  # Uses your trained model on the configured backend
+        # One processor per camera (focal length); all cameras share one batched model call
+        self.processors = camera_processors(self.model.names)
+        self.processor = self.processors[0]
+        self.directions = camera_directions(self.DIRECTIONS)
+        self.detector = BatchDetector(self.model, self.processors, groups=camera_groups())
+        if not config.WORKERS['processes']:
+            self.startup.record('warmup', warmup(self.model))
+
+    def init_workers(self):
+        # --- Process-Pool Inference (one model per worker, frames via shared memory) ---
+        self.pool = InferencePool().start()
+        print(f"✓ {self.pool.processes} inference workers ready")
+
+    def init_camera(self):
+        # config.CAMERAS, each read on its own thread into a ring of reusable buffers;
+        # a tick's frames go back to the rings (release_frames) once the tick is handled
+        self.cap = CameraRig()
+
+    def init_tts(self):
         # --- Audio Configuration ---
+        import pyttsx3  # Deferred: driver discovery is slow
         self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', 150)
-        
+        self.engine.setProperty('rate', config.AUDIO['rate'])
+
+    def init_mixer(self):
         # --- Sound Effect Setup (Pygame) ---
+        import pygame  # Deferred: only the mixer is used
         pygame.mixer.init()
-        self.sound_file = "beep-beep-6151.mp3"
-        self.alert_sound = None
-        
         if os.path.exists(self.sound_file):
             try:
                 self.alert_sound = pygame.mixer.Sound(self.sound_file)
@@ -33,155 +126,340 @@ class NavAssistCore:
         else:
             print("⚠ Warning: Beep file not found.")
 
-        # --- Thread-Safe Audio Queue ---
-        # Prevents "Run loop already started" errors
-        self.speech_queue = queue.Queue()
-        self.is_running = True
-        self.last_speech_time = 0
-        self.speech_cooldown = 3.0
-        
-        # Start the background audio worker
-        threading.Thread(target=self.speech_worker, daemon=True).start()
-
     def speech_worker(self):
         """Background thread that handles talking and beeping"""
         while self.is_running:
-            try:
-                item = self.speech_queue.get(timeout=1)
-            except queue.Empty:
+            # Short timeout while fragments are pending so idle time fills the cache
+            self.speech_interrupt.clear()  # Preemptions only apply to the alert taken next
+            alert = self.alerts.next(timeout=0.05 if self.phrases.pending else 1)
+            if alert is None:
+                self.phrases.warm_one()
                 continue
-            
-            if item is None: break
 
-            text, is_urgent = item
-            
+            if not self.first_alert_logged:
+                self.first_alert_logged = True
+                print(f"✓ Time to first alert: {self.startup.since_start():.2f}s")
+
+            self.metrics.observe('alert_wait', time.time() - alert.created)
+            t0 = time.perf_counter()
             try:
                 # 1. Play Beep (If Urgent)
-                if is_urgent and self.alert_sound:
+                if alert.urgent and self.alert_sound and not self.earcons.enabled:
                     self.alert_sound.play()
-                    time.sleep(0.5)
+                    self.speech_interrupt.wait(0.5)
 
-                # 2. Speak Text
-                self.engine.say(text)
-                self.engine.runAndWait()
+                # 2. Speak Text (cached fragments, falling back to live TTS)
+                started = lambda: self.alerts.started(alert)  # Enqueue -> playback latency
+                if not self.phrases.speak(alert.text, self.speech_interrupt, started):
+                    speak_interruptible(self.engine, alert.text, self.speech_interrupt, started)
             except Exception as e:
+                self.metrics.inc('speech_errors_total')
                 print(f"Speech Error: {e}")
-            
-            self.speech_queue.task_done()
 
-    def speak_warning(self, text, priority_level):
-        """Adds text to the queue based on priority"""
-        current_time = time.time()
-        is_urgent = (priority_level >= 4)
+            self.metrics.observe('speech', time.perf_counter() - t0)
+            self.alerts.finished(alert)
+
+    def interrupt_speech(self):
+        """
+        Called by the scheduler (on the detection thread) when a critical alert
+        preempts current speech; the speech worker stops the audio on its own thread.
+        """
+        self.speech_interrupt.set()
+
+    def speak_warning(self, text, priority_level, key=None):
+        """Hands the alert to the scheduler. Returns True if it was queued."""
+        return self.alerts.submit(text, priority_level, key)
+
+    @staticmethod
+    def get_audio_phrase(class_name, dist, direction, group):
+        """Returns the phrase template from config.py (RISK_CONFIG with FRONTEND_PHRASES['main'])"""
+        return risk.table().phrase(class_name, dist, direction, group, frontend='main')
+
+    def log_tick(self, frame_id, timestamp, widths, raw):
+        """Appends one tick's pre-tracker detections to the detection log (widths[i] is None without a frame)."""
+        if not self.detection_log:
+            return
+        for camera, (width, dets) in enumerate(zip(widths, raw)):
+            if width is not None:
+                self.detection_log.append(frame_id, timestamp, dets, width, camera)
+
+    def alert_tick(self, frame_id, timestamp, frames, detections, draw=True):
+        """Earcons / speech for each camera's top object, optionally drawing boxes. Returns (warning, events)."""
+        self.config_watcher.check()
+        # Prioritize Audio - each camera's top object goes to the one alert scheduler
+        warning = None
+        events = []
+        for camera, (frame, dets) in enumerate(zip(frames, detections)):
+            if frame is None:
+                continue
+            if draw:
+                draw_detections(frame, dets, self.processors[camera])
+
+            top = self.processors[camera].top(dets)
+            if top is None:
+                continue
+            class_name, dist, direction, group = self.processors[camera].describe(dets[top])
+            highest_priority = int(dets[top]['risk'])
+            audio_message = self.get_audio_phrase(class_name, dist, self.directions[camera][direction], group)
+            alert_key = (camera, class_name, direction)
+
+            # Trigger Audio if needed: the earcon fires now, speech goes through the scheduler
+            if highest_priority > 0 and audio_message:
+                if self.earcons.play_detection(dets[top], frame.shape[1], alert_key):
+                    self.metrics.inc('earcons_total', risk=highest_priority)
+                queued = False
+                if self.earcons.speaks(highest_priority):
+                    with self.metrics.time('speech_enqueue'):
+                        queued = self.speak_warning(audio_message, highest_priority, alert_key)
+                if queued and self.stream:
+                    events.append({'type': 'alert', 't': timestamp, 'frame': frame_id, 'camera': camera,
+                                   'priority': highest_priority, 'phrase': audio_message})
+                if highest_priority >= 3 and (warning is None or highest_priority > warning[0]):
+                    warning = (highest_priority, audio_message)
+        return warning, events
+
+    def handle_tick(self, frame_id, timestamp, frames, detections, raw):
+        """Log, draw, alert and display one tick's frames. Returns False to quit."""
+        self.ticks += 1
+        draw = self.power.draw  # Suspended while duty cycling
+        self.log_tick(frame_id, timestamp, [f.shape[1] if f is not None else None for f in frames], raw)
+        warning, events = self.alert_tick(frame_id, timestamp, frames, detections, draw)
+
+        # Visual Alert on Screen
+        frame = frames[0]
+        if warning and draw:
+            cv2.putText(frame, f"WARNING: {warning[1]}", (50, 50), 
+                      cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 3)
+
+        if self.stream:
+            self.publish(frame_id, timestamp, frames, detections, events)
+
+        if draw:
+            cv2.imshow("NavAssist Headless Mode", frame)
+            for camera, other in zip(self.cap.cameras[1:], frames[1:]):
+                if other is not None:
+                    cv2.imshow(f"NavAssist - {camera.name}", other)
         
-        # Priority 4 (Critical) interrupts everything
-        if is_urgent:
-            try:
-                self.engine.stop()
-                with self.speech_queue.mutex:
-                    self.speech_queue.queue.clear()
-            except:
-                pass
-            self.speech_queue.put((text, True))
-            self.last_speech_time = current_time
-            
-        # Standard Priority (only if cooldown passed)
-        elif current_time - self.last_speech_time > self.speech_cooldown:
-            self.speech_queue.put((text, False))
-            self.last_speech_time = current_time
-
-    def get_direction(self, x1, x2, width):
-        """Returns: Left / Right / Ahead"""
-        center = (x1 + x2) / 2
-        if center < width / 3: return "left"
-        if center > (width / 3) * 2: return "right"
-        return "ahead"
-
-    def get_audio_phrase(self, class_name, dist, direction, group):
-        """Returns the specific text from your documentation"""
-        if group == 'G1': # Critical
-            return f"Warning! {class_name} detected {dist} meters {direction}. Stop."
-        if group == 'G6' and dist < 3: # Traffic
-            return f"Stop! {class_name} approaching {direction}."
-        if group == 'G3': # Construction
-            return f"Caution, construction hazard {dist} meters {direction}."
-        return f"{class_name} {dist} meters {direction}."
+        return not (cv2.waitKey(1) & 0xFF == ord('q'))
+
+    def stop(self):
+        """Ends run() after the current frame (usable from other threads)."""
+        self.is_running = False
+
+    def publish(self, frame_id, timestamp, frames, detections, events):
+        """Hands the annotated primary frame and this tick's events to the stream server."""
+        if frames[0] is not None:
+            self.stream.publish_frame(frames[0])
+        if self.stream.subscribers:
+            self.stream.publish_event({
+                'type': 'detections', 't': timestamp, 'frame': frame_id,
+                'cameras': [{'camera': camera, 'detections': self.processors[camera].to_dicts(dets)}
+                            for camera, (frame, dets) in enumerate(zip(frames, detections)) if frame is not None],
+            })
+            for event in events:
+                self.stream.publish_event(event)
+
+    def detect_tick(self, frame_id, timestamp, frames):
+        """
+        Runs detection on one captured tick. Returns the ticks ready for output (pool results lag
+        behind) as (frame_id, timestamp, frames, detections, pre-tracker detections).
+        """
+        # Run YOLO (one batched call for all cameras, or propagate tracks) + distance / direction / risk
+        if self.pool:
+            # Worker processes: results come back in frame order, a few frames behind
+            wanted = self.detector.schedule(frames, timestamp)  # detect_every / motion gate
+            if self.pool.submit(wanted, (frame_id, timestamp, frames), conf=self.detector.run_conf,
+                                imgsz=self.detector.imgsz) is None:
+                self.metrics.inc('frames_total', mode='dropped')  # All workers busy
+                self.cap.release_frames(frames)
+            ticks = []
+            for _, (fid, ts, tick_frames), boxes, latency in self.pool.ready():
+                detections = self.detector.update_boxes(boxes, tick_frames, ts, latency)
+                self.metrics.observe_frame(self.detector, sum(map(len, detections)), latency)
+                ticks.append((fid, ts, tick_frames, detections, self.detector.raw_detections()))
+        else:
+            t0 = time.perf_counter()
+            detections = self.detector.detect(frames, timestamp)
+            self.metrics.observe_frame(self.detector, sum(map(len, detections)), time.perf_counter() - t0)
+            ticks = [(frame_id, timestamp, frames, detections, self.detector.raw_detections())]
+        for tick in ticks:
+            self.power.update(tick[3])
+        return ticks
 
     def run(self):
-        cap = cv2.VideoCapture(0)
-        cap.set(3, 1280)
-        cap.set(4, 720)
+        cap = self.cap
         
         print("System Started. Press 'Q' to exit.")
+        self.ticks = 0
+        self.run_started = time.perf_counter()
 
-        while True:
-            ret, frame = cap.read()
+        frame_id = 0
+        running = True
+        while running and self.is_running:
+            self.power.pace()
+            with self.metrics.time('capture'):
+                ret, frames = cap.read()
             if not ret: break
-            
-            height, width, _ = frame.shape
-            
-            # Run YOLO
-            results = self.model(frame, stream=True, conf=0.4, verbose=False)
-            
-            highest_priority = 0
-            audio_message = ""
-
-            for r in results:
-                for box in r.boxes:
-                    # Data Extraction
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    cls_id = int(box.cls[0])
-                    class_name = self.model.names[cls_id]
-                    
-                    # Distance Logic
-                    real_h = config.OBJECT_HEIGHTS.get(class_name, 1.0)
-                    bbox_h = y2 - y1
-                    dist = round((real_h * self.focal_length) / bbox_h, 1) if bbox_h > 0 else 0
-                    
-                    # Context
-                    group = config.CLASS_TO_GROUP.get(class_name, 'G8')
-                    direction = self.get_direction(x1, x2, width)
-                    
-                    # Risk Scoring (The logic from your document)
-                    risk = 1
-                    if group == 'G1': risk = 4          # Fire/Weapons
-                    elif group == 'G6' and dist < 4: risk = 4  # Close Traffic
-                    elif group == 'G3' and dist < 2: risk = 3  # Construction
-                    elif dist < 1.0: risk = 3           # Close Obstacles
-                    elif group in ['G4', 'G7']: risk = 2
-                    
-                    # Visualization Colors
-                    color = (0, 255, 0) # Green
-                    if risk == 4: color = (0, 0, 255) # Red
-                    elif risk == 3: color = (0, 165, 255) # Orange
-                    
-                    # Draw
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                    cv2.putText(frame, f"{class_name} {dist}m", (x1, y1-10), 
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-                    
-                    # Prioritize Audio
-                    if risk > highest_priority:
-                        highest_priority = risk
-                        audio_message = self.get_audio_phrase(class_name, dist, direction, group)
-
-            # Trigger Audio if needed
-            if highest_priority > 0 and audio_message:
-                self.speak_warning(audio_message, highest_priority)
-                # Visual Alert on Screen
-                if highest_priority >= 3:
-                    cv2.putText(frame, f"WARNING: {audio_message}", (50, 50), 
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 3)
+            frame_id += 1
+            timestamp = cap.timestamp  # Grab time of the primary frame
+            self.metrics.observe('frame_age', time.time() - timestamp)
 
-            cv2.imshow("NavAssist Headless Mode", frame)
-            
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
+            for tick in self.detect_tick(frame_id, timestamp, frames):
+                running = self.handle_tick(*tick)
+                cap.release_frames(tick[2])
+                if not running:
+                    break
 
-        self.is_running = False
-        cap.release()
+        self.shutdown()
         cv2.destroyAllWindows()
 
+    # --- Headless Mode (no display server, no drawing) ---
+    def run_headless(self):
+        """Capture, inference and output sinks on an asyncio loop; stops on SIGINT / SIGTERM or end of input."""
+        print("System Started (headless). Press Ctrl+C or send SIGTERM to exit.")
+        asyncio.run(self._run_async())
+        self.shutdown()
+
+    async def _run_async(self):
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:  # Windows event loops
+                signal.signal(sig, lambda *_: loop.call_soon_threadsafe(stop.set))
+
+        self.ticks = 0
+        self.run_started = time.perf_counter()
+        # Sinks run concurrently with detection; alerts keep only the newest ticks, the log keeps all
+        sinks = {
+            'alerts': (asyncio.Queue(maxsize=2), self._headless_alerts),
+            'log': (asyncio.Queue(), self.log_tick),
+        }
+        sink_tasks = [asyncio.create_task(self._sink(name, queue, handle)) for name, (queue, handle) in sinks.items()]
+        with ThreadPoolExecutor(1, thread_name_prefix='inference') as executor:
+            detect = asyncio.create_task(self._detect_loop(executor, sinks, stop))
+            await stop.wait()
+            detect.cancel()
+            await asyncio.gather(detect, return_exceptions=True)
+            try:
+                await asyncio.wait_for(asyncio.gather(*(q.join() for q, _ in sinks.values())), timeout=5.0)
+            except asyncio.TimeoutError:
+                print("⚠ Output sinks did not drain before shutdown")
+        for task in sink_tasks:
+            task.cancel()
+        await asyncio.gather(*sink_tasks, return_exceptions=True)
+
+    async def _detect_loop(self, executor, sinks, stop):
+        loop = asyncio.get_running_loop()
+        frame_id = 0
+        try:
+            while self.is_running:
+                if self.power.enabled:
+                    await loop.run_in_executor(executor, self.power.pace)
+                t0 = time.perf_counter()
+                ret, frames = await loop.run_in_executor(executor, self.cap.read)
+                self.metrics.observe('capture', time.perf_counter() - t0)
+                if not ret:
+                    break
+                frame_id += 1
+                timestamp = self.cap.timestamp  # Grab time of the primary frame
+                self.metrics.observe('frame_age', time.time() - timestamp)
+
+                for fid, ts, tick_frames, detections, raw in await loop.run_in_executor(
+                        executor, self.detect_tick, frame_id, timestamp, frames):
+                    self.ticks += 1
+                    widths = [f.shape[1] if f is not None else None for f in tick_frames]
+                    self._offer(sinks['alerts'][0], (fid, ts, tick_frames, detections),
+                                on_drop=lambda item: self.cap.release_frames(item[2]))
+                    self._offer(sinks['log'][0], (fid, ts, widths, raw))
+        finally:
+            stop.set()
+
+    def _offer(self, queue, item, on_drop=None):
+        """Non-blocking put; a full queue drops its oldest item (passed to on_drop)."""
+        if queue.full():
+            dropped = queue.get_nowait()
+            queue.task_done()
+            self.metrics.inc('sink_dropped_total')
+            if on_drop:
+                on_drop(dropped)
+        queue.put_nowait(item)
+
+    async def _sink(self, name, queue, handle):
+        while True:
+            item = await queue.get()
+            try:
+                handle(*item)
+            except Exception as e:
+                print(f"⚠ {name} sink error: {e}")
+            finally:
+                queue.task_done()
+
+    def _headless_alerts(self, frame_id, timestamp, frames, detections):
+        # Boxes are only drawn while someone is watching the stream
+        draw = bool(self.stream and self.stream.viewers)
+        try:
+            warning, events = self.alert_tick(frame_id, timestamp, frames, detections, draw)
+            if self.stream:
+                self.publish(frame_id, timestamp, frames, detections, events)
+        finally:
+            self.cap.release_frames(frames)
+
+    def shutdown(self):
+        """Stops the background services and prints the run summary."""
+        self.is_running = False
+        elapsed = time.perf_counter() - self.run_started
+        if self.pool:
+            self.pool.close()
+        self.metrics.stop()
+        if self.stream:
+            self.stream.stop()
+        if self.detection_log:
+            self.detection_log.close()
+        self.cap.release()
+        if self.power.enabled:
+            print(self.power.report())
+        for priority, stats in self.alerts.latency_summary().items():
+            print(f"Alert latency (risk {priority}): p50 {stats['p50']} ms, p95 {stats['p95']} ms, "
+                  f"within target: {stats['within_target']}")
+        self.throughput = {'mode': 'headless' if self.headless else 'windowed', 'frames': self.ticks,
+                           'elapsed_s': round(elapsed, 2), 'fps': round(self.ticks / elapsed, 2) if elapsed else 0.0}
+        print(f"Throughput ({self.throughput['mode']}): {self.ticks} frames in {elapsed:.1f}s "
+              f"({self.throughput['fps']} FPS)")
+
 if __name__ == "__main__":
-    app = NavAssistCore()
-    app.run()
+    parser = argparse.ArgumentParser(description="NavAssist lightweight runner")
+    parser.add_argument('--headless', action='store_true',
+                        help="No display: skip all drawing / windows, stop with Ctrl+C or SIGTERM")
+    parser.add_argument('--serve', action='store_true', default=None,
+                        help="Serve annotated MJPEG video and SSE detection events (config.STREAM)")
+    parser.add_argument('--source', help="Video file / device / URL for the first camera (overrides config)")
+    parser.add_argument('--unpaced', action='store_true',
+                        help="Read a --source video as fast as it decodes instead of at its frame rate")
+    parser.add_argument('--loop', action='store_true', help="Restart a --source video at its end")
+    parser.add_argument('--stub', action='store_true', help="Use the stub detector instead of the model")
+    parser.add_argument('--stub-ms', type=float, default=0, help="CPU time the stub burns per frame")
+    parser.add_argument('--duration', type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument('--report', help="Write the throughput summary as JSON to this path")
+    args = parser.parse_args()
+
+    if args.source is not None:
+        source = int(args.source) if args.source.isdigit() else args.source
+        config.CAMERAS[0] = dict(config.CAMERAS[0], source=source, realtime=not args.unpaced,
+                                 loop=args.loop)
+    if args.stub:
+        config.MODEL['stub'] = {'busy_ms': args.stub_ms}
+
+    app = NavAssistCore(serve=args.serve, headless=args.headless)
+    if args.duration:
+        timer = threading.Timer(args.duration, app.stop)
+        timer.daemon = True
+        timer.start()
+    if args.headless:
+        app.run_headless()
+    else:
+        app.run()
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(dict(app.throughput, source=args.source), f, indent=2)
@@ -0,0 +1,348 @@
+"""
+Runtime metrics: per-stage latency histograms, detections per frame,
+counters and gauges (speech queue depth, dropped frames, alerts per risk
+level), exposed as Prometheus text on a localhost HTTP endpoint and/or
+appended to a rolling CSV log.
+
+    curl http://127.0.0.1:9108/metrics     # with METRICS['http_port'] = 9108
+"""
+import csv
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import config  # Imports your config.py settings
+
+PREFIX = 'navassist'
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus `le` semantics)."""
+
+    def __init__(self, bounds):
+        self.bounds = np.asarray(bounds, dtype=np.float64)
+        self.counts = np.zeros(len(self.bounds) + 1, dtype=np.int64)  # Last bucket = +Inf
+        self.sum = 0.0
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def observe(self, value):
+        self.counts[np.searchsorted(self.bounds, value)] += 1
+        self.sum += value
+
+    def quantile(self, q, counts=None):
+        """Upper bound of the bucket holding quantile `q` (of `counts`, default all)."""
+        counts = self.counts if counts is None else counts
+        total = counts.sum()
+        if not total:
+            return None
+        i = int(np.searchsorted(np.cumsum(counts), q * total))
+        return float(self.bounds[i]) if i < len(self.bounds) else float('inf')
+
+
+class Reservoir:
+    """Bounded uniform sample (Algorithm R) of raw values, for exact percentiles."""
+
+    def __init__(self, size):
+        self.values = np.empty(size, dtype=np.float64)
+        self.seen = 0
+
+    def add(self, value):
+        if self.seen < len(self.values):
+            self.values[self.seen] = value
+        else:
+            j = random.randrange(self.seen + 1)
+            if j < len(self.values):
+                self.values[j] = value
+        self.seen += 1
+
+    def sample(self):
+        return self.values[:min(self.seen, len(self.values))].copy()
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+
+def _format(value):
+    return '+Inf' if value == float('inf') else f'{value:g}'
+
+
+class Metrics:
+    """
+    Thread-safe instrumentation shared by the detection loop and the speech
+    worker. Stage timings go to histograms, events to labelled counters;
+    gauges are read from callbacks at export time so the hot path only pays
+    for a lock and an increment.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or config.METRICS
+        self.enabled = self.settings.get('enabled', True)
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.latency_bounds = [ms / 1000 for ms in self.settings['latency_buckets_ms']]
+        self.stages = {}                                # stage -> Histogram (seconds)
+        self.detections = Histogram(self.settings['detection_buckets'])
+        self.counters = defaultdict(float)              # (name, labels) -> value
+        self.gauges = {}                                # name -> (help, fn)
+        self._reservoir_size = 0                        # keep_samples(): raw timings per stage
+        self._reservoirs = {}
+        self._server = None
+        self._stop = threading.Event()
+        self._csv_thread = None
+        self._csv_previous = {}
+
+    # --- Recording ---
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self.stages.get(stage)
+            if hist is None:
+                hist = self.stages[stage] = Histogram(self.latency_bounds)
+            hist.observe(seconds)
+            if self._reservoir_size:
+                reservoir = self._reservoirs.get(stage)
+                if reservoir is None:
+                    reservoir = self._reservoirs[stage] = Reservoir(self._reservoir_size)
+                reservoir.add(seconds)
+
+    def keep_samples(self, size):
+        """Also keeps up to `size` raw timings per stage until the next take_samples()."""
+        with self._lock:
+            self._reservoir_size = int(size)
+            self._reservoirs = {}
+
+    def take_samples(self):
+        """{stage: (observations, raw sample in seconds)} since the previous call."""
+        with self._lock:
+            reservoirs, self._reservoirs = self._reservoirs, {}
+        return {stage: (r.seen, r.sample()) for stage, r in reservoirs.items()}
+
+    @contextmanager
+    def time(self, stage):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - t0)
+
+    def observe_detections(self, n):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.detections.observe(n)
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self.counters[key] += amount
+
+    def observe_frame(self, detector, n_detections, seconds):
+        """Detection-loop sample: total detect time, model latency and detection count."""
+        if not self.enabled:
+            return
+        self.observe('detect', seconds)
+        if detector.ran_model:
+            self.observe('inference', detector.last_latency)
+        self.inc('frames_total', mode='inferred' if detector.ran_model else 'reused')
+        self.observe_detections(n_detections)
+
+    def gauge(self, name, fn, help_text=''):
+        """Registers a gauge read at export time. `fn` returns a number or {labels_tuple: number}."""
+        self.gauges[name] = (help_text, fn)
+
+    def watch_alerts(self, scheduler):
+        """Exports the scheduler's per-risk counters and queue depth."""
+        self.gauge('speech_queue_depth', scheduler.depth, 'Alerts waiting for the speech worker')
+        self.gauge('alerts_total', lambda: {
+            (('event', event), ('risk', priority)): n
+            for priority, events in scheduler.snapshot_counts().items()
+            for event, n in events.items()
+        }, 'Alerts per risk level and outcome (issued, suppressed, spoken, ...)')
+
+    def watch_pipeline(self, pipeline):
+        self.gauge('dropped_frames_total', lambda: {
+            (('stage', stage),): n for stage, n in pipeline.dropped_frames().items()
+        }, 'Frames replaced before the next stage consumed them')
+
+    def watch_cameras(self, rig):
+        self.gauge('camera_frames_total', lambda: {
+            (('camera', name), ('event', event)): n
+            for name, stats in rig.stats().items() for event, n in stats.items()
+        }, 'Camera frames grabbed, dropped before use, drained from the driver queue, or grabbed without a free buffer')
+
+    def watch_power(self, cycler):
+        self.gauge('power_state_seconds_total', lambda: {
+            (('state', state),): round(secs, 1) for state, secs in cycler.state_seconds().items()
+        }, 'Seconds spent in each duty-cycle power state')
+
+    # --- Export ---
+    def _gauge_values(self):
+        values = {}
+        for name, (help_text, fn) in list(self.gauges.items()):
+            try:
+                value = fn()
+            except Exception:
+                continue
+            values[name] = (help_text, value if isinstance(value, dict) else {(): value})
+        return values
+
+    def prometheus(self):
+        """Current state in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            stages = {s: (h.counts.copy(), h.sum) for s, h in self.stages.items()}
+            detections = (self.detections.counts.copy(), self.detections.sum)
+            counters = dict(self.counters)
+
+        def histogram(name, help_text, series, bounds):
+            lines.extend([f'# HELP {PREFIX}_{name} {help_text}', f'# TYPE {PREFIX}_{name} histogram'])
+            for labels, (counts, total) in series:
+                cumulative = np.cumsum(counts)
+                for bound, n in zip(list(bounds) + [float('inf')], cumulative):
+                    lines.append(f'{PREFIX}_{name}_bucket{_labels(labels + (("le", _format(bound)),))} {n}')
+                lines.append(f'{PREFIX}_{name}_sum{_labels(labels)} {total:g}')
+                lines.append(f'{PREFIX}_{name}_count{_labels(labels)} {cumulative[-1]}')
+
+        histogram('stage_seconds', 'Per-stage latency',
+                  [((('stage', s),), v) for s, v in sorted(stages.items())], self.latency_bounds)
+        histogram('detections_per_frame', 'Detections per processed frame',
+                  [((), detections)], self.detections.bounds)
+
+        names = sorted({name for name, _ in counters})
+        for name in names:
+            lines.append(f'# TYPE {PREFIX}_{name} counter')
+            for (n, labels), value in sorted(counters.items()):
+                if n == name:
+                    lines.append(f'{PREFIX}_{name}{_labels(labels)} {value:g}')
+
+        for name, (help_text, series) in sorted(self._gauge_values().items()):
+            kind = 'counter' if name.endswith('_total') else 'gauge'
+            lines.extend([f'# HELP {PREFIX}_{name} {help_text}', f'# TYPE {PREFIX}_{name} {kind}'])
+            for labels, value in sorted(series.items()):
+                lines.append(f'{PREFIX}_{name}{_labels(labels)} {value:g}')
+
+        lines.append(f'{PREFIX}_uptime_seconds {time.time() - self.started:.1f}')
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        """
+        Flat (name, labels, value) rows for the CSV log. Stage percentiles and
+        counts cover only the interval since the previous snapshot.
+        """
+        rows = []
+        with self._lock:
+            stages = {s: h.counts.copy() for s, h in self.stages.items()}
+            detections = self.detections.counts.copy()
+            det_sum = self.detections.sum
+            counters = dict(self.counters)
+
+        for stage, counts in sorted(stages.items()):
+            delta = counts - self._csv_previous.get(stage, 0)
+            self._csv_previous[stage] = counts
+            hist = self.stages[stage]
+            rows.append(('stage_count', stage, int(delta.sum())))
+            for q in (0.5, 0.95):
+                value = hist.quantile(q, delta)
+                if value is not None:
+                    rows.append((f'stage_p{int(q * 100)}_ms', stage, value * 1000))
+
+        frames = int(detections.sum())
+        rows.append(('frames', '', frames))
+        if frames:
+            rows.append(('detections_mean', '', det_sum / frames))
+        for (name, labels), value in sorted(counters.items()):
+            rows.append((name, ';'.join(f'{k}={v}' for k, v in labels), value))
+        for name, (_, series) in sorted(self._gauge_values().items()):
+            for labels, value in sorted(series.items()):
+                rows.append((name, ';'.join(f'{k}={v}' for k, v in labels), value))
+        return rows
+
+    # --- Background Exporters ---
+    def start(self):
+        """Starts the HTTP endpoint and/or CSV log if configured."""
+        if not self.enabled:
+            return self
+        port = self.settings.get('http_port')
+        if port:
+            self._server = ThreadingHTTPServer((self.settings.get('http_host', '127.0.0.1'), port),
+                                               self._handler())
+            threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+            print(f"✓ Metrics at http://{self._server.server_address[0]}:{self._server.server_address[1]}/metrics")
+        if self.settings.get('csv_path'):
+            self._csv_thread = threading.Thread(target=self._csv_loop, name='metrics-csv', daemon=True)
+            self._csv_thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._csv_thread:
+            self._csv_thread.join(timeout=1.0)
+            self.write_csv()  # Final interval
+
+    def _handler(self):
+        metrics = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # Keep scrapes out of the console
+
+        return _Handler
+
+    def _csv_loop(self):
+        while not self._stop.wait(self.settings.get('csv_interval_s', 10)):
+            self.write_csv()
+
+    def write_csv(self):
+        path = self.settings['csv_path']
+        if os.path.exists(path) and os.path.getsize(path) >= self.settings.get('csv_max_bytes', 5_000_000):
+            self._rotate(path)
+        new = not os.path.exists(path)
+        now = time.strftime('%Y-%m-%dT%H:%M:%S')
+        try:
+            with open(path, 'a', newline='') as f:
+                writer = csv.writer(f)
+                if new:
+                    writer.writerow(['time', 'metric', 'labels', 'value'])
+                for name, labels, value in self.snapshot():
+                    writer.writerow([now, name, labels, round(value, 3) if isinstance(value, float) else value])
+        except OSError as e:
+            print(f"⚠ Metrics CSV error: {e}")
+
+    def _rotate(self, path):
+        """metrics.csv -> metrics.csv.1 -> ... keeping `csv_backups` old files."""
+        backups = self.settings.get('csv_backups', 3)
+        for i in range(backups - 1, 0, -1):
+            if os.path.exists(f"{path}.{i}"):
+                os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+        if backups:
+            os.replace(path, f"{path}.1")
+        else:
+            os.remove(path)
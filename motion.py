@@ -0,0 +1,63 @@
+import cv2
+import numpy as np
+import config  # Imports your config.py settings
+from detection import GROUP_INDEX
+
+
+class MotionGate:
+    """
+    Cheap static-scene check in front of the model.
+    Each frame is shrunk to a small grayscale thumbnail and compared block by
+    block with the thumbnail of the last frame that was actually inferred.
+    If too few blocks changed, inference is skipped and the previous
+    detections are reused - but never for longer than the staleness limit,
+    which is shorter while critical (G1/G6) objects are in view.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or config.MOTION
+        self.thumb_size = tuple(self.settings['thumb_size'])  # (width, height)
+        self.block = self.settings['block']
+        self.critical_groups = np.array([GROUP_INDEX[g] for g in self.settings['critical_groups']])
+
+        self.reference = None
+        self.reference_time = 0.0
+        self.checked = 0
+        self.skipped = 0
+        self.last_changed = 1.0
+
+    @property
+    def skip_rate(self):
+        return self.skipped / self.checked if self.checked else 0.0
+
+    def thumbnail(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, self.thumb_size, interpolation=cv2.INTER_AREA)
+
+    def changed_fraction(self, thumb):
+        """Share of blocks with at least one pixel changed past the threshold."""
+        diff = cv2.absdiff(thumb, self.reference) > self.settings['pixel_threshold']
+        h, w = diff.shape
+        b = self.block
+        blocks = diff[:h - h % b, :w - w % b].reshape(h // b, b, w // b, b)
+        return float(blocks.any(axis=(1, 3)).mean())
+
+    def should_infer(self, frame, timestamp, last_dets):
+        """True if the model must run on `frame`; False to reuse `last_dets`."""
+        thumb = self.thumbnail(frame)
+        self.checked += 1
+
+        run = self.reference is None
+        if not run:
+            critical = len(last_dets) and np.isin(last_dets['group'], self.critical_groups).any()
+            max_age = self.settings['critical_staleness_s'] if critical else self.settings['max_staleness_s']
+            self.last_changed = self.changed_fraction(thumb)
+            run = (timestamp - self.reference_time >= max_age or
+                   self.last_changed >= self.settings['changed_blocks'])
+
+        if run:
+            self.reference = thumb
+            self.reference_time = timestamp
+        else:
+            self.skipped += 1
+        return run
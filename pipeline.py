@@ -0,0 +1,219 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+# A captured camera frame. `timestamp` is wall-clock time at grab.
+FramePacket = namedtuple('FramePacket', ['frame_id', 'timestamp', 'image'])
+
+
+class LatestSlot:
+    """
+    Bounded single-item handoff between pipeline stages.
+    A new item replaces an unconsumed one (counted as dropped), so the
+    consumer always sees the newest data instead of a stale backlog.
+    `on_drop(item)` is called for every replaced item.
+    """
+
+    def __init__(self, name, on_drop=None):
+        self.name = name
+        self.on_drop = on_drop
+        self.dropped = 0
+        self._cond = threading.Condition()
+        self._item = None
+        self._has_item = False
+        self._closed = False
+
+    def put(self, item):
+        with self._cond:
+            replaced = self._has_item
+            if replaced:
+                self.dropped += 1
+                old = self._item
+            self._item = item
+            self._has_item = True
+            self._cond.notify()
+        if replaced and self.on_drop:
+            self.on_drop(old)
+
+    def get(self, timeout=None):
+        """Waits for a fresh item. Returns None on timeout or when closed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._has_item and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if not self._has_item:
+                return None
+            item = self._item
+            self._item = None
+            self._has_item = False
+            return item
+
+    def get_nowait(self):
+        return self.get(timeout=0)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class PipelineStats:
+    """Thread-safe counters shared by all pipeline stages"""
+
+    def __init__(self, window=100):
+        self._lock = threading.Lock()
+        self.frames_captured = 0
+        self.frames_inferred = 0
+        self.frames_rendered = 0
+        self.alerts = 0
+        self._alert_latencies = deque(maxlen=window)
+
+    def count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def record_alert_latency(self, seconds):
+        with self._lock:
+            self.alerts += 1
+            self._alert_latencies.append(seconds)
+
+    def alert_latency_ms(self):
+        """Returns (last, average) capture-to-playback-start latency in ms."""
+        with self._lock:
+            if not self._alert_latencies:
+                return 0.0, 0.0
+            last = self._alert_latencies[-1]
+            avg = sum(self._alert_latencies) / len(self._alert_latencies)
+        return last * 1000, avg * 1000
+
+
+class Pipeline:
+    """
+    Capture -> Inference -> Render, each on its own thread.
+    Stages are connected by LatestSlots so a slow stage drops stale
+    frames instead of queueing them up and adding latency.
+
+    infer_fn(packet)  -> result passed to render_fn (runs detection + alerts)
+    render_fn(result) -> display item picked up with `latest()` (drawing)
+
+    `render_fps` caps the render stage independently of the inference rate;
+    results arriving faster than that are dropped, not drawn.
+    `metrics` (optional metrics.Metrics) receives capture/render stage timings.
+    Captured images are handed back with `cap.release_frames` (if the
+    source has it) once rendered, dropped or failed.
+    """
+
+    def __init__(self, cap, infer_fn, render_fn, render_fps=None, metrics=None):
+        self.cap = cap
+        self.metrics = metrics
+        self.infer_fn = infer_fn
+        self.render_fn = render_fn
+        self.render_interval = 1.0 / render_fps if render_fps else 0.0
+        self.stats = PipelineStats()
+        self._release = getattr(cap, 'release_frames', None)
+
+        self.frames = LatestSlot('capture', on_drop=self._done)
+        self.detections = LatestSlot('inference', on_drop=lambda item: self._done(item[0]))
+        self.display = LatestSlot('render')
+
+        self._active = threading.Event()
+        self._stopped = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name='capture', daemon=True),
+            threading.Thread(target=self._inference_loop, name='inference', daemon=True),
+            threading.Thread(target=self._render_loop, name='render', daemon=True),
+        ]
+
+    def start(self):
+        for t in self._threads:
+            t.start()
+
+    def resume(self):
+        self._active.set()
+
+    def pause(self):
+        self._active.clear()
+
+    def stop(self):
+        self._stopped.set()
+        self._active.set()  # Wake paused threads so they can exit
+        for slot in (self.frames, self.detections, self.display):
+            slot.close()
+        for t in self._threads:
+            if t.is_alive():
+                t.join(timeout=1.0)
+
+    def latest(self):
+        """Non-blocking: newest rendered item, or None if nothing new."""
+        item = self.display.get_nowait()
+        if item is not None:
+            self.stats.count('frames_rendered')
+        return item
+
+    def _done(self, packet):
+        if self._release:
+            self._release(packet.image)
+
+    def dropped_frames(self):
+        return {slot.name: slot.dropped for slot in (self.frames, self.detections, self.display)}
+
+    # --- Stage Loops ---
+    def _wait_active(self):
+        self._active.wait()
+        return not self._stopped.is_set()
+
+    def _capture_loop(self):
+        frame_id = 0
+        while self._wait_active():
+            t0 = time.perf_counter()
+            ret, image = self.cap.read()
+            timestamp = getattr(self.cap, 'timestamp', None) or time.time()  # Grab time if the source keeps it
+            if self.metrics:
+                self.metrics.observe('capture', time.perf_counter() - t0)
+            if not ret:
+                time.sleep(0.01)
+                continue
+            frame_id += 1
+            self.stats.count('frames_captured')
+            self.frames.put(FramePacket(frame_id, timestamp, image))
+
+    def _inference_loop(self):
+        while self._wait_active():
+            packet = self.frames.get(timeout=0.1)
+            if packet is None:
+                continue
+            try:
+                result = self.infer_fn(packet)
+            except Exception as e:
+                print(f"Inference Error: {e}")
+                self._done(packet)
+                continue
+            self.stats.count('frames_inferred')
+            self.detections.put((packet, result))
+
+    def _render_loop(self):
+        next_render = 0.0
+        while self._wait_active():
+            # Display-rate cap: newer results overwrite older ones while we wait
+            delay = next_render - time.monotonic()
+            if delay > 0:
+                self._stopped.wait(delay)
+            inferred = self.detections.get(timeout=0.1)
+            if inferred is None:
+                continue
+            packet, result = inferred
+            next_render = time.monotonic() + self.render_interval
+            t0 = time.perf_counter()
+            try:
+                item = self.render_fn(result)
+            except Exception as e:
+                print(f"Render Error: {e}")
+                continue
+            finally:
+                self._done(packet)
+            if self.metrics:
+                self.metrics.observe('render', time.perf_counter() - t0)
+            self.display.put(item)
@@ -0,0 +1,115 @@
+import threading
+import time
+
+import numpy as np
+import config  # Imports your config.py settings
+from detection import GROUP_INDEX
+
+# Power states, most to least awake
+ACTIVE, IDLE, SLEEP = 'active', 'idle', 'sleep'
+STATES = (ACTIVE, IDLE, SLEEP)
+
+
+class DutyCycler:
+    """
+    Hazard-aware detection rate for battery-powered units.
+    Runs at `max_fps` while hazards are around. After `idle_after_s`
+    without a wake-up detection (G1/G3/G6 by default, anything closer than
+    `near_m`, or risk >= `wake_risk`) it drops to `idle_fps` and stops
+    drawing; after `sleep_after_s` to `min_fps`. The first wake-up
+    detection returns it to ACTIVE on the same tick. Time spent in each
+    state is accumulated for the metrics / exit report. With
+    `throttle_capture` the camera threads pace their grabs by
+    capture_interval as well, so idle frames are not decoded at all.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or config.POWER
+        self.enabled = self.settings.get('enabled', False)
+        self.wake_groups = np.array([GROUP_INDEX[g] for g in self.settings['wake_groups']])
+        self.near_m = self.settings['near_m']
+        self.wake_risk = self.settings['wake_risk']
+        self.fps = {ACTIVE: self.settings['max_fps'], IDLE: self.settings['idle_fps'],
+                    SLEEP: self.settings['min_fps']}
+
+        self.state = ACTIVE
+        self.started = time.monotonic()
+        self.last_wake = self.started
+        self.state_since = self.started
+        self.next_tick = self.started
+        self.seconds = dict.fromkeys(STATES, 0.0)
+        self.transitions = 0
+        self._lock = threading.Lock()
+
+    @property
+    def draw(self):
+        """Whether annotated frames should be drawn / shown in the current state."""
+        return self.state == ACTIVE or not self.settings.get('suspend_drawing', True)
+
+    @property
+    def capture_interval(self):
+        """Minimum seconds between camera grabs in the current state (0 = camera rate)."""
+        if not self.enabled or self.state == ACTIVE or not self.settings.get('throttle_capture', True):
+            return 0.0
+        fps = self.fps[self.state]
+        return 1.0 / fps if fps else 0.0
+
+    def pace(self):
+        """Sleeps until the next tick of the current state's rate."""
+        if not self.enabled:
+            return
+        fps = self.fps[self.state]
+        now = time.monotonic()
+        if fps and now < self.next_tick:
+            time.sleep(self.next_tick - now)
+            now = self.next_tick
+        # Never let a slow tick bank time for a burst
+        self.next_tick = max(self.next_tick, now - 1.0 / fps) + 1.0 / fps if fps else now
+
+    def wakes(self, dets):
+        """True if any detection in the structured array should keep the unit awake."""
+        if len(dets) == 0:
+            return False
+        return bool((np.isin(dets['group'], self.wake_groups) | (dets['dist'] < self.near_m) |
+                     (dets['risk'] >= self.wake_risk)).any())
+
+    def update(self, detections, now=None):
+        """Feeds one tick's detection arrays (one per camera); returns the new state."""
+        if not self.enabled:
+            return self.state
+        now = time.monotonic() if now is None else now
+        if any(self.wakes(dets) for dets in detections):
+            self.last_wake = now
+        quiet = now - self.last_wake
+        if quiet >= self.settings['sleep_after_s']:
+            state = SLEEP
+        elif quiet >= self.settings['idle_after_s']:
+            state = IDLE
+        else:
+            state = ACTIVE
+        if state != self.state:
+            self._switch(state, now)
+        return self.state
+
+    def _switch(self, state, now):
+        with self._lock:
+            self.seconds[self.state] += now - self.state_since
+            print(f"Power: {self.state} -> {state} ({self.fps[state] or 'max'} fps)")
+            self.state = state
+            self.state_since = now
+            self.transitions += 1
+        if state == ACTIVE:
+            self.next_tick = now  # Run the next frame immediately
+
+    def state_seconds(self):
+        """Seconds spent in each state so far (including the current one)."""
+        with self._lock:
+            seconds = dict(self.seconds)
+            seconds[self.state] += time.monotonic() - self.state_since
+        return seconds
+
+    def report(self):
+        seconds = self.state_seconds()
+        total = sum(seconds.values()) or 1.0
+        parts = ", ".join(f"{s} {seconds[s]:.0f}s ({seconds[s] / total:.0%})" for s in STATES)
+        return f"Power states: {parts} | {self.transitions} transitions"
@@ -0,0 +1,74 @@
+from collections import deque
+
+import numpy as np
+import config  # Imports your config.py settings
+from detection import GROUP_INDEX
+
+
+class ResolutionController:
+    """
+    Picks the model input size (imgsz) that keeps recent inference latency
+    inside the per-frame budget. Steps down one size when the budget is
+    blown, steps back up when the predicted cost of the next size fits,
+    and holds a high resolution while G1/G6 hazards are in view.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or config.RESOLUTION
+        self.sizes = sorted(self.settings['sizes'])
+        initial = self.settings.get('initial', self.sizes[-1])
+        self.index = self.sizes.index(initial) if initial in self.sizes else len(self.sizes) - 1
+
+        self.budget = self.settings['budget_ms'] / 1000
+        self.latencies = deque(maxlen=self.settings['window'])
+        self.frames_since_change = 0
+
+        self.hazard_groups = np.array([GROUP_INDEX[g] for g in self.settings['hazard_groups']])
+        hazard_size = self.settings.get('hazard_size', self.sizes[-1])
+        self.hazard_index = max(i for i, s in enumerate(self.sizes) if s <= hazard_size) \
+            if hazard_size >= self.sizes[0] else 0
+        self.hazard_hold = self.settings['hazard_hold_s']
+        self.hazard_until = 0.0
+        self.locked = False
+
+    @property
+    def imgsz(self):
+        return self.sizes[self.index]
+
+    @property
+    def latency_ms(self):
+        return float(np.mean(self.latencies)) * 1000 if self.latencies else 0.0
+
+    def record(self, latency, dets, timestamp):
+        """Feeds one inference latency (seconds) and its detections."""
+        self.latencies.append(latency)
+        self.frames_since_change += 1
+
+        # --- Hazard lock ---
+        if len(dets) and np.isin(dets['group'], self.hazard_groups).any():
+            self.hazard_until = timestamp + self.hazard_hold
+        self.locked = timestamp < self.hazard_until
+        if self.locked and self.index < self.hazard_index:
+            self._set(self.hazard_index)
+            return
+
+        if len(self.latencies) < self.latencies.maxlen or \
+                self.frames_since_change < self.settings['cooldown_frames']:
+            return
+
+        # --- Budget control ---
+        avg = float(np.mean(self.latencies))
+        floor = self.hazard_index if self.locked else 0
+        if avg > self.budget * self.settings['step_down_ratio'] and self.index > floor:
+            self._set(self.index - 1)
+        elif self.index < len(self.sizes) - 1:
+            # Inference cost scales roughly with input area
+            predicted = avg * (self.sizes[self.index + 1] / self.imgsz) ** 2
+            if predicted < self.budget * self.settings['step_up_ratio']:
+                self._set(self.index + 1)
+
+    def _set(self, index):
+        if index != self.index:
+            self.index = index
+            self.latencies.clear()
+        self.frames_since_change = 0
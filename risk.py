@@ -0,0 +1,171 @@
+"""
+Risk rule table compiled from config.py.
+
+RISK_CONFIG declares, per group, a base risk level, nearer distance bands
+that raise it and the phrase templates; CLASS_PHRASES overrides phrases per
+class and FRONTEND_PHRASES keeps a front end's own wording. The table is compiled once into a (group x distance-bin) lookup
+array so scoring a frame is a single indexed read. ConfigWatcher re-reads
+config.py when it is saved and swaps in a freshly compiled table (plus
+new object heights / class groups / confidence thresholds) without
+restarting. The reloaded file is executed into its own namespace; the
+live config module is never modified.
+"""
+import math
+import os
+import runpy
+import threading
+import time
+
+import numpy as np
+import config  # Imports your config.py settings
+
+
+class RiskTable:
+    """
+    Compiled RISK_CONFIG / DEFAULT_PHRASE / CLASS_PHRASES / FRONTEND_PHRASES,
+    plus the CLASS_TO_GROUP / OBJECT_HEIGHTS / MODEL dicts it was loaded with
+    (the live config module's by default), so one table is one consistent
+    snapshot of the hot-reloadable settings.
+    """
+
+    def __init__(self, risk_config, default_phrase, class_phrases,
+                 class_to_group=None, object_heights=None, model=None, frontend_phrases=None):
+        self.rules = risk_config
+        self.groups = tuple(risk_config)
+        self.default_phrase = default_phrase
+        self.class_to_group = config.CLASS_TO_GROUP if class_to_group is None else class_to_group
+        self.object_heights = config.OBJECT_HEIGHTS if object_heights is None else object_heights
+        self.model = config.MODEL if model is None else model
+
+        # --- Risk: one column per distance bin between all band edges ---
+        edges = sorted({d for rule in risk_config.values() for d, _ in rule.get('near', ())})
+        self.edges = np.array(edges, dtype=np.float64)
+        self.levels = np.empty((len(self.groups), len(edges) + 1), dtype=np.int8)
+        for g, rule in enumerate(risk_config.values()):
+            bands = sorted(rule.get('near', ()))
+            for b in range(len(edges) + 1):
+                upper = edges[b] if b < len(edges) else math.inf
+                # A bin is inside a band when the whole bin is nearer than the band's limit
+                self.levels[g, b] = next((risk for limit, risk in bands if limit >= upper), rule['risk'])
+
+        # --- Phrases: nearest matching band, else the group's phrase, else the default ---
+        self.phrases = {None: self._phrase_set(risk_config, class_phrases)}
+        for frontend, override in (frontend_phrases or {}).items():
+            unknown = set(override.get('groups', {})) - set(self.groups)
+            if unknown:
+                raise ValueError(f"FRONTEND_PHRASES['{frontend}'] uses unknown groups {sorted(unknown)}")
+            rules = {g: {**rule, **override.get('groups', {}).get(g, {})} for g, rule in risk_config.items()}
+            self.phrases[frontend] = self._phrase_set(rules, override.get('classes', class_phrases))
+        self._index = {g: i for i, g in enumerate(self.groups)}
+
+    def _phrase_set(self, rules, class_phrases):
+        """(class templates, per-group near bands, per-group templates) for one wording."""
+        return (dict(class_phrases),
+                [sorted(rule.get('near_phrase', ())) for rule in rules.values()],
+                [rule.get('phrase', self.default_phrase) for rule in rules.values()])
+
+    def risk(self, group, dist):
+        """Vectorized risk level for group ids and distances."""
+        return self.levels[group, np.searchsorted(self.edges, dist, side='right')]
+
+    def template(self, class_name, distance, group, frontend=None):
+        class_phrases, bands, group_phrases = self.phrases.get(frontend, self.phrases[None])
+        template = class_phrases.get(class_name)
+        if template is not None:
+            return template
+        g = self._index.get(group)
+        if g is None:
+            return self.default_phrase
+        return next((t for limit, t in bands[g] if distance < limit), group_phrases[g])
+
+    def phrase(self, class_name, distance, direction, group, frontend=None):
+        return self.template(class_name, distance, group, frontend).format(
+            class_name=class_name, distance=distance, direction=direction)
+
+    def severity(self, group):
+        return self.rules.get(group, {}).get('severity', 'LOW')
+
+    def action(self, group):
+        return self.rules.get(group, {}).get('action', 'INFO')
+
+
+def compile_table(settings=None):
+    """Table for a config namespace (default: the live config module)."""
+    s = vars(config) if settings is None else settings
+    return RiskTable(s['RISK_CONFIG'], s['DEFAULT_PHRASE'], s['CLASS_PHRASES'],
+                     s['CLASS_TO_GROUP'], s['OBJECT_HEIGHTS'], s['MODEL'], s.get('FRONTEND_PHRASES'))
+
+
+# The live table; `version` changes on every successful reload
+_table = compile_table()
+_groups = _table.groups
+version = 0
+_lock = threading.Lock()
+
+
+def table():
+    return _table
+
+
+def reload_config(path=None):
+    """
+    Executes config.py into a fresh namespace and compiles a new table from
+    it. The table is swapped in as a single reference, so readers on other
+    threads see either the old or the new one. Returns False (keeping the
+    old table) on errors.
+    """
+    global _table, version
+    with _lock:
+        try:
+            settings = runpy.run_path(path or config.__file__)
+            new = compile_table(settings)
+            if new.groups != _groups:
+                raise ValueError(f"risk groups changed {_groups} -> {new.groups}; restart to apply")
+            unknown = set(new.class_to_group.values()) - set(new.groups)
+            if unknown:
+                raise ValueError(f"CLASS_TO_GROUP uses unknown groups {sorted(unknown)}")
+        except Exception as e:
+            print(f"⚠ config.py reload rejected: {e}")
+            return False
+        _table = new
+        version += 1
+    print("✓ Risk rules reloaded from config.py")
+    return True
+
+
+class ConfigWatcher:
+    """
+    Polls config.py's modification time (at most every `interval_s`) from the
+    detection loop and reloads the risk rules when it changes. Only the risk
+    table, phrases, CLASS_TO_GROUP, OBJECT_HEIGHTS and the per-group
+    confidence thresholds are applied live; other sections are read once at
+    startup.
+    """
+
+    def __init__(self, settings=None, path=None):
+        self.settings = settings or config.HOT_RELOAD
+        self.enabled = self.settings.get('enabled', False)
+        self.path = path or config.__file__
+        self.interval = self.settings.get('interval_s', 1.0)
+        self.next_check = 0.0
+        self.mtime = self._mtime()
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def check(self, now=None):
+        """Returns True if a new table was loaded."""
+        if not self.enabled:
+            return False
+        now = time.monotonic() if now is None else now
+        if now < self.next_check:
+            return False
+        self.next_check = now + self.interval
+        mtime = self._mtime()
+        if mtime is None or mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        return reload_config(self.path)
@@ -0,0 +1,272 @@
+"""
+Soak test: runs the full app for hours and checks for slow memory growth
+and latency drift.
+
+    python soak.py --video walk.mp4 --duration 8h               # NavAssistCore, real model
+    python soak.py --video walk.mp4 --stub --duration 30m --target gui
+    python soak.py --stub --duration 2h --output soak.json
+
+The video loops and stands in for the camera (synthetic frames are
+written to a temporary file when no video is given). Every `interval_s`
+a sample records RSS, traced Python memory, per-stage p50/p95 latency
+over the interval and the speech queue depth. The report lists the top
+allocation growth sites (tracemalloc, first sample after warmup vs last)
+and latency drift, and the exit code is 1 if RSS or p95 latency grew
+past the SOAK thresholds.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+import config  # Imports your config.py settings
+
+
+def rss_mb():
+    """Resident set size of this process in MB (None if unavailable)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def parse_duration(text):
+    """'90', '45s', '30m', '8h' -> seconds."""
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    text = str(text).strip().lower()
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def synthetic_video(path, frames=120, size=(1280, 720), fps=30):
+    """Short noise-and-shapes clip used when no recording is given."""
+    rng = np.random.default_rng(0)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, size)
+    for i in range(frames):
+        frame = rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+        cv2.rectangle(frame, (100 + 5 * i, 200), (300 + 5 * i, 600), (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+class SoakSampler:
+    """Periodic memory / latency samples of a running app (any object with .metrics and .alerts)."""
+
+    def __init__(self, app, settings=None):
+        self.app = app
+        self.settings = settings or config.SOAK
+        self.samples = []
+        self.baseline = None     # tracemalloc snapshot after warmup
+        self.latest = None
+        self.started = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name='soak-sampler', daemon=True)
+
+    def start(self):
+        self.app.metrics.keep_samples(self.settings['reservoir'])
+        tracemalloc.start(self.settings['traceback_frames'])
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.sample()  # Final sample
+        tracemalloc.stop()
+
+    def _loop(self):
+        while not self._stop.wait(self.settings['interval_s']):
+            self.sample()
+
+    def stage_latency(self):
+        """
+        p50 / p95 (ms) per stage over the interval since the previous sample,
+        from a bounded reservoir of raw timings (histogram bucket bounds are
+        too coarse: a p95 crossing one bucket edge would read as drift).
+        """
+        stages = {}
+        for stage, (n, sample) in self.app.metrics.take_samples().items():
+            if not len(sample):
+                continue
+            p50, p95 = np.percentile(sample, [50, 95]) * 1000
+            stages[stage] = {'n': n, 'p50': round(float(p50), 3), 'p95': round(float(p95), 3)}
+        return stages
+
+    def sample(self):
+        elapsed = time.monotonic() - self.started
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        traced, _ = tracemalloc.get_traced_memory()
+        sample = {
+            't': round(elapsed, 1),
+            'rss_mb': rss_mb(),
+            'traced_mb': round(traced / 2**20, 2),
+            'speech_queue': self.app.alerts.depth(),
+            'stages': self.stage_latency(),
+        }
+        self.samples.append(sample)
+        if elapsed >= self.settings['warmup_s'] and self.baseline is None:
+            self.baseline = snapshot
+            sample['baseline'] = True
+        self.latest = snapshot
+        rss = f"{sample['rss_mb']:.0f} MB" if sample['rss_mb'] is not None else "n/a"
+        print(f"[soak {elapsed / 60:6.1f} min] RSS {rss}, traced {sample['traced_mb']} MB, "
+              f"queue {sample['speech_queue']}", file=sys.stderr)
+
+    def report(self):
+        s = self.settings
+        steady = [x for x in self.samples if x['t'] >= s['warmup_s']]
+        result = {'duration_s': self.samples[-1]['t'] if self.samples else 0,
+                  'samples': self.samples, 'failures': []}
+        if len(steady) < 2:
+            result['failures'].append("Not enough samples after warmup (run longer or lower interval_s)")
+            return result
+
+        # --- Memory ---
+        first, last = steady[0], steady[-1]
+        hours = max(last['t'] - first['t'], 1e-9) / 3600
+        memory = {'traced_growth_mb': round(last['traced_mb'] - first['traced_mb'], 2)}
+        if first['rss_mb'] is not None and last['rss_mb'] is not None:
+            t = np.array([x['t'] for x in steady]) / 3600
+            rss = np.array([x['rss_mb'] for x in steady])
+            memory['rss_growth_mb'] = round(last['rss_mb'] - first['rss_mb'], 1)
+            memory['rss_slope_mb_per_hour'] = round(float(np.polyfit(t, rss, 1)[0]), 2) if hours else 0.0
+            if memory['rss_growth_mb'] > s['max_rss_growth_mb']:
+                result['failures'].append(f"RSS grew {memory['rss_growth_mb']} MB "
+                                          f"(limit {s['max_rss_growth_mb']} MB)")
+        memory['speech_queue_max'] = max(x['speech_queue'] for x in steady)
+        result['memory'] = memory
+
+        if self.baseline is not None and self.latest is not None:
+            growth = self.latest.compare_to(self.baseline, 'traceback')
+            result['allocation_growth'] = [{
+                'size_kb': round(stat.size_diff / 1024, 1),
+                'count': stat.count_diff,
+                # Allocating line first, then its callers
+                'site': [f"{frame.filename}:{frame.lineno}" for frame in reversed(stat.traceback)],
+            } for stat in growth[:s['top_sites']] if stat.size_diff > 0]
+
+        # --- Latency drift: p95 of the first vs last quarter of the steady samples ---
+        quarter = max(1, len(steady) // 4)
+        drift = {}
+        for stage in s['stages']:
+            early = [x['stages'][stage]['p95'] for x in steady[:quarter] if stage in x['stages']]
+            late = [x['stages'][stage]['p95'] for x in steady[-quarter:] if stage in x['stages']]
+            if not early or not late:
+                continue
+            before, after = float(np.median(early)), float(np.median(late))
+            ratio = after / before if before else 1.0
+            drift[stage] = {'p95_start_ms': round(before, 2), 'p95_end_ms': round(after, 2), 'ratio': round(ratio, 2)}
+            if ratio > s['max_p95_growth']:
+                result['failures'].append(f"{stage} p95 grew {ratio:.2f}x ({before:.1f} -> {after:.1f} ms, "
+                                          f"limit {s['max_p95_growth']}x)")
+        result['latency_drift'] = drift
+        return result
+
+
+def configure(video, stub, density, stub_ms):
+    """Points the app at the looping video (and optionally the stub model) for this process only."""
+    camera = dict(config.CAMERAS[0], source=video, loop=True, realtime=True)
+    config.CAMERAS[:] = [camera]
+    if stub:
+        config.MODEL['stub'] = {'density': density, 'busy_ms': stub_ms}
+
+
+def run_core(duration):
+    from main import NavAssistCore
+    app = NavAssistCore()
+    sampler = SoakSampler(app).start()
+    timer = threading.Timer(duration, app.stop)
+    timer.start()
+    try:
+        app.run()
+    finally:
+        timer.cancel()
+        sampler.stop()
+    return sampler
+
+
+def run_gui(duration):
+    import tkinter as tk
+    from gui_app import NavAssistApp
+    root = tk.Tk()
+    app = NavAssistApp(root, "NavAssist AI - Soak Test")
+    state = {}
+
+    def start_when_ready():
+        if app.pipeline is None:
+            root.after(200, start_when_ready)
+            return
+        app.start_system()
+        state['sampler'] = SoakSampler(app).start()
+        root.after(int(duration * 1000), app.on_close)
+
+    root.after(200, start_when_ready)
+    root.mainloop()
+    if 'sampler' not in state:
+        raise RuntimeError("The GUI closed before startup finished")
+    state['sampler'].stop()
+    return state['sampler']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-running memory / latency soak test")
+    parser.add_argument('--target', choices=('core', 'gui'), default='core',
+                        help="core = main.py NavAssistCore, gui = gui_app.py NavAssistApp")
+    parser.add_argument('--video', help="Looping recording used as the camera (default: synthetic clip)")
+    parser.add_argument('--stub', action='store_true', help="Use the stub detector instead of the model")
+    parser.add_argument('--density', type=int, default=20, help="Stub boxes per frame")
+    parser.add_argument('--stub-ms', type=float, default=20, help="CPU time the stub burns per frame")
+    parser.add_argument('--duration', default=None, help="e.g. 600, 30m, 8h (default: SOAK['duration_s'])")
+    parser.add_argument('--interval', type=float, default=None, help="Seconds between samples")
+    parser.add_argument('--output', '-o', default='soak_report.json')
+    args = parser.parse_args()
+
+    if args.interval:
+        config.SOAK['interval_s'] = args.interval
+    duration = parse_duration(args.duration) if args.duration else config.SOAK['duration_s']
+
+    video = args.video
+    if video is None:
+        video = synthetic_video(os.path.join(tempfile.gettempdir(), 'navassist_soak.avi'))
+    configure(video, args.stub, args.density, args.stub_ms)
+
+    sampler = run_core(duration) if args.target == 'core' else run_gui(duration)
+    report = sampler.report()
+    report.update(target=args.target, video=video, stub=args.stub)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for site in report.get('allocation_growth', [])[:10]:
+        print(f"  +{site['size_kb']:>10.1f} KB  {site['count']:+7d} blocks  {site['site'][0]}")
+    for stage, d in report.get('latency_drift', {}).items():
+        print(f"  {stage:<16} p95 {d['p95_start_ms']:.1f} -> {d['p95_end_ms']:.1f} ms ({d['ratio']}x)")
+    print(f"Report written to {args.output}")
+    if report['failures']:
+        for failure in report['failures']:
+            print(f"⚠ {failure}")
+        sys.exit(1)
+    print("✓ Soak passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import threading
+import time
+
+
+class StartupLoader:
+    """
+    Runs independent initialization steps (model, camera, TTS, mixer) in
+    parallel background threads and records how long each one took, so the
+    window can come up immediately and time-to-first-alert can be tracked.
+    """
+
+    def __init__(self, steps):
+        self.steps = steps            # name -> callable
+        self.started = time.perf_counter()
+        self.timings = {}             # name -> seconds (steps and extra marks)
+        self.errors = {}              # name -> exception
+        self.ready_at = None
+        self._finished = set()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for name, step in self.steps.items():
+            t = threading.Thread(target=self._run, args=(name, step), name=f"init-{name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def _run(self, name, step):
+        t0 = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            self.errors[name] = e
+            print(f"⚠ Startup step '{name}' failed: {e}")
+        with self._lock:
+            self.timings[name] = time.perf_counter() - t0
+            self._finished.add(name)
+            if len(self._finished) == len(self.steps):
+                self.ready_at = time.perf_counter()
+
+    def record(self, name, seconds):
+        """Adds a sub-step timing (e.g. warmup inside the model step)."""
+        with self._lock:
+            self.timings[name] = seconds
+
+    @property
+    def done(self):
+        return self.ready_at is not None
+
+    def pending(self):
+        return [name for name in self.steps if name not in self._finished]
+
+    def wait(self):
+        for t in self._threads:
+            t.join()
+        return self
+
+    def since_start(self):
+        return time.perf_counter() - self.started
+
+    def report(self):
+        """One-line startup breakdown, e.g. for the console log."""
+        parts = [f"{name} {seconds:.2f}s" for name, seconds in self.timings.items()]
+        total = (self.ready_at or time.perf_counter()) - self.started
+        return f"Startup: {', '.join(parts)} | ready in {total:.2f}s"
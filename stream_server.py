@@ -0,0 +1,210 @@
+"""
+Local streaming server: annotated video as MJPEG and detection / alert
+events as Server-Sent Events, for watching a unit from a browser on the
+local network or feeding other on-device processes.
+
+    python main.py --serve
+    open http://127.0.0.1:8090/            # Video + live event log
+    curl -N http://127.0.0.1:8090/events   # One JSON event per 'data:' line
+
+Runs an asyncio event loop on its own thread. The detection loop hands
+over a copy of the frame (capture reuses its buffers); the newest frame is
+JPEG-encoded once (off the loop, at most `max_fps`) and the same bytes go
+to every viewer.
+Viewers whose socket buffer is still full skip frames and event
+subscribers have a bounded queue that drops its oldest events, so a slow
+client never slows detection.
+"""
+import asyncio
+import json
+import threading
+import time
+
+import cv2
+import config  # Imports your config.py settings
+
+BOUNDARY = b'navassistframe'
+
+INDEX_HTML = b"""<!doctype html>
+<html><head><title>NavAssist</title>
+<style>body{background:#000;color:#fff;font-family:monospace;margin:0}img{max-width:100%}
+pre{height:30vh;overflow:auto;margin:0;padding:8px;border-top:2px solid #fff}</style></head>
+<body><img src="/stream.mjpg"><pre id="log"></pre>
+<script>
+const log = document.getElementById('log');
+new EventSource('/events').onmessage = (e) => {
+  const event = JSON.parse(e.data);
+  if (event.type !== 'alert') return;
+  log.textContent = `[${new Date(event.t * 1000).toLocaleTimeString()}] ${event.priority} ${event.phrase}\\n` + log.textContent.slice(0, 5000);
+};
+</script></body></html>
+"""
+
+
+class StreamServer:
+    """Thread-safe publish side (publish_frame / publish_event) of the asyncio server."""
+
+    def __init__(self, settings=None):
+        self.settings = settings or config.STREAM
+        self.host = self.settings.get('host', '127.0.0.1')
+        self.port = self.settings['port']
+        self.min_interval = 1.0 / self.settings['max_fps'] if self.settings.get('max_fps') else 0.0
+        self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, int(self.settings['jpeg_quality'])]
+        self.max_buffer = self.settings['max_client_buffer']
+
+        self.loop = None
+        self.viewers = 0            # Connected MJPEG clients
+        self._subscribers = set()   # One bounded asyncio.Queue per event client
+        self._frame = None
+        self._last_publish = 0.0
+        self._jpeg = None
+        self._started = threading.Event()
+        self._thread = None
+        self.error = None
+
+        # Counters
+        self.frames_encoded = 0
+        self.frames_skipped = 0     # Frames a slow viewer did not receive
+        self.events_dropped = 0
+
+    @property
+    def subscribers(self):
+        return len(self._subscribers)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='stream-server', daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self.error:
+            raise RuntimeError(f"Stream server failed: {self.error}")
+        print(f"✓ Streaming at http://{self.host}:{self.port}/ (MJPEG /stream.mjpg, events /events)")
+        return self
+
+    def stop(self):
+        if self.loop is not None and self._thread.is_alive():
+            self.loop.call_soon_threadsafe(self._stopping.set)
+            self._thread.join(timeout=2.0)
+
+    # --- Publish side (detection thread) ---
+    def publish_frame(self, frame):
+        """Offers a copy of the newest annotated frame. Never blocks; ignored without viewers."""
+        if not self.viewers or self.loop is None:
+            return
+        now = time.monotonic()
+        if now - self._last_publish < self.min_interval:
+            return
+        self._last_publish = now
+        self._frame = frame.copy()  # The caller's buffer goes back to the capture ring
+        self.loop.call_soon_threadsafe(self._frame_ready.set)
+
+    def publish_event(self, event):
+        """Queues one JSON-serializable event for every subscriber."""
+        if not self._subscribers or self.loop is None:
+            return
+        data = json.dumps(event).encode()
+        self.loop.call_soon_threadsafe(self._broadcast, data)
+
+    # --- Event loop side ---
+    def _run(self):
+        try:
+            asyncio.run(self._main())
+        except Exception as e:
+            self.error = e
+            self._started.set()
+
+    async def _main(self):
+        self.loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._frame_ready = asyncio.Event()
+        self._new_jpeg = asyncio.Event()
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]  # Resolves port 0
+        encoder = asyncio.create_task(self._encoder())
+        self._started.set()
+        async with server:
+            await self._stopping.wait()
+        encoder.cancel()
+
+    async def _encoder(self):
+        """Encodes each offered frame once; wakes every viewer waiting on it."""
+        while True:
+            await self._frame_ready.wait()
+            self._frame_ready.clear()
+            frame, self._frame = self._frame, None
+            if frame is None:
+                continue
+            ok, buf = await self.loop.run_in_executor(None, cv2.imencode, '.jpg', frame, self.encode_params)
+            if not ok:
+                continue
+            self._jpeg = buf.tobytes()
+            self.frames_encoded += 1
+            ready, self._new_jpeg = self._new_jpeg, asyncio.Event()
+            ready.set()
+
+    def _broadcast(self, data):
+        for q in self._subscribers:
+            if q.full():
+                q.get_nowait()  # Drop the oldest event for this slow client
+                self.events_dropped += 1
+            q.put_nowait(data)
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout=5.0)
+            parts = request.split(b'\r\n', 1)[0].split()
+            method, path = (parts[0], parts[1].split(b'?')[0]) if len(parts) >= 2 else (b'', b'')
+            if method != b'GET':
+                await self._respond(writer, b'405 Method Not Allowed', b'text/plain', b'GET only\n')
+            elif path == b'/':
+                await self._respond(writer, b'200 OK', b'text/html; charset=utf-8', INDEX_HTML)
+            elif path == b'/snapshot.jpg' and self._jpeg is not None:
+                await self._respond(writer, b'200 OK', b'image/jpeg', self._jpeg)
+            elif path == b'/stream.mjpg':
+                await self._mjpeg(writer)
+            elif path == b'/events':
+                await self._events(writer)
+            else:
+                await self._respond(writer, b'404 Not Found', b'text/plain', b'Not found\n')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            pass  # Server shutting down
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, content_type, body):
+        writer.write(b'HTTP/1.1 ' + status + b'\r\nContent-Type: ' + content_type +
+                     b'\r\nContent-Length: ' + str(len(body)).encode() + b'\r\nConnection: close\r\n\r\n' + body)
+        await writer.drain()
+
+    async def _mjpeg(self, writer):
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: multipart/x-mixed-replace; boundary=' + BOUNDARY +
+                     b'\r\nCache-Control: no-cache\r\nConnection: close\r\n\r\n')
+        self.viewers += 1
+        try:
+            while not writer.is_closing():
+                await self._new_jpeg.wait()
+                if writer.transport.get_write_buffer_size() > self.max_buffer:
+                    self.frames_skipped += 1  # Client hasn't taken the previous frame yet
+                    continue
+                jpeg = self._jpeg
+                writer.write(b'--' + BOUNDARY + b'\r\nContent-Type: image/jpeg\r\nContent-Length: ' +
+                             str(len(jpeg)).encode() + b'\r\n\r\n' + jpeg + b'\r\n')
+        finally:
+            self.viewers -= 1
+
+    async def _events(self, writer):
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n'
+                     b'Cache-Control: no-cache\r\nConnection: close\r\n\r\n')
+        queue = asyncio.Queue(self.settings['event_queue'])
+        self._subscribers.add(queue)
+        try:
+            while not writer.is_closing():
+                try:
+                    data = await asyncio.wait_for(queue.get(), timeout=15.0)
+                    writer.write(b'data: ' + data + b'\n\n')
+                except asyncio.TimeoutError:
+                    writer.write(b': keepalive\n\n')
+                await writer.drain()
+        finally:
+            self._subscribers.discard(queue)
@@ -0,0 +1,99 @@
+import time
+
+import numpy as np
+import config  # Imports your config.py settings
+
+
+class _Array:
+    """Mimics the `.cpu().numpy()` chain of a torch tensor"""
+
+    def __init__(self, array):
+        self._array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self._array
+
+    def __len__(self):
+        return len(self._array)
+
+
+class _Boxes:
+    def __init__(self, xyxy, cls, conf):
+        self.xyxy = _Array(xyxy)
+        self.cls = _Array(cls)
+        self.conf = _Array(conf)
+
+    def __len__(self):
+        return len(self.cls)
+
+
+class _Result:
+    def __init__(self, boxes, orig_shape):
+        self.boxes = boxes
+        self.orig_shape = orig_shape
+
+
+class StubDetector:
+    """
+    Deterministic stand-in for YOLO('best.pt').
+    Emits `density` synthetic boxes per frame (before the conf filter) with
+    the same Result/Boxes surface the front ends read, so the detection,
+    risk and draw path can be exercised without weights or a camera.
+    `busy_ms` burns that much CPU per frame (holding the GIL, like a real
+    model) for scaling benchmarks. Like ultralytics it honours `classes` /
+    `max_det` (also as `overrides` defaults) and, with `nms_iou`, runs
+    class-aware NMS on the surviving boxes.
+    """
+
+    def __init__(self, density=20, seed=0, names=None, busy_ms=0, nms_iou=None):
+        self.density = density
+        self.seed = seed
+        self.names = names or {i: n for i, n in enumerate(config.CLASS_TO_GROUP)}
+        self.busy_ms = busy_ms
+        self.nms_iou = nms_iou
+        self.overrides = {}  # Predict defaults, as on ultralytics YOLO
+        self._calls = 0
+
+    def __call__(self, source, conf=0.25, verbose=False, **kwargs):
+        frames = source if isinstance(source, (list, tuple)) else [source]
+        kwargs = {**self.overrides, **kwargs}
+        return [self._predict(frame, conf, kwargs.get('classes'), kwargs.get('max_det')) for frame in frames]
+
+    predict = __call__
+
+    def _predict(self, frame, conf, classes=None, max_det=None):
+        if self.busy_ms:
+            end = time.perf_counter() + self.busy_ms / 1000
+            while time.perf_counter() < end:
+                pass
+        rng = np.random.default_rng((self.seed, self._calls))
+        self._calls += 1
+        h, w = frame.shape[:2]
+        n = self.density
+
+        box_h = rng.uniform(0.05, 0.9, n) * h
+        box_w = box_h * rng.uniform(0.3, 1.2, n)
+        cx = rng.uniform(0, w, n)
+        cy = rng.uniform(h * 0.3, h * 0.9, n)
+        xyxy = np.stack([cx - box_w / 2, cy - box_h / 2, cx + box_w / 2, cy + box_h / 2], axis=1)
+        xyxy = np.clip(xyxy, 0, [w, h, w, h]).astype(np.float32)
+        cls = rng.integers(0, len(self.names), n).astype(np.float32)
+        scores = rng.uniform(0.2, 1.0, n).astype(np.float32)
+
+        keep = scores >= conf
+        if classes is not None:
+            keep &= np.isin(cls, classes)
+        xyxy, cls, scores = xyxy[keep], cls[keep], scores[keep]
+        if self.nms_iou:
+            from tiles import nms
+            order = nms(xyxy, cls, scores, self.nms_iou)
+        else:
+            order = np.argsort(-scores, kind='stable')
+        if max_det:
+            order = order[:max_det]
+        if self.nms_iou or max_det:
+            xyxy, cls, scores = xyxy[order], cls[order], scores[order]
+        return _Result(_Boxes(xyxy, cls, scores), (h, w))
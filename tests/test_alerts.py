@@ -0,0 +1,78 @@
+import time
+
+import config
+from alerts import AlertScheduler
+
+
+def scheduler(preempted=None):
+    return AlertScheduler(on_preempt=(lambda: preempted.append(True)) if preempted is not None else None,
+                          settings=dict(config.ALERTS))
+
+
+def test_same_object_is_not_repeated_unless_it_escalates():
+    alerts = scheduler()
+    assert alerts.submit("car ahead", 2, 'car')
+    alerts.finished(alerts.next(timeout=0))
+    soon = time.time() + 0.5  # Inside the priority-2 repeat window
+    assert not alerts.submit("car ahead", 2, 'car', now=soon)
+    assert alerts.submit("car ahead", 2, 'other car', now=soon)
+    assert alerts.submit("car close ahead", 3, 'car', now=soon)  # Escalation
+    assert alerts.snapshot_counts()[2]['suppressed'] == 1
+
+
+def test_pending_alert_is_replaced_by_newer_reading():
+    alerts = scheduler()
+    alerts.submit("person 3 meters", 2, 'person')
+    alerts.submit("person 2 meters", 2, 'person')
+    assert alerts.depth() == 1
+    assert alerts.next(timeout=0).text == "person 2 meters"
+
+
+def test_expired_alerts_are_dropped():
+    alerts = scheduler()
+    alerts.submit("bench on your left", 1, 'bench', now=time.time() - config.ALERTS['ttl_s'][1] - 1)
+    assert alerts.next(timeout=0) is None
+    assert alerts.snapshot_counts()[1]['expired'] == 1
+
+
+def test_highest_priority_first():
+    alerts = scheduler()
+    alerts.submit("bench", 1, 'bench')
+    alerts.submit("stairs", 3, 'stairs')
+    alerts.submit("pole", 2, 'pole')
+    assert [alerts.next(timeout=0).text for _ in range(3)] == ["stairs", "pole", "bench"]
+
+
+def test_preemption_needs_strictly_higher_priority():
+    preempted = []
+    alerts = scheduler(preempted)
+    alerts.submit("fire ahead", 4, 'fire')
+    playing = alerts.next(timeout=0)
+    alerts.submit("knife on your left", 4, 'knife')  # Same level, different object
+    assert preempted == []
+    alerts.finished(playing)
+
+    alerts.next(timeout=0)  # The knife alert
+    alerts.submit("stairs", 3, 'stairs')
+    alerts.finished(alerts.current)
+    alerts.next(timeout=0)
+    alerts.submit("fire on your right", 4, 'fire right')
+    assert preempted == [True]
+    assert alerts.snapshot_counts()[3]['preempted'] == 1
+
+
+def test_latency_is_recorded_at_playback_start():
+    alerts = scheduler()
+    alerts.submit("fire ahead", 4, 'fire')
+    alert = alerts.next(timeout=0)
+    assert alerts.latency_summary() == {}  # Taken from the queue, not yet audible
+    alerts.started(alert, now=alert.created + 0.2)
+    assert alerts.latency_summary()[4]['p50'] == 200.0
+    assert alerts.latency_summary()[4]['within_target'] == 0.0
+
+
+def test_alert_keeps_frame_capture_time():
+    alerts = scheduler()
+    grabbed = time.time() - 0.1
+    alerts.submit("fire ahead", 4, 'fire', captured=grabbed)
+    assert alerts.next(timeout=0).captured == grabbed
@@ -0,0 +1,15 @@
+import io
+
+import pytest
+
+import batch_mode
+from stub_detector import StubDetector
+
+
+def test_unreadable_video_fails_the_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_mode, 'load_model', lambda backend, weights: StubDetector())
+    source = tmp_path / 'walk.mp4'
+    source.write_bytes(b'not a video')
+    runner = batch_mode.BatchRunner()
+    with pytest.raises(IOError, match="Cannot open video"):
+        runner.run(str(source), io.StringIO())
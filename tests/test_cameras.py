@@ -0,0 +1,118 @@
+import time
+
+import numpy as np
+
+import cameras
+from cameras import CameraRig, FrameRing
+from pipeline import FramePacket
+
+
+def produce(ring, value):
+    slot, buffer = ring.acquire()
+    image = buffer if buffer is not None else np.empty((4, 4), dtype=np.uint8)
+    image[:] = value
+    ring.put(slot, FramePacket(value, float(value), image))
+
+
+def test_held_frame_is_not_reused():
+    """A frame is only overwritten after its last holder released it."""
+    ring = FrameRing('test', 4)
+    produce(ring, 1)
+    held = ring.get_nowait().image
+    ring.retain(held)  # Second holder
+    for value in range(2, 12):
+        produce(ring, value)
+        ring.release(ring.get_nowait().image)
+    ring.release(held)
+    assert (held == 1).all()
+
+    ring.release(held)  # Last holder: the buffer returns to the ring
+    for value in range(12, 20):
+        produce(ring, value)
+        ring.release(ring.get_nowait().image)
+    assert ring.starved == 0
+    assert not (held == 1).all()
+
+
+def test_all_buffers_held_falls_back_to_allocation():
+    ring = FrameRing('test', 3)
+    held = []
+    for value in range(6):
+        produce(ring, value)
+        held.append(ring.get_nowait().image)
+    assert ring.starved > 0
+    assert [int(image[0, 0]) for image in held] == list(range(6))
+
+
+def test_unopened_camera_ends_read(tmp_path):
+    rig = CameraRig([{'name': 'missing', 'source': str(tmp_path / 'missing.avi')}])
+    try:
+        assert rig.read() == (False, None)
+    finally:
+        rig.release()
+
+
+def test_lost_device_ends_read(monkeypatch):
+    """A live device that stops delivering frames closes after max_failed_grabs."""
+    class LostDevice:
+        def __init__(self, source):
+            pass
+
+        def isOpened(self):
+            return True
+
+        def set(self, prop, value):
+            return False
+
+        def get(self, prop):
+            return 0.0
+
+        def grab(self):
+            return False
+
+        def release(self):
+            pass
+
+    monkeypatch.setattr(cameras.cv2, 'VideoCapture', LostDevice)
+    rig = CameraRig([{'name': 'lost', 'source': 0, 'max_failed_grabs': 5}])
+    try:
+        assert rig.read() == (False, None)
+    finally:
+        rig.release()
+
+
+def test_pacer_throttles_live_grabs(monkeypatch):
+    class Device:
+        grabs = 0
+
+        def __init__(self, source):
+            pass
+
+        def isOpened(self):
+            return True
+
+        def set(self, prop, value):
+            return False
+
+        def get(self, prop):
+            return 0.0
+
+        def grab(self):
+            time.sleep(0.01)  # 100 fps device
+            Device.grabs += 1
+            return True
+
+        def retrieve(self, image=None):
+            return True, np.zeros((4, 4, 3), dtype=np.uint8)
+
+        def release(self):
+            pass
+
+    monkeypatch.setattr(cameras.cv2, 'VideoCapture', Device)
+    rig = CameraRig([{'name': 'paced', 'source': 0, 'fps': 100, 'driver_buffers': 1}])
+    rig.set_pacer(lambda: 0.1)
+    try:
+        time.sleep(0.55)
+    finally:
+        rig.release()
+    assert Device.grabs <= 15  # ~6 paced grabs plus drains, instead of ~55
@@ -0,0 +1,57 @@
+import numpy as np
+
+import config
+from detection import DetectionProcessor
+from detection_log import DetectionLog, read_log, replay, rescore
+
+
+def test_replay_after_class_filter(tmp_path):
+    """Logs with more records per camera / width than MODEL['max_det'] replay one row per record."""
+    names = list(config.CLASS_TO_GROUP)
+    processor = DetectionProcessor(names)
+    rng = np.random.default_rng(0)
+    path = str(tmp_path / 'session.navlog')
+    log = DetectionLog(path, names, [600], dict(config.DETECTION_LOG, preallocate_records=64))
+    for frame_id in range(3):
+        n = config.MODEL['max_det']
+        x1 = rng.uniform(0, 500, n)
+        y1 = rng.uniform(0, 300, n)
+        xyxy = np.stack([x1, y1, x1 + 80, y1 + 200], axis=1)
+        cls = rng.integers(0, len(names), n)
+        conf = rng.uniform(0.2, 1.0, n)  # Some below their group's threshold
+        log.append(frame_id, float(frame_id), processor.process(xyxy, cls, conf, 640, filter=False), 640)
+    log.close()
+
+    _, records = read_log(path)
+    assert len(records) > config.MODEL['max_det']
+    dets = rescore(records, [processor])
+    assert len(dets) == len(records)
+    np.testing.assert_array_equal(dets['cls'], records['cls'])
+    np.testing.assert_array_equal(dets['group'], records['group'])
+    replay(path)
+
+
+def test_replay_unchanged_config_with_tracking(tmp_path, monkeypatch):
+    """Pre-tracker records replay to the logged risks even though live alerts were tracked / propagated."""
+    from detector import BatchDetector
+    from stub_detector import StubDetector
+
+    monkeypatch.setitem(config.TRACKING, 'enabled', True)
+    monkeypatch.setitem(config.TRACKING, 'detect_every', 2)
+    monkeypatch.setitem(config.MOTION, 'enabled', False)
+    model = StubDetector(density=30)
+    processor = DetectionProcessor(model.names)
+    detector = BatchDetector(model, [processor])
+    path = str(tmp_path / 'session.navlog')
+    log = DetectionLog(path, processor.names, [processor.focal_length], tracked=True)
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    for frame_id in range(40):
+        detector.detect([frame], frame_id / 30)
+        log.append(frame_id, frame_id / 30, detector.raw_detections()[0], 640)
+    log.close()
+
+    meta, records = read_log(path)
+    assert meta['frames'] == 40 and meta['tracked']
+    assert len(np.unique(records['frame'])) <= 20  # Propagated frames add no records
+    summary = replay(path)
+    assert summary['changed_frames'] == 0
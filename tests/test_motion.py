@@ -0,0 +1,49 @@
+import numpy as np
+
+import config
+from detection import DETECTION_DTYPE, GROUP_INDEX
+from motion import MotionGate
+
+
+def frame(value=0):
+    image = np.full((360, 640, 3), 100, dtype=np.uint8)
+    image[:, :value] = 200  # A bright edge `value` pixels wide
+    return image
+
+
+def dets(group=None):
+    rows = np.zeros(0 if group is None else 1, dtype=DETECTION_DTYPE)
+    if group is not None:
+        rows['group'] = GROUP_INDEX[group]
+    return rows
+
+
+def gate():
+    return MotionGate(dict(config.MOTION))
+
+
+def test_static_scene_is_skipped_until_max_staleness():
+    motion = gate()
+    limit = config.MOTION['max_staleness_s']
+    assert motion.should_infer(frame(), 0.0, dets())  # First frame always runs
+    assert not motion.should_infer(frame(), 0.1, dets())
+    assert not motion.should_infer(frame(), limit - 0.01, dets('G8'))
+    assert motion.should_infer(frame(), limit, dets())
+    assert motion.skip_rate == 0.5
+
+
+def test_critical_objects_shorten_the_staleness_limit():
+    motion = gate()
+    limit = config.MOTION['critical_staleness_s']
+    assert limit < config.MOTION['max_staleness_s']
+    motion.should_infer(frame(), 0.0, dets())
+    assert not motion.should_infer(frame(), limit - 0.01, dets('G6'))
+    assert motion.should_infer(frame(), limit, dets('G6'))
+
+
+def test_motion_runs_the_model():
+    motion = gate()
+    motion.should_infer(frame(), 0.0, dets())
+    assert motion.should_infer(frame(200), 0.05, dets())
+    assert motion.last_changed >= config.MOTION['changed_blocks']
+    assert not motion.should_infer(frame(200), 0.1, dets())  # Compared with the new reference
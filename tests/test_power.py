@@ -0,0 +1,51 @@
+import numpy as np
+
+import config
+from detection import DETECTION_DTYPE, GROUP_INDEX
+from power import ACTIVE, IDLE, SLEEP, DutyCycler
+
+
+def cycler(**overrides):
+    return DutyCycler(dict(config.POWER, enabled=True, max_fps=None, idle_fps=4, min_fps=1,
+                           idle_after_s=10.0, sleep_after_s=60.0, **overrides))
+
+
+def detection(group, dist=5.0, risk=1):
+    dets = np.zeros(1, dtype=DETECTION_DTYPE)
+    dets['group'], dets['dist'], dets['risk'] = GROUP_INDEX[group], dist, risk
+    return dets
+
+
+def test_quiet_scene_steps_down_and_hazard_wakes_on_same_tick():
+    power = cycler()
+    t0 = power.started
+    quiet = [detection('G8')]
+    assert power.update(quiet, t0 + 5) == ACTIVE
+    assert power.update(quiet, t0 + 10) == IDLE
+    assert not power.draw
+    assert power.capture_interval == 0.25
+    assert power.update(quiet, t0 + 60) == SLEEP
+    assert power.capture_interval == 1.0
+    assert power.update([detection('G6')], t0 + 61) == ACTIVE
+    assert power.draw and power.capture_interval == 0.0
+    assert power.transitions == 3
+
+
+def test_near_or_risky_objects_keep_the_unit_awake():
+    power = cycler()
+    t0 = power.started
+    for i, dets in enumerate([detection('G8', dist=1.0), detection('G7', risk=3)]):
+        assert power.update([dets], t0 + 20 * (i + 1)) == ACTIVE
+    assert power.update([np.zeros(0, dtype=DETECTION_DTYPE)], t0 + 50) == IDLE
+
+
+def test_disabled_cycler_never_throttles():
+    power = DutyCycler(dict(config.POWER, enabled=False))
+    assert power.update([], power.started + 1000) == ACTIVE
+    assert power.capture_interval == 0.0
+
+
+def test_capture_throttle_can_be_turned_off():
+    power = cycler(throttle_capture=False)
+    power.update([], power.started + 30)
+    assert power.state == IDLE and power.capture_interval == 0.0
@@ -0,0 +1,63 @@
+import numpy as np
+
+import config
+import risk
+from detection import GROUP_INDEX, DetectionProcessor
+
+
+def test_reload_swaps_table_without_touching_config(tmp_path):
+    source = open(config.__file__).read()
+    path = tmp_path / 'config.py'
+    path.write_text(source.replace("'risk': 2, 'near': [(1.0, 3)]", "'risk': 3", 1))
+    names = list(config.CLASS_TO_GROUP)
+    processor = DetectionProcessor(names)
+    chair = names.index('chair')
+    box = np.array([[0, 0, 10, 100]])
+
+    before = risk.table()
+    live = dict(vars(config))
+    try:
+        assert risk.reload_config(str(path))
+        assert risk.table() is not before
+        assert vars(config) == live
+        assert processor.process(box, [chair], [0.9], 640)['risk'][0] == 3
+
+        path.write_text(source + "\nCLASS_TO_GROUP['chair'] = 'G42'\n")
+        current = risk.table()
+        assert not risk.reload_config(str(path))
+        assert risk.table() is current
+        assert vars(config) == live
+    finally:
+        risk._table = before
+    assert processor.process(box, [chair], [0.9], 640)['group'][0] == GROUP_INDEX['G4']
+
+
+def test_reloaded_group_conf_reaches_the_model(tmp_path):
+    from detector import BatchDetector
+    from stub_detector import StubDetector
+
+    source = open(config.__file__).read()
+    assert "'group_conf': {'G1': 0.25," in source
+    path = tmp_path / 'config.py'
+    path.write_text(source.replace("'group_conf': {'G1': 0.25,", "'group_conf': {'G1': 0.05,", 1))
+    model = StubDetector()
+    detector = BatchDetector(model, [DetectionProcessor(model.names)])
+    startup_conf = detector.run_conf
+
+    before = risk.table()
+    try:
+        assert risk.reload_config(str(path))
+        assert detector.run_conf == 0.05 < startup_conf
+    finally:
+        risk._table = before
+    assert detector.run_conf == startup_conf
+
+
+def test_frontends_keep_their_own_phrases():
+    table = risk.table()
+    assert table.phrase('car', 2.0, 'ahead', 'G6') == "Stop! car approaching ahead, 2.0 meters."
+    assert table.phrase('car', 2.0, 'ahead', 'G6', frontend='main') == "Stop! car approaching ahead."
+    assert table.phrase('fire', 2.0, 'ahead', 'G1').startswith("Warning! Fire detected")
+    assert table.phrase('fire', 2.0, 'ahead', 'G1', frontend='main') == \
+        "Warning! fire detected 2.0 meters ahead. Stop."
+    assert table.phrase('car', 5.0, 'ahead', 'G6', frontend='main') == "car 5.0 meters ahead."
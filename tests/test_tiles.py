@@ -0,0 +1,48 @@
+import numpy as np
+
+import config
+from tiles import CorridorTiler, nms
+
+
+def boxes(*rows):
+    return np.array(rows, dtype=np.float32).reshape(-1, 4)
+
+
+def tiler(**overrides):
+    return CorridorTiler(dict(config.TILING, **overrides))
+
+
+def test_nms_suppresses_overlaps_within_a_class_only():
+    xyxy = boxes((0, 0, 10, 10), (1, 1, 11, 11), (0, 0, 10, 10), (50, 50, 60, 60))
+    cls = np.array([0, 0, 1, 0])
+    conf = np.array([0.6, 0.9, 0.8, 0.5])
+    keep = nms(xyxy, cls, conf, 0.5)
+    assert list(keep) == [1, 2, 3]  # Best first; box 0 loses to box 1, not to class 1's box
+
+
+def test_nms_empty():
+    assert len(nms(boxes(), np.zeros(0), np.zeros(0), 0.5)) == 0
+
+
+def test_tiles_cover_the_corridor_round_robin():
+    corridor = tiler(rows=3, tiles_per_run=1, vertical=(0.0, 1.0))
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    rects = [corridor.schedule(frame)[0][1] for _ in range(4)]
+    assert rects[3] == rects[0]
+    assert len(set(rects[:3])) == 3
+    assert all(x1 == 426 and x2 == 853 for x1, _, x2, _ in rects)
+    assert min(r[1] for r in rects) == 0 and max(r[3] for r in rects) == 720
+
+
+def test_merge_maps_tile_boxes_to_frame_and_drops_duplicates_and_cut_boxes():
+    corridor = tiler()
+    rect = (400, 300, 800, 600)
+    full = (boxes((500, 400, 540, 480)), np.array([2]), np.array([0.6]))
+    tile = (boxes((100, 100, 140, 180),     # Same object as the full-frame box
+                  (200, 50, 210, 60),       # Small object only the tile sees
+                  (0, 120, 30, 160)),       # Cut by the tile's left edge
+            np.array([2, 5, 2]), np.array([0.9, 0.7, 0.8]))
+    xyxy, cls, conf = corridor.merge(full, [(tile, rect)], (720, 1280, 3))
+    assert sorted(zip(cls.tolist(), conf.round(2).tolist())) == [(2, 0.9), (5, 0.7)]
+    small = xyxy[cls == 5][0]
+    np.testing.assert_array_equal(small, [600, 350, 610, 360])
@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+
+import config
+from detection import DETECTION_DTYPE, GROUP_INDEX, DetectionProcessor
+from tracker import Tracker
+
+NAMES = list(config.CLASS_TO_GROUP)
+
+
+def detection(class_name, box, dist):
+    det = np.zeros(1, dtype=DETECTION_DTYPE)
+    det['cls'] = NAMES.index(class_name)
+    det['conf'] = 0.9
+    det['x1'], det['y1'], det['x2'], det['y2'] = box
+    det['dist'] = dist
+    det['group'] = GROUP_INDEX[config.CLASS_TO_GROUP[class_name]]
+    return det
+
+
+def tracker():
+    return Tracker(DetectionProcessor(NAMES), dict(config.TRACKING))
+
+
+def test_approaching_car_is_escalated_by_time_to_collision():
+    cars = tracker()
+    for step in range(10):  # 9.0 m -> 6.3 m at 3 m/s, beyond the 4 m near band
+        t = step * 0.1
+        rows = cars.update(detection('car', (300 - step, 200, 340 + step, 260), 9.0 - 3.0 * t), t, 640)
+    car = rows[0]
+    assert car['dist'] > 4.0
+    assert car['speed'] > config.TRACKING['min_approach_speed']
+    assert car['ttc'] < config.TRACKING['ttc_alert_s']
+    assert car['risk'] == config.TRACKING['ttc_risk']['G6']
+
+
+def test_parked_car_keeps_its_base_risk():
+    cars = tracker()
+    for step in range(10):
+        rows = cars.update(detection('car', (300, 200, 340, 260), 6.0), step * 0.1, 640)
+    assert rows[0]['ttc'] == math.inf
+    assert rows[0]['risk'] == 1
+
+
+def test_tracks_propagate_between_detector_runs():
+    people = tracker()
+    for step in range(4):  # Moving right 10 px per 0.1 s, 2 m/s closer
+        t = step * 0.1
+        rows = people.update(detection('person', (100 + 10 * step, 100, 140 + 10 * step, 200), 8.0 - 2.0 * t),
+                             t, 640)
+    track_id, x1, dist = rows[0]['track_id'], rows[0]['x1'], rows[0]['dist']
+
+    predicted = people.predict(0.4, 640)
+    assert predicted[0]['track_id'] == track_id
+    assert predicted[0]['x1'] > x1
+    assert predicted[0]['dist'] < dist
+
+    rows = people.update(detection('person', (140, 100, 180, 200), 7.2), 0.4, 640)
+    assert rows[0]['track_id'] == track_id
+
+
+def test_unmatched_tracks_are_dropped_after_max_missed():
+    people = tracker()
+    people.update(detection('person', (100, 100, 140, 200), 5.0), 0.0, 640)
+    empty = np.zeros(0, dtype=DETECTION_DTYPE)
+    for step in range(config.TRACKING['max_missed']):
+        people.update(empty, 0.1 * (step + 1), 640)
+        assert len(people.tracks) == 1
+        assert len(people.predict(0.1 * (step + 1), 640)) == 0  # Missed tracks are not reported
+    people.update(empty, 1.0, 640)
+    assert people.tracks == []
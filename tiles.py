@@ -0,0 +1,102 @@
+import numpy as np
+import config  # Imports your config.py settings
+
+
+def result_boxes(result):
+    """(xyxy, cls, conf) arrays of one ultralytics Result."""
+    boxes = result.boxes
+    return boxes.xyxy.cpu().numpy(), boxes.cls.cpu().numpy(), boxes.conf.cpu().numpy()
+
+
+def nms(xyxy, cls, conf, iou_threshold):
+    """Class-aware greedy non-maximum suppression. Returns kept indices, best first."""
+    if len(conf) == 0:
+        return np.zeros(0, dtype=np.intp)
+    # Shifting each class into its own coordinate range keeps classes from suppressing each other
+    shift = (np.asarray(cls, dtype=np.float64) * (float(xyxy.max()) + 1))[:, None]
+    boxes = np.asarray(xyxy, dtype=np.float64) + shift
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    order = np.argsort(-np.asarray(conf), kind='stable')
+    keep = []
+    while len(order):
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.clip(np.minimum(boxes[i, 2], boxes[rest, 2]) - np.maximum(boxes[i, 0], boxes[rest, 0]), 0, None)
+        h = np.clip(np.minimum(boxes[i, 3], boxes[rest, 3]) - np.maximum(boxes[i, 1], boxes[rest, 1]), 0, None)
+        inter = w * h
+        with np.errstate(divide='ignore', invalid='ignore'):
+            overlap = inter / (areas[i] + areas[rest] - inter)
+        order = rest[~(overlap > iou_threshold)]
+    return np.array(keep, dtype=np.intp)
+
+
+class CorridorTiler:
+    """
+    Extra high-resolution passes over the walking corridor.
+    The full frame is shrunk to the model input size, so small distant
+    hazards (cones, manholes, knives, far cars) vanish. The corridor - the
+    'ahead' third of the frame - is cut into `rows` overlapping tiles; each
+    model run adds up to `tiles_per_run` of them to the same batched call,
+    cycling round-robin across frames, so the extra cost stays fixed no
+    matter how many tiles cover the corridor. Tile boxes are shifted back
+    into frame coordinates and merged with the full-frame boxes by NMS.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or config.TILING
+        self.rows = max(1, int(self.settings['rows']))
+        self.overlap = float(self.settings['overlap'])
+        self.tiles_per_run = max(1, int(self.settings['tiles_per_run']))
+        self.every = max(1, int(self.settings.get('every_runs', 1)))
+        self.iou = self.settings['iou']
+        self.edge_px = self.settings.get('edge_px', 2)
+
+        self.runs = 0
+        self.next_tile = 0
+        self.tile_passes = 0
+
+    def tiles(self, width, height):
+        """(x1, y1, x2, y2) of every corridor tile, top to bottom."""
+        x1, x2 = int(width / 3), int(width * 2 / 3)  # Same thirds as DetectionProcessor.directions
+        top, bottom = (int(f * height) for f in self.settings.get('vertical', (0.0, 1.0)))
+        tile_h = (bottom - top) / (self.rows - (self.rows - 1) * self.overlap)
+        step = tile_h * (1 - self.overlap)
+        return [(x1, int(top + i * step), x2, min(bottom, int(round(top + i * step + tile_h))))
+                for i in range(self.rows)]
+
+    def schedule(self, frame):
+        """Tiles to add to this model run: [(crop, (x1, y1, x2, y2))]."""
+        self.runs += 1
+        if (self.runs - 1) % self.every:
+            return []
+        h, w = frame.shape[:2]
+        tiles = self.tiles(w, h)
+        count = min(self.tiles_per_run, len(tiles))
+        picked = [tiles[(self.next_tile + k) % len(tiles)] for k in range(count)]
+        self.next_tile = (self.next_tile + count) % len(tiles)
+        self.tile_passes += count
+        return [(np.ascontiguousarray(frame[y1:y2, x1:x2]), (x1, y1, x2, y2)) for x1, y1, x2, y2 in picked]
+
+    def merge(self, full, tiled, frame_shape):
+        """
+        full: (xyxy, cls, conf) of the full-frame pass.
+        tiled: [((xyxy, cls, conf), rect)] of the tile passes.
+        Returns merged (xyxy, cls, conf) in frame coordinates.
+        """
+        h, w = frame_shape[:2]
+        parts = [tuple(np.asarray(a) for a in full)]
+        for (xyxy, cls, conf), (x1, y1, x2, y2) in tiled:
+            xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4) + np.array([x1, y1, x1, y1], dtype=np.float32)
+            # Boxes cut by an inner tile edge are partial; the full frame or the
+            # overlapping neighbour tile sees those objects whole
+            e = self.edge_px
+            cut = (((xyxy[:, 0] <= x1 + e) & (x1 > 0)) | ((xyxy[:, 2] >= x2 - e) & (x2 < w)) |
+                   ((xyxy[:, 1] <= y1 + e) & (y1 > 0)) | ((xyxy[:, 3] >= y2 - e) & (y2 < h)))
+            parts.append((xyxy[~cut], np.asarray(cls)[~cut], np.asarray(conf)[~cut]))
+
+        xyxy = np.concatenate([p[0].reshape(-1, 4) for p in parts]).astype(np.float32)
+        cls = np.concatenate([p[1] for p in parts])
+        conf = np.concatenate([p[2] for p in parts])
+        keep = np.sort(nms(xyxy, cls, conf, self.iou))
+        return xyxy[keep], cls[keep], conf[keep]
@@ -0,0 +1,192 @@
+import itertools
+import math
+
+import numpy as np
+import config  # Imports your config.py settings
+from detection import DETECTION_DTYPE, GROUP_INDEX
+
+# Detection rows plus per-track state
+TRACK_DTYPE = np.dtype(DETECTION_DTYPE.descr + [
+    ('track_id', np.int32),
+    ('speed', np.float64),   # Approach speed in m/s (positive = getting closer)
+    ('ttc', np.float64),     # Time-to-collision in seconds (inf if not approaching)
+])
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU between (M, 4) and (N, 4) xyxy boxes."""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(union > 0, inter / union, 0.0)
+
+
+class Track:
+    """
+    One tracked object. Distance is filtered with a constant-velocity
+    Kalman filter; the box is propagated with a smoothed pixel velocity.
+    """
+
+    def __init__(self, track_id, det, timestamp, process_noise, measurement_noise):
+        self.id = track_id
+        self.cls = int(det['cls'])
+        self.group = int(det['group'])
+        self.conf = float(det['conf'])
+        self.box = np.array([det['x1'], det['y1'], det['x2'], det['y2']], dtype=np.float64)
+        self.box_vel = np.zeros(4)
+        self.measured_box = self.box.copy()
+        self.q = process_noise
+        self.r = measurement_noise
+
+        # Kalman state: [distance, d(distance)/dt]
+        self.x = np.array([float(det['dist']), 0.0])
+        self.P = np.diag([measurement_noise, 4.0])
+        self.t = timestamp
+        self.measured_t = timestamp
+        self.missed = 0
+
+    def predict(self, timestamp):
+        dt = max(0.0, timestamp - self.t)
+        if dt == 0:
+            return
+        F = np.array([[1.0, dt], [0.0, 1.0]])
+        Q = self.q * np.array([[dt ** 3 / 3, dt ** 2 / 2], [dt ** 2 / 2, dt]])
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + Q
+        self.box = self.box + self.box_vel * dt
+        self.t = timestamp
+
+    def update(self, det, timestamp, alpha=0.5):
+        measured_box = np.array([det['x1'], det['y1'], det['x2'], det['y2']], dtype=np.float64)
+        dt = timestamp - self.measured_t
+        self.predict(timestamp)
+
+        # Box: snap to the measurement, smooth the velocity between measurements
+        if dt > 0:
+            self.box_vel = alpha * (measured_box - self.measured_box) / dt + (1 - alpha) * self.box_vel
+        self.box = measured_box
+        self.measured_box = measured_box
+        self.measured_t = timestamp
+
+        # Distance: standard Kalman update (skip degenerate 0 m readings)
+        z = float(det['dist'])
+        if z > 0:
+            S = self.P[0, 0] + self.r
+            K = self.P[:, 0] / S
+            self.x = self.x + K * (z - self.x[0])
+            self.P = self.P - np.outer(K, self.P[0, :])
+
+        self.conf = float(det['conf'])
+        self.missed = 0
+
+    @property
+    def distance(self):
+        return max(0.0, float(self.x[0]))
+
+    @property
+    def approach_speed(self):
+        return -float(self.x[1])
+
+
+class Tracker:
+    """
+    IoU-matched multi-object tracker layered after the detector.
+    `update()` is called on frames where YOLO ran, `predict()` on the
+    frames in between so alerts keep flowing at the camera rate.
+    """
+
+    def __init__(self, processor, settings=None):
+        self.processor = processor
+        self.settings = settings or config.TRACKING
+        self.tracks = []
+        self._ids = itertools.count(1)
+
+        self.ttc_risk = np.zeros(len(GROUP_INDEX), dtype=np.int8)
+        for group, level in self.settings.get('ttc_risk', {}).items():
+            self.ttc_risk[GROUP_INDEX[group]] = level
+
+    def update(self, dets, timestamp, frame_width):
+        """Matches new detections to tracks. Returns TRACK_DTYPE rows for this frame."""
+        for track in self.tracks:
+            track.predict(timestamp)
+
+        matched_tracks, matched_dets = self._match(dets)
+
+        for ti, di in zip(matched_tracks, matched_dets):
+            self.tracks[ti].update(dets[di], timestamp)
+
+        unmatched = set(range(len(self.tracks))) - set(matched_tracks)
+        for ti in unmatched:
+            self.tracks[ti].missed += 1
+
+        for di in sorted(set(range(len(dets))) - set(matched_dets)):
+            self.tracks.append(Track(next(self._ids), dets[di], timestamp,
+                                     self.settings['process_noise'], self.settings['measurement_noise']))
+
+        self.tracks = [t for t in self.tracks if t.missed <= self.settings['max_missed']]
+        return self._rows([t for t in self.tracks if t.missed == 0], frame_width)
+
+    def predict(self, timestamp, frame_width):
+        """Propagates live tracks to `timestamp` without a detector run."""
+        live = [t for t in self.tracks if t.missed == 0]
+        for track in live:
+            track.predict(timestamp)
+        return self._rows(live, frame_width)
+
+    def _match(self, dets):
+        """Greedy highest-IoU-first matching restricted to the same class."""
+        if not self.tracks or len(dets) == 0:
+            return [], []
+        track_boxes = np.array([t.box for t in self.tracks])
+        det_boxes = np.stack([dets['x1'], dets['y1'], dets['x2'], dets['y2']], axis=1)
+        iou = iou_matrix(track_boxes, det_boxes)
+        same_class = np.array([t.cls for t in self.tracks])[:, None] == dets['cls'][None, :]
+        iou[~same_class] = 0.0
+
+        matched_tracks, matched_dets = [], []
+        order = np.argsort(iou, axis=None)[::-1]
+        for flat in order:
+            ti, di = divmod(int(flat), iou.shape[1])
+            if iou[ti, di] < self.settings['iou_threshold']:
+                break
+            if ti in matched_tracks or di in matched_dets:
+                continue
+            matched_tracks.append(ti)
+            matched_dets.append(di)
+        return matched_tracks, matched_dets
+
+    def _rows(self, tracks, frame_width):
+        rows = np.zeros(len(tracks), dtype=TRACK_DTYPE)
+        if not tracks:
+            return rows
+
+        boxes = np.array([t.box for t in tracks])
+        rows['x1'], rows['y1'], rows['x2'], rows['y2'] = boxes.T.astype(np.int32)
+        rows['cls'] = [t.cls for t in tracks]
+        rows['conf'] = [t.conf for t in tracks]
+        rows['group'] = [t.group for t in tracks]
+        rows['track_id'] = [t.id for t in tracks]
+        rows['dist'] = np.round([t.distance for t in tracks], 1)
+        rows['direction'] = self.processor.directions(rows['x1'], rows['x2'], frame_width)
+
+        # --- Approach speed & time-to-collision ---
+        speed = np.array([t.approach_speed for t in tracks])
+        approaching = speed > self.settings['min_approach_speed']
+        rows['speed'] = np.round(speed, 2) + 0.0  # Avoid -0.0
+        with np.errstate(divide='ignore'):
+            rows['ttc'] = np.where(approaching, rows['dist'] / np.where(approaching, speed, 1.0), math.inf)
+
+        # --- Risk: base rules, escalated for short time-to-collision ---
+        risk = self.processor.score(rows['group'], rows['dist'])
+        escalate = self.ttc_risk[rows['group']]
+        closing = (escalate > 0) & (rows['ttc'] < self.settings['ttc_alert_s'])
+        rows['risk'] = np.where(closing, np.maximum(risk, escalate), risk)
+        return rows
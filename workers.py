@@ -0,0 +1,317 @@
+"""
+Process-pool inference: N worker processes, each with its own model.
+
+Frames are copied once into a ring of slots in a single
+multiprocessing.shared_memory block; only (slot, shape) tuples travel
+through each worker's job pipe and only the boxes come back, so full
+images are never pickled. Results are handed back in submission order so
+tracking, risk scoring and alerts see frames in sequence. Every worker has
+its own pipes, so one that dies cannot leave a shared queue locked. Dead
+workers, and hung ones (killed after `job_timeout_s`), are detected while
+polling: their jobs fail (empty boxes), their slots are freed once the
+process is gone and it is respawned up to `max_restarts` times.
+"""
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+
+import numpy as np
+import config  # Imports your config.py settings
+from detection import model_conf
+
+
+def _load(model_settings):
+    from backends import load_model, warmup
+    model = load_model(model_settings.get('backend'), model_settings.get('weights'), model_settings)
+    if not model_settings.get('stub'):
+        warmup(model, runs=1)
+    return model
+
+
+def _worker(index, shm_name, slot_bytes, jobs, results, model_settings):
+    """Worker process: attach the ring, load a model, serve jobs until None."""
+    shm = shared_memory.SharedMemory(name=shm_name)  # Spawned workers share the parent's resource tracker
+    try:
+        model = _load(model_settings)
+    except Exception as e:
+        results.send(('failed', index, f"{type(e).__name__}: {e}"))
+        shm.close()
+        return
+    results.send(('ready', index, None))
+
+    while True:
+        try:
+            job = jobs.recv()
+        except EOFError:  # Parent went away
+            break
+        if job is None:
+            break
+        seq, specs, conf, imgsz = job
+        try:
+            views = [np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+                     for slot, shape in specs if slot is not None]
+            kwargs = {'imgsz': imgsz} if imgsz else {}
+            t0 = time.perf_counter()
+            predictions = iter(model(views, conf=conf, verbose=False, **kwargs) if views else [])
+            latency = time.perf_counter() - t0
+            boxes = []
+            for slot, _ in specs:
+                if slot is None:
+                    boxes.append(None)
+                    continue
+                b = next(predictions).boxes
+                boxes.append((b.xyxy.cpu().numpy(), b.cls.cpu().numpy(), b.conf.cpu().numpy()))
+            del views
+            results.send(('result', seq, (boxes, latency, index)))
+        except Exception as e:
+            results.send(('error', seq, f"{type(e).__name__}: {e}"))
+    shm.close()
+
+
+class InferencePool:
+    """
+    Parent side of the worker pool.
+
+    submit(frames, ...) copies one tick's frames (one per camera, None
+    allowed) into free slots and queues the job; it returns None without
+    copying when no slots are free (live mode drops the frame) unless
+    `block=True`. ready() yields finished jobs strictly in submission order
+    as (seq, meta, boxes, latency) with boxes[i] = (xyxy, cls, conf) or None
+    (None for every frame of a failed job). Raises RuntimeError once all
+    workers are dead and no restarts are left.
+    """
+
+    def __init__(self, processes=None, settings=None, model_settings=None, frame_shape=None, cameras=None):
+        self.settings = settings or config.WORKERS
+        self.processes = processes or self.settings['processes']
+        self.model_settings = dict(model_settings or config.MODEL)
+        shape = frame_shape or self.settings['max_frame_shape']
+        self.slot_bytes = int(np.prod(shape))
+        cameras = cameras or len(config.CAMERAS)
+        self.slots = self.processes * self.settings['jobs_per_worker'] * cameras
+
+        self._ctx = mp.get_context('spawn')  # Same behavior on Windows / Linux, no forked model state
+        self._shm = None
+        self._procs = []
+        self._pipes = {}        # worker index -> (job sender, result receiver)
+        self._free = list(range(self.slots))
+        self._meta = {}         # seq -> (meta, slots, frame count, submit time) for jobs in flight
+        self._done = {}         # seq -> (boxes, latency) waiting for earlier jobs
+        self._owner = {}        # seq -> index of the worker it was sent to
+        self._seq = 0
+        self._next = 0
+        self.job_timeout = self.settings.get('job_timeout_s', 10.0)
+        self.restarts_left = self.settings.get('max_restarts', 3)
+        self.errors = 0
+        self.restarts = 0
+
+    @property
+    def in_flight(self):
+        return len(self._meta)
+
+    def start(self, timeout=None):
+        """Spawns the workers and waits until every model is loaded."""
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_bytes)
+        self._ring = np.ndarray((self.slots, self.slot_bytes), dtype=np.uint8, buffer=self._shm.buf)
+        self._procs = [self._spawn(i) for i in range(self.processes)]
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waiting = {self._pipes[i][1]: i for i in range(self.processes)}
+        while waiting:
+            for conn in wait(list(waiting), timeout=1.0):
+                try:
+                    kind, index, info = conn.recv()
+                except EOFError:
+                    kind, index, info = 'failed', waiting[conn], "exited while loading"
+                if kind == 'failed':
+                    self.close()
+                    raise RuntimeError(f"Inference worker {index} failed: {info}")
+                del waiting[conn]
+            if waiting and deadline and time.monotonic() > deadline:
+                self.close()
+                raise RuntimeError("Inference workers failed to start")
+        return self
+
+    def _spawn(self, index):
+        job_recv, job_send = self._ctx.Pipe(duplex=False)
+        result_recv, result_send = self._ctx.Pipe(duplex=False)
+        p = self._ctx.Process(target=_worker, name=f"infer-{index}", daemon=True,
+                              args=(index, self._shm.name, self.slot_bytes, job_recv, result_send,
+                                    self.model_settings))
+        p.start()
+        job_recv.close()  # Keep only the parent's ends so a dead worker reads as EOF
+        result_send.close()
+        self._pipes[index] = (job_send, result_recv)
+        return p
+
+    def submit(self, frames, meta=None, conf=None, imgsz=None, block=False):
+        """Queues one tick's frames. Returns its sequence number, or None if the ring is full."""
+        needed = sum(f is not None for f in frames)
+        if needed > self.slots:
+            raise ValueError(f"{needed} frames per job exceed the {self.slots}-slot ring")
+        self._poll(0)
+        while len(self._free) < needed:
+            if not block:
+                return None
+            self._poll(0.1)
+
+        specs = []
+        for frame in frames:
+            if frame is None:
+                specs.append((None, None))
+                continue
+            if frame.nbytes > self.slot_bytes:
+                raise ValueError(f"Frame {frame.shape} exceeds WORKERS['max_frame_shape']")
+            slot = self._free.pop()
+            np.copyto(self._ring[slot, :frame.nbytes].reshape(frame.shape), frame)
+            specs.append((slot, frame.shape))
+
+        load = {i: 0 for i, p in enumerate(self._procs) if p is not None}
+        for index in self._owner.values():
+            load[index] += 1
+        index = min(load, key=load.get)  # Least busy live worker
+
+        seq = self._seq
+        self._seq += 1
+        self._meta[seq] = (meta, [slot for slot, _ in specs if slot is not None], len(specs), time.monotonic())
+        if not needed:  # Every stream skipped: nothing to infer, but keep its place in the order
+            self._done[seq] = ([None] * len(specs), 0.0)
+            return seq
+        self._owner[seq] = index
+        conf = conf if conf is not None else model_conf(self.model_settings)
+        self._pipes[index][0].send((seq, specs, conf, imgsz))
+        return seq
+
+    def _poll(self, timeout):
+        """Collects finished jobs and frees their slots; fails the jobs of dead or hung workers."""
+        conns = [self._pipes[i][1] for i, p in enumerate(self._procs) if p is not None]
+        while conns:
+            ready = wait(conns, timeout=timeout)
+            if not ready:
+                break
+            timeout = 0
+            for conn in ready:
+                try:
+                    kind, seq, payload = conn.recv()
+                except EOFError:  # Worker exited; _check_workers handles it
+                    conns.remove(conn)
+                    continue
+                if kind == 'ready':
+                    print(f"✓ Inference worker {seq} restarted")
+                elif kind == 'failed':
+                    print(f"⚠ Inference worker {seq} failed to restart: {payload}")
+                elif seq in self._meta and seq not in self._done:  # Not already failed
+                    if kind == 'result':
+                        self._finish(seq, *payload[:2])
+                    else:
+                        print(f"⚠ Inference worker error: {payload}")
+                        self._fail(seq)
+        self._check_workers()
+
+    def _finish(self, seq, boxes, latency):
+        self._free.extend(self._meta[seq][1])
+        self._owner.pop(seq, None)
+        self._done[seq] = (boxes, latency)
+
+    def _fail(self, seq):
+        self.errors += 1
+        self._finish(seq, [None] * self._meta[seq][2], 0.0)
+
+    def _check_workers(self):
+        """Restarts dead workers and workers holding a job past `job_timeout`, failing their jobs."""
+        now = time.monotonic()
+        hung = {self._owner[seq] for seq, (_, _, _, submitted) in self._meta.items()
+                if seq in self._owner and now - submitted > self.job_timeout}
+        for i, p in enumerate(self._procs):
+            if p is None:
+                continue
+            if p.is_alive():
+                if i not in hung:
+                    continue
+                print(f"⚠ Inference worker {i} timed out, restarting it")
+                p.terminate()  # It may still be reading its slots; free them only once it is gone
+                p.join(timeout=1.0)
+                if p.is_alive():
+                    p.kill()
+                    p.join()
+            else:
+                print(f"⚠ Inference worker {i} died (exit code {p.exitcode})")
+            for seq in [s for s, owner in self._owner.items() if owner == i]:
+                self._fail(seq)
+            for conn in self._pipes.pop(i):
+                conn.close()
+            if self.restarts_left > 0:
+                self.restarts_left -= 1
+                self.restarts += 1
+                self._procs[i] = self._spawn(i)
+            else:
+                self._procs[i] = None
+
+        if self._procs and all(p is None for p in self._procs):
+            for seq in self._meta:
+                if seq not in self._done:
+                    self._fail(seq)
+            raise RuntimeError("All inference workers died")
+
+    def ready(self, timeout=0):
+        """Yields finished jobs in submission order."""
+        self._poll(timeout)
+        while self._next in self._done:
+            seq = self._next
+            boxes, latency = self._done.pop(seq)
+            meta = self._meta.pop(seq)[0]
+            self._next += 1
+            yield seq, meta, boxes, latency
+
+    def drain(self):
+        """Yields every remaining job in order (end of a stream)."""
+        while self._meta:
+            yield from self.ready(timeout=0.1)
+
+    def close(self):
+        for job_send, _ in self._pipes.values():
+            try:
+                job_send.send(None)
+            except OSError:  # Worker already gone
+                pass
+        for p in self._procs:
+            if p is None:
+                continue
+            p.join(timeout=5.0)
+            if p.is_alive():
+                p.terminate()
+        for conns in self._pipes.values():
+            for conn in conns:
+                conn.close()
+        self._procs = []
+        self._pipes = {}
+        if self._shm is not None:
+            self._ring = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+def measure_scaling(frames, max_workers, model_settings, iterations=200, cameras=1):
+    """Throughput (frames/s) of the pool for 1..max_workers processes."""
+    shape = max(frames, key=lambda f: f.nbytes).shape
+    report = {}
+    for n in range(1, max_workers + 1):
+        pool = InferencePool(n, model_settings=model_settings, frame_shape=shape, cameras=cameras).start()
+        try:
+            for i in range(min(iterations, 4 * n)):  # Warm the queues
+                pool.submit([frames[i % len(frames)]], block=True)
+            list(pool.drain())
+            t0 = time.perf_counter()
+            for i in range(iterations):
+                pool.submit([frames[i % len(frames)]], block=True)
+                for _ in pool.ready():
+                    pass
+            list(pool.drain())
+            elapsed = time.perf_counter() - t0
+        finally:
+            pool.close()
+        report[n] = round(iterations / elapsed, 2)
+    base = report[1]
+    return {n: {'fps': fps, 'speedup': round(fps / base, 2)} for n, fps in report.items()}